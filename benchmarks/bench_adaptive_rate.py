@@ -0,0 +1,76 @@
+"""
+Benchmark of fixed LimiterSession rates against the AdaptiveRateLimiter, using
+a local stub server that answers 429 above a fixed capacity.
+
+A rate below the capacity leaves throughput unused and a rate above it
+produces throttling; the adaptive limiter should settle near the capacity.
+
+Usage (from the directory that contains the package):
+    python -m package.benchmarks.bench_adaptive_rate --capacity 200 --seconds 20
+"""
+
+import argparse
+import threading
+import time
+
+from ..config.adaptive_limiter import AdaptiveRateLimiter
+from ..config.web_service import WebService
+from .stub_server import StubServer
+
+
+def drive(service: WebService, url: str, seconds: float, workers: int):
+    """Sends requests from `workers` threads for `seconds`; returns (ok, errors)."""
+    counts = {"ok": 0, "errors": 0}
+    lock = threading.Lock()
+    deadline = time.monotonic() + seconds
+
+    def worker():
+        while time.monotonic() < deadline:
+            try:
+                ok = service.request(url, method="POST").status_code < 400
+            except Exception:
+                ok = False
+            with lock:
+                counts["ok" if ok else "errors"] += 1
+
+    threads = [threading.Thread(target=worker) for _ in range(workers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return counts["ok"], counts["errors"]
+
+
+class _Quiet(WebService):
+    def handle_error(self, response):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--capacity", type=int, default=200)
+    parser.add_argument("--seconds", type=float, default=20)
+    parser.add_argument("--workers", type=int, default=30)
+    parser.add_argument("--fixed", type=int, nargs="+", default=[120, 300])
+    parser.add_argument("--min-rate", type=float, default=10)
+    parser.add_argument("--max-rate", type=float, default=500)
+    args = parser.parse_args()
+
+    print(f"{'limitador':>18} {'ok/s':>8} {'429/s':>8} {'limite final':>13}")
+    setups = [(f"fixo {rate}", rate, None) for rate in args.fixed]
+    setups.append(("adaptativo", 120, AdaptiveRateLimiter(
+        120, args.min_rate, args.max_rate, increase_step=10)))
+    for name, rate, limiter in setups:
+        with StubServer(latency=0.005, capacity=args.capacity) as stub:
+            service = _Quiet("Basic x", "application/json", per_second=rate, rate_limiter=limiter)
+            url = f"{stub.url}api/v2/fieldValues"
+            ok, errors = drive(service, url, args.seconds, args.workers)
+        final = f"{limiter.metrics()['rate']:.0f} req/s" if limiter else "-"
+        print(f"{name:>18} {ok / args.seconds:>8.1f} {errors / args.seconds:>8.1f} {final:>13}")
+        if limiter:
+            for _, adjusted_rate, reason in limiter.metrics()["adjustments"][-5:]:
+                print(f"{'':>18} ajuste: {adjusted_rate} req/s ({reason})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Benchmark of the per-value and bulk batch transports against a local fake
+fieldValues server.
+
+Usage (from the directory that contains the package):
+    python -m package.benchmarks.bench_batch_upload --values 2000 --batch-sizes 10 50 200
+"""
+
+import argparse
+import concurrent.futures
+import time
+
+from ..config.batch_transport import BulkTransport, FieldValue, PerValueTransport
+from ..config.web_service import WebService
+from ..util.batch_uploader import BatchUploader
+from .stub_server import StubServer
+
+
+def run(transport, values, batch_size: int, workers: int):
+    """
+    Sends every value through a BatchUploader.
+
+    Returns:
+        Tuple with elapsed seconds, the report and the per-batch latencies.
+    """
+    uploader = BatchUploader(transport, "1", "campo", batch_size)
+    latencies = []
+
+    def send(batch):
+        start = time.perf_counter()
+        uploader.send(batch)
+        latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+        for item in values:
+            batch = uploader.add(item)
+            if batch:
+                executor.submit(send, batch)
+        for batch in uploader.drain():
+            executor.submit(send, batch)
+    return time.perf_counter() - start, uploader.report, latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--values", type=int, default=2000)
+    parser.add_argument("--parents", type=int, default=20)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[10, 50, 200])
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--per-item-latency", type=float, default=0.0002)
+    parser.add_argument("--per-second", type=int, default=120)
+    parser.add_argument("--workers", type=int, default=10)
+    args = parser.parse_args()
+
+    values = [FieldValue(f"V{i}", None, f"P{i % args.parents}") for i in range(args.values)]
+
+    with StubServer(latency=args.latency, per_item_latency=args.per_item_latency) as stub:
+        print(f"{'transporte':>11} {'lote':>5} {'tempo':>8} {'valores/s':>10} "
+              f"{'lat. média/lote':>16} {'ok':>6} {'falhas':>6}")
+        for name in ("por-valor", "bulk"):
+            for batch_size in args.batch_sizes:
+                service = WebService("Basic x", "application/json", per_second=args.per_second)
+                if name == "bulk":
+                    transport = BulkTransport(service, stub.url)
+                else:
+                    transport = PerValueTransport(service, stub.url)
+                elapsed, report, latencies = run(transport, values, batch_size, args.workers)
+                mean = sum(latencies) / len(latencies) if latencies else 0.0
+                print(f"{name:>11} {batch_size:>5} {elapsed:>7.2f}s {args.values / elapsed:>10.1f} "
+                      f"{mean * 1000:>13.1f} ms {report.succeeded:>6} {report.failed:>6}")
+                if name == "por-valor":
+                    # O envio por valor não depende do tamanho do lote
+                    break
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Benchmark of scripts.list_values.process_element against a local stub server.
+
+Compares the old behaviour (the dedup lock held for the whole HTTP request)
+with the DedupRegistry, which releases the lock before any I/O. Throughput of
+the registry should grow with the worker count until the LimiterSession cap.
+
+Usage (from the directory that contains the package):
+    python -m package.benchmarks.bench_dedup_concurrency --rows 600 --per-second 120
+"""
+
+import argparse
+import concurrent.futures
+import contextlib
+import os
+import threading
+import time
+
+from ..config.web_service import WebService
+from ..scripts import list_values
+from ..util.dedup_registry import DedupRegistry
+from .stub_server import StubServer
+
+
+def run(workers: int, rows: int, serialized: bool) -> float:
+    """
+    Sends `rows` distinct values through process_element.
+
+    Args:
+        workers (int): Number of threads in the pool.
+        rows (int): Number of distinct rows to send.
+        serialized (bool): If True, hold a single lock around each call,
+            reproducing the previous implementation.
+
+    Returns:
+        float: Requests per second.
+    """
+    registry = DedupRegistry()
+    big_lock = threading.Lock()
+
+    def task(element):
+        if serialized:
+            with big_lock:
+                list_values.process_element(element, "1", "campo", registry)
+        else:
+            list_values.process_element(element, "1", "campo", registry)
+
+    start = time.perf_counter()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+        for i in range(rows):
+            executor.submit(task, {"valor": f"V{i}", "filtro": f"F{i % 50}"})
+    elapsed = time.perf_counter() - start
+    return rows / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=600)
+    parser.add_argument("--latency", type=float, default=0.02,
+                        help="latência simulada do servidor, em segundos")
+    parser.add_argument("--per-second", type=int, default=120,
+                        help="limite do LimiterSession")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 5, 10, 20, 60])
+    args = parser.parse_args()
+
+    with StubServer(latency=args.latency) as stub:
+        list_values.server = stub.url
+        print(f"Stub em {stub.url} (latência {args.latency * 1000:.0f} ms, "
+              f"limite {args.per_second} req/s)")
+        print(f"{'workers':>8} {'lock global':>14} {'registry':>14}")
+        for workers in args.workers:
+            results = []
+            for serialized in (True, False):
+                # Uma sessão nova por rodada para não herdar o balde do limitador
+                list_values.call = WebService("Basic x", "application/json",
+                                              per_second=args.per_second)
+                with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+                    results.append(run(workers, args.rows, serialized))
+            print(f"{workers:>8} {results[0]:>10.1f} r/s {results[1]:>10.1f} r/s")
+
+
+if __name__ == "__main__":
+    main()
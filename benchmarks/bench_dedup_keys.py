@@ -0,0 +1,102 @@
+"""
+Benchmark of the dedup key stores: the previous dict of full request URLs
+against hashed keys in a dict and in the compact CompactKeyTable.
+
+Stores:
+    url       dict of full request URLs (previous DedupRegistry)
+    digest    dict of 16-byte request_key digests
+    compact   CompactKeyTable of digests
+
+For each store, N distinct values are claimed and marked done (key built from
+the request parameters, as list_values does), then N new values are looked up
+(misses) and the first N values are claimed again (duplicates). Each store
+runs in a fresh child process, so the memory reported is the RSS growth of
+that store only.
+
+Usage (from the directory that contains the package):
+    python -m package.benchmarks.bench_dedup_keys --keys 100000 1000000
+"""
+
+import argparse
+import multiprocessing
+import time
+from urllib.parse import urlencode
+
+from ..config.batch_transport import FieldValue
+from ..util.key_store import CompactKeyTable, request_key
+
+_URL = "http://localhost:8080/greendocs/api/fieldValues"
+
+
+def _rss_kb() -> int:
+    with open("/proc/self/statm") as statm:
+        pages = int(statm.read().split()[1])
+    import resource
+
+    return pages * resource.getpagesize() // 1024
+
+
+def _params(i: int):
+    item = FieldValue(f"VALOR {i:07d}", None, f"P{i % 5000:05d}")
+    return item.to_params("8a8a8a8a-1111-2222-3333-444455556666", "campo")
+
+
+def _measure(store: str, keys: int):
+    before = _rss_kb()
+    if store == "url":
+        table, make_key = {}, lambda params: f"{_URL}?{urlencode(params)}"
+    elif store == "digest":
+        table, make_key = {}, request_key
+    else:
+        table, make_key = CompactKeyTable(), request_key
+
+    def claim(i):
+        # Same sequence as DedupRegistry.claim followed by mark_done
+        key = make_key(_params(i))
+        count = len(table)
+        table.setdefault(key, "in_flight")
+        if len(table) == count:
+            return False
+        table[key] = "done"
+        return True
+
+    start = time.perf_counter()
+    for i in range(keys):
+        claim(i)
+    insert = time.perf_counter() - start
+    memory_kb = _rss_kb() - before
+
+    start = time.perf_counter()
+    for i in range(keys, 2 * keys):
+        make_key(_params(i)) in table
+    miss = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for i in range(keys):
+        claim(i)
+    duplicate = time.perf_counter() - start
+    return memory_kb, insert, miss, duplicate
+
+
+def measure(store: str, keys: int):
+    """Runs one store in a fresh process and returns (KB, insert s, miss s, duplicate s)."""
+    with multiprocessing.get_context("spawn").Pool(1) as pool:
+        return pool.apply(_measure, (store, keys))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--keys", type=int, nargs="+", default=[100_000, 1_000_000])
+    args = parser.parse_args()
+
+    print(f"{'chaves':>9} {'registro':>8} {'memória':>10} {'bytes/chave':>12} "
+          f"{'novas':>10} {'ausentes':>10} {'repetidas':>10}  (µs por chave)")
+    for keys in args.keys:
+        for store in ("url", "digest", "compact"):
+            memory_kb, insert, miss, duplicate = measure(store, keys)
+            print(f"{keys:>9} {store:>8} {memory_kb / 1024:>7.1f} MB {memory_kb * 1024 / keys:>12.0f} "
+                  f"{insert / keys * 1e6:>10.2f} {miss / keys * 1e6:>10.2f} {duplicate / keys * 1e6:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Benchmark of DictProcessor on filtro/valor records: the previous row loop
+against the streaming row path and the column path.
+
+The column path is timed on a dict of lists (ColumnarRecords.to_dict) and on
+a DataFrame, next to pandas' own string concatenation for comparison.
+
+Usage (from the directory that contains the package):
+    python -m package.benchmarks.bench_dict_processor --rows 1000000
+"""
+
+import argparse
+import time
+
+from ..util.dict_processor import DictProcessor
+
+
+def legacy_process(data):
+    """Previous implementation of DictProcessor.process."""
+    processed_list = []
+    for item in data:
+        if len(item) == 1:
+            processed_list.append(list(item.values())[0])
+        elif len(item) == 2:
+            processed_list.append(
+                f"{list(item.values())[0]} - {list(item.values())[1]}")
+    return processed_list
+
+
+def _columns(rows: int, empty_every: int):
+    filtro = [f"P{i % 500:04d}" for i in range(rows)]
+    valor = ["" if empty_every and i % empty_every == 0 else f"VALOR {i}" for i in range(rows)]
+    return {"filtro": filtro, "valor": valor}
+
+
+def _time(function):
+    start = time.perf_counter()
+    result = function()
+    return time.perf_counter() - start, len(result)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--empty-every", type=int, default=10,
+                        help="um valor vazio a cada N linhas (0 = nenhum)")
+    args = parser.parse_args()
+
+    import pandas as pd
+
+    columns = _columns(args.rows, args.empty_every)
+    records = [dict(zip(columns, row)) for row in zip(*columns.values())]
+    frame = pd.DataFrame(columns)
+
+    runs = [
+        ("anterior (linhas)", lambda: legacy_process(records)),
+        ("linhas", lambda: DictProcessor(records).process()),
+        ("linhas, sem vazios", lambda: DictProcessor(records, skip_empty=True).process()),
+        ("colunas (listas)", lambda: DictProcessor.process_columns(columns)),
+        ("colunas, sem vazios", lambda: DictProcessor.process_columns(columns, skip_empty=True)),
+        ("colunas (DataFrame)", lambda: DictProcessor.process_columns(frame)),
+        ("pandas str +", lambda: (frame["filtro"].astype(str) + " - " + frame["valor"].astype(str)).tolist()),
+    ]
+    print(f"{args.rows} linhas filtro/valor.")
+    print(f"{'método':>22} {'tempo':>8} {'linhas/s':>12} {'rótulos':>9}")
+    baseline = None
+    for name, function in runs:
+        elapsed, labels = _time(function)
+        baseline = baseline or elapsed
+        print(f"{name:>22} {elapsed:>7.3f}s {args.rows / elapsed:>12,.0f} {labels:>9} "
+              f"({baseline / elapsed:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Benchmark of the diff sync mode of scripts.list_values against a local stub
+server that already holds the values.
+
+The stub starts with --existing values; the input holds all of them plus
+--new values. The sync run lists the existing values once and sends only the
+new ones; a second sync run of the same input sends nothing. The plain mode
+sends one request per row; it only runs with --naive, otherwise its cost is
+estimated from the rate limit.
+
+Usage (from the directory that contains the package):
+    python -m package.benchmarks.bench_diff_sync --existing 100000 --new 500
+"""
+
+import argparse
+import contextlib
+import os
+import time
+
+from .stub_server import StubServer
+
+
+def _rows(existing: int, new: int, parents: int):
+    for i in range(existing + new):
+        yield {"valor": f"V{i}", "sigla": None, "filtro": f"P{i % parents}"}
+
+
+def _run(stub: StubServer, rows, sync: bool, per_second: int, workers: int, page_size: int):
+    from ..config.web_service import WebService
+    from ..scripts import list_values
+    from ..util.dedup_registry import DedupRegistry
+    from ..util.diff_sync import ExistingValues
+
+    list_values.server = stub.url
+    list_values.call = WebService("Basic x", "application/json", per_second=per_second, pool_size=workers)
+    list_values.existing_values = ExistingValues() if sync else None
+    gets, posts = stub.list_count, stub.request_count
+
+    start = time.perf_counter()
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        if sync:
+            list_values.prefetch_existing("1", "campo", existing=list_values.existing_values,
+                                          page_size=page_size)
+        listed = time.perf_counter() - start
+        list_values.run_threads(rows, "1", "campo", DedupRegistry(), workers)
+    elapsed = time.perf_counter() - start
+    list_values.existing_values = None
+    return stub.list_count - gets, stub.request_count - posts, listed, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--existing", type=int, default=100_000)
+    parser.add_argument("--new", type=int, default=500)
+    parser.add_argument("--parents", type=int, default=50)
+    parser.add_argument("--page-size", type=int, default=500)
+    parser.add_argument("--latency", type=float, default=0.005)
+    parser.add_argument("--per-second", type=int, default=120)
+    parser.add_argument("--workers", type=int, default=10)
+    parser.add_argument("--naive", action="store_true",
+                        help="também executa o envio sem sync (uma requisição por linha)")
+    args = parser.parse_args()
+
+    rows = args.existing + args.new
+    with StubServer(latency=args.latency) as stub:
+        stub.preload({"valor": f"V{i}", "sigla": None, "idPai": f"P{i % args.parents}"}
+                     for i in range(args.existing))
+        print(f"Servidor com {args.existing} valores; entrada com {rows} linhas ({args.new} novas).")
+        print(f"{'modo':>16} {'GETs':>6} {'POSTs':>7} {'listagem':>9} {'total':>9}")
+
+        runs = [("sync", True), ("sync (reexec.)", True)]
+        if args.naive:
+            runs.append(("sem sync", False))
+        for name, sync in runs:
+            gets, posts, listed, elapsed = _run(
+                stub, _rows(args.existing, args.new, args.parents), sync,
+                args.per_second, args.workers, args.page_size)
+            print(f"{name:>16} {gets:>6} {posts:>7} {listed:>8.2f}s {elapsed:>8.2f}s")
+        if not args.naive:
+            print(f"{'sem sync (est.)':>16} {0:>6} {rows:>7} {'-':>9} {rows / args.per_second:>8.0f}s")
+
+
+if __name__ == "__main__":
+    main()
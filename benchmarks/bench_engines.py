@@ -0,0 +1,73 @@
+"""
+Benchmark of the ThreadPoolExecutor and asyncio upload engines of
+scripts.list_values against a local stub server.
+
+Both engines get the same rate limit and the same concurrency. Each run
+happens in a fresh child process so the reported peak RSS belongs to that
+engine only.
+
+Usage (from the directory that contains the package):
+    python -m package.benchmarks.bench_engines --rows 2000 --concurrency 10 60 --per-second 1000
+"""
+
+import argparse
+import asyncio
+import concurrent.futures
+import contextlib
+import multiprocessing
+import os
+import resource
+import time
+
+from .stub_server import StubServer
+
+
+def _rows(count: int):
+    for i in range(count):
+        yield {"valor": f"V{i}", "sigla": None, "filtro": f"P{i % 50}"}
+
+
+def _measure(engine: str, server: str, rows: int, concurrency: int, per_second: int):
+    from ..config.web_service import WebService
+    from ..scripts import list_values
+    from ..util.dedup_registry import DedupRegistry
+
+    list_values.server = server
+    registry = DedupRegistry()
+    start = time.perf_counter()
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        if engine == "threads":
+            list_values.call = WebService("Basic x", "application/json", per_second=per_second)
+            with concurrent.futures.ThreadPoolExecutor(max_workers=concurrency) as executor:
+                for element in _rows(rows):
+                    executor.submit(list_values.process_element, element, "1", "campo", registry)
+        else:
+            asyncio.run(list_values.run_async(_rows(rows), "1", "campo", registry,
+                                              max_in_flight=concurrency, per_second=per_second))
+    elapsed = time.perf_counter() - start
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return registry.done_count(), elapsed, peak_kb
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[10, 60])
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--per-second", type=int, default=1000)
+    args = parser.parse_args()
+
+    context = multiprocessing.get_context("spawn")
+    with StubServer(latency=args.latency) as stub:
+        print(f"{'motor':>8} {'concorr.':>8} {'enviados':>9} {'req/s':>8} {'pico RSS':>10}")
+        for concurrency in args.concurrency:
+            for engine in ("threads", "async"):
+                with context.Pool(1) as pool:
+                    sent, elapsed, peak_kb = pool.apply(
+                        _measure, (engine, stub.url, args.rows, concurrency, args.per_second))
+                print(f"{engine:>8} {concurrency:>8} {sent:>9} {sent / elapsed:>8.1f} "
+                      f"{peak_kb / 1024:>7.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Benchmark of the single-pass ExcelStreamReader against the previous chunked
+pd.read_excel(nrows=..., skiprows=...) generator and whole-sheet reads.
+
+Readers:
+    legacy   chunked pd.read_excel generator (quadratic)
+    pandas   pd.read_excel + fillna("") + to_dict(orient='records')
+    list     ExcelReader.read_to_dict (every row materialized)
+    stream   ExcelStreamReader, every column, raw cell values
+    typed    ExcelReader.iter_chunks with valor/sigla/filtro projected and
+             read as strings
+
+Each reader runs in a fresh child process so the reported peak RSS belongs to
+that reader only. The sheet gets --extra-columns unused columns, which the
+typed reader skips. legacy and pandas are skipped above --legacy-max-rows and
+--pandas-max-rows.
+
+Usage (from the directory that contains the package):
+    python -m package.benchmarks.bench_excel_reader --rows 10000 100000 1000000
+"""
+
+import argparse
+import multiprocessing
+import os
+import resource
+import tempfile
+import time
+
+from ..util.excel_stream import ExcelStreamReader
+from ..util.read_excel import ExcelReader
+from .synthetic import write_values_workbook
+
+
+def legacy_row_generator(file_path: str, nrows: int = 1000, skiprows: int = 0):
+    """Previous implementation of list_values.excel_row_generator."""
+    import pandas as pd
+
+    while True:
+        df = pd.read_excel(file_path, nrows=nrows, skiprows=skiprows, engine='openpyxl')
+        if df.empty:
+            break
+        for _, row in df.iterrows():
+            yield row.to_dict()
+        skiprows += nrows
+
+
+def _measure(reader: str, path: str):
+    start = time.perf_counter()
+    if reader == "legacy":
+        count = sum(1 for _ in legacy_row_generator(path))
+    elif reader == "pandas":
+        import pandas as pd
+
+        count = len(pd.read_excel(path, engine='openpyxl').fillna("").to_dict(orient='records'))
+    elif reader == "list":
+        count = len(ExcelReader(path).read_to_dict())
+    elif reader == "typed":
+        reader = ExcelReader(path, columns=("valor", "sigla", "filtro"))
+        count = sum(len(chunk) for chunk in reader.iter_chunks(1000))
+    else:
+        count = sum(1 for _ in ExcelStreamReader(path))
+    elapsed = time.perf_counter() - start
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return count, elapsed, peak_kb
+
+
+def measure(reader: str, path: str):
+    """Runs one reader in a fresh process and returns (rows, seconds, peak KB)."""
+    with multiprocessing.get_context("spawn").Pool(1) as pool:
+        return pool.apply(_measure, (reader, path))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--legacy-max-rows", type=int, default=20_000)
+    parser.add_argument("--pandas-max-rows", type=int, default=200_000)
+    parser.add_argument("--extra-columns", type=int, default=5)
+    args = parser.parse_args()
+    limits = {"legacy": args.legacy_max_rows, "pandas": args.pandas_max_rows}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"{'linhas':>9} {'leitor':>8} {'lidas':>9} {'tempo':>9} {'pico RSS':>10}")
+        for rows in args.rows:
+            path = write_values_workbook(os.path.join(tmp, f"values_{rows}.xlsx"), rows,
+                                         extra_columns=args.extra_columns)
+            for reader in ("legacy", "pandas", "list", "stream", "typed"):
+                if rows > limits.get(reader, rows):
+                    print(f"{rows:>9} {reader:>8} {'-':>9} {'(pulado)':>9}")
+                    continue
+                count, elapsed, peak_kb = measure(reader, path)
+                print(f"{rows:>9} {reader:>8} {count:>9} {elapsed:>8.2f}s "
+                      f"{peak_kb / 1024:>7.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
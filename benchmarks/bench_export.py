@@ -0,0 +1,76 @@
+"""
+Benchmark of the create.py exports: the previous list + DataFrame.to_excel
+against the streaming Excel writer and the CSV fast path.
+
+A synthetic part set is exported by each writer in a fresh child process, so
+the reported peak RSS belongs to that writer only. The previous export keeps
+the whole workbook in memory and is skipped above --legacy-max-rows.
+
+Usage (from the directory that contains the package):
+    python -m package.benchmarks.bench_export --records 1000000 --parts 200
+"""
+
+import argparse
+import multiprocessing
+import os
+import resource
+import tempfile
+import time
+
+from .synthetic import write_part_set
+
+DATASET = "conjunto_componente"
+
+
+def _export(writer: str, data_dir: str, output: str):
+    from ..util.excel_writer import open_writer
+    from ..util.json_parts import iter_part_columns, load_dataset
+
+    start = time.perf_counter()
+    if writer == "legacy":
+        import pandas as pd
+
+        # Previous create.py: every record in memory, then the whole workbook
+        pd.DataFrame(load_dataset(DATASET, data_dir, workers=1).to_dict()).to_excel(output, index=False)
+        rows = None
+    else:
+        with open_writer(output, writer, single_file=True) as export:
+            export.start(DATASET, ("filtro", "valor"))
+            for filtro, valor in iter_part_columns(DATASET, data_dir, workers=1):
+                export.write_rows(zip(filtro, valor))
+        rows = export.rows_written
+    elapsed = time.perf_counter() - start
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rows, elapsed, peak_kb, os.path.getsize(output)
+
+
+def measure(writer: str, data_dir: str, output: str):
+    """Runs one export in a fresh process and returns (rows, seconds, peak KB, bytes)."""
+    with multiprocessing.get_context("spawn").Pool(1) as pool:
+        return pool.apply(_export, (writer, data_dir, output))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--records", type=int, default=1_000_000)
+    parser.add_argument("--parts", type=int, default=200)
+    parser.add_argument("--legacy-max-rows", type=int, default=200_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        write_part_set(data_dir, DATASET, args.records, args.parts)
+        print(f"{args.records} registros em {args.parts} partes.")
+        print(f"{'gravação':>10} {'linhas':>9} {'tempo':>9} {'pico RSS':>10} {'arquivo':>10}")
+        for writer, extension in (("legacy", "xlsx"), ("xlsx", "xlsx"), ("csv", "csv")):
+            if writer == "legacy" and args.records > args.legacy_max_rows:
+                print(f"{writer:>10} {'-':>9} {'(pulado)':>9}")
+                continue
+            output = os.path.join(data_dir, f"{writer}.{extension}")
+            rows, elapsed, peak_kb, size = measure(writer, data_dir, output)
+            rows = args.records if rows is None else rows
+            print(f"{writer:>10} {rows:>9} {elapsed:>8.2f}s {peak_kb / 1024:>7.1f} MB "
+                  f"{size / 1024 / 1024:>7.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Benchmark of the parallel columnar JSON loader (util.json_parts) against the
+previous serial read_json_files of create.py, on synthetic part sets.
+
+Usage (from the directory that contains the package):
+    python -m package.benchmarks.bench_json_ingest --records 1000000 --parts 100
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+
+from ..util.json_parts import load_dataset
+from .synthetic import write_part_set
+
+DATASET = "conjunto_componente"
+
+
+def legacy_read_json_files(json_folder):
+    """Previous implementation of create.read_json_files."""
+    data = []
+    for filename in os.listdir(json_folder):
+        if filename.endswith('.json'):
+            with open(os.path.join(json_folder, filename), 'r') as file:
+                for item in json.load(file).values():
+                    record = item.get(DATASET, {})
+                    filtro, valor = record.get('filtro'), record.get('valor')
+                    if filtro and valor:
+                        data.append({'filtro': filtro, 'valor': valor})
+    return data
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--records", type=int, default=1_000_000)
+    parser.add_argument("--parts", type=int, default=100)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, os.cpu_count() or 1])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        folder = write_part_set(tmp, DATASET, args.records, args.parts)
+        print(f"{args.records} registros em {args.parts} arquivos")
+
+        start = time.perf_counter()
+        count = len(legacy_read_json_files(folder))
+        print(f"{'serial (anterior)':>22} {count:>9} {time.perf_counter() - start:>8.2f}s")
+
+        for workers in sorted(set(args.workers)):
+            start = time.perf_counter()
+            count = len(load_dataset(DATASET, tmp, workers))
+            print(f"{f'colunar, {workers} proc.':>22} {count:>9} {time.perf_counter() - start:>8.2f}s")
+
+
+if __name__ == "__main__":
+    main()
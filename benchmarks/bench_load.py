@@ -0,0 +1,194 @@
+"""
+Load test of scripts.list_values against the local stub server, with
+synthetic workbooks and JSON part sets, to catch performance regressions.
+
+Each run starts a fresh stub server (latency distribution, injected errors,
+429 above --capacity) and runs list_values as a child process with --server
+pointing at it, so WebService, the LimiterSession rate limit, the readers and
+the dedup registry are all in the measured path. Per run it records:
+
+    req/s        values created on the server per second of the run
+    p50/p95/p99  HTTP latency seen by the client (list_values --metrics-out)
+    peak RSS     of the list_values process
+    CPU          user + system seconds of the list_values process
+
+--json-out saves the results; with --baseline, runs whose req/s fell or whose
+peak RSS or CPU grew by more than --tolerance against the same input and row
+count in a previous --json-out are reported, and the exit status is 1.
+
+Usage (from the directory that contains the package):
+    python -m package.benchmarks.bench_load --rows 10000 100000 --inputs xlsx json
+    python -m package.benchmarks.bench_load --rows 1000000 --inputs json --per-second 5000 \\
+        --json-out results.json
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from .stub_server import StubServer
+from .synthetic import write_part_set, write_values_workbook
+
+DATASET = "conjunto_componente"
+
+# Variáveis exigidas pela configuração; o servidor vem de --server
+_ENVIRONMENT = {"USER": "bench", "PASSWORD": "bench", "CLIENT": "bench", "ENV_ID": "1",
+                "CONTENT_TYPE": "application/json", "METADATA_NAME": "campo", "MODE": "dev"}
+
+
+def write_input(kind: str, directory: str, rows: int, parents: int) -> list:
+    """
+    Writes a synthetic input and returns the list_values arguments that read it.
+
+    Args:
+        kind (str): 'xlsx' (a values.xlsx-like workbook) or 'json' (a part set
+            with one part file per 50 000 records).
+        directory (str): Where to write the input.
+        rows (int): Number of rows.
+        parents (int): Number of distinct parent codes.
+
+    Returns:
+        list: The input arguments, e.g. ['--file', path].
+    """
+    if kind == "xlsx":
+        path = write_values_workbook(os.path.join(directory, f"values_{rows}.xlsx"), rows, parents)
+        return ["--file", path]
+    data_dir = os.path.join(directory, f"json_{rows}")
+    folder = write_part_set(data_dir, DATASET, rows, max(1, rows // 50_000), parents)
+    return ["--source", f"json:{folder}"]
+
+
+def run(input_args: list, args, cwd: str) -> dict:
+    """
+    Runs list_values once against a fresh stub server.
+
+    Args:
+        input_args (list): Arguments selecting the input.
+        args: The parsed benchmark options.
+        cwd (str): Working directory of the child (its log file goes there).
+
+    Returns:
+        dict: The measurements of the run.
+    """
+    metrics_path = os.path.join(cwd, "metrics.json")
+    package_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    environment = dict(os.environ, **_ENVIRONMENT)
+    environment["PYTHONPATH"] = os.pathsep.join(
+        filter(None, [os.path.dirname(package_dir), os.environ.get("PYTHONPATH")]))
+    module = f"{os.path.basename(package_dir)}.scripts.list_values"
+
+    with StubServer(latency=args.latency, error_rate=args.error_rate, capacity=args.capacity,
+                    max_in_flight=args.max_in_flight, keep_values=False) as stub:
+        command = [sys.executable, "-m", module, "--server", stub.url, *input_args,
+                   "--engine", args.engine, "--workers", str(args.workers),
+                   "--per-second", str(args.per_second), "--quiet", "--progress-interval", "0",
+                   "--metrics-out", metrics_path, "--metrics-format", "json", *args.extra]
+        start = time.perf_counter()
+        child = subprocess.Popen(command, cwd=cwd, env=environment,
+                                 stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        stderr = child.stderr.read()
+        # wait4 devolve o uso de recursos só deste processo filho
+        _, status, usage = os.wait4(child.pid, 0)
+        child.returncode = os.waitstatus_to_exitcode(status)
+        elapsed = time.perf_counter() - start
+        server = stub.stats()
+
+    if child.returncode != 0:
+        raise RuntimeError(f"list_values terminou com status {child.returncode}:\n"
+                           f"{stderr.decode(errors='replace')[-2000:]}")
+    with open(metrics_path, encoding="utf-8") as file:
+        http = json.load(file)["latency"]["http"]
+    return {
+        "elapsed": elapsed,
+        "created": server["created"],
+        "errors": server["errors"],
+        "rps": server["created"] / elapsed if elapsed else 0.0,
+        "p50": http["p50"],
+        "p95": http["p95"],
+        "p99": http["p99"],
+        "peak_rss_mb": usage.ru_maxrss / 1024,
+        "cpu": usage.ru_utime + usage.ru_stime,
+    }
+
+
+def regressions(result: dict, baseline: dict, tolerance: float) -> list:
+    """
+    Compares a run with the same run of a baseline.
+
+    Args:
+        result (dict): The run.
+        baseline (dict): The baseline run.
+        tolerance (float): Allowed relative change, e.g. 0.2 for 20%.
+
+    Returns:
+        list: One description per regressed measurement.
+    """
+    found = []
+    if result["rps"] < baseline["rps"] * (1 - tolerance):
+        found.append(f"req/s {baseline['rps']:.0f} -> {result['rps']:.0f}")
+    for name, label in (("peak_rss_mb", "pico RSS"), ("cpu", "CPU")):
+        if result[name] > baseline[name] * (1 + tolerance):
+            found.append(f"{label} {baseline[name]:.1f} -> {result[name]:.1f}")
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--inputs", nargs="+", choices=("xlsx", "json"), default=["xlsx", "json"])
+    parser.add_argument("--parents", type=int, default=500)
+    parser.add_argument("--engine", choices=("threads", "async"), default="threads")
+    parser.add_argument("--workers", type=int, default=20)
+    parser.add_argument("--per-second", type=float, default=2000)
+    parser.add_argument("--latency", default="lognormal:0.005,0.5",
+                        help="latência do servidor de teste (veja stub_server.latency_sampler)")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--capacity", type=int, default=0,
+                        help="requisições/s aceitas pelo servidor de teste antes de responder 429")
+    parser.add_argument("--max-in-flight", type=int, default=0)
+    parser.add_argument("--json-out", default=None, help="grava os resultados neste arquivo")
+    parser.add_argument("--baseline", default=None,
+                        help="resultados de uma execução anterior (--json-out) para comparar")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    parser.add_argument("extra", nargs=argparse.REMAINDER,
+                        help="argumentos repassados ao list_values depois de --")
+    args = parser.parse_args()
+    args.extra = [arg for arg in args.extra if arg != "--"]
+
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as file:
+            baseline = {(entry["input"], entry["rows"]): entry for entry in json.load(file)}
+
+    results, failed = [], False
+    print(f"{'entrada':>7} {'linhas':>9} {'criados':>9} {'erros':>6} {'req/s':>8} {'p50':>7} "
+          f"{'p95':>7} {'p99':>7} {'pico RSS':>10} {'CPU':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in args.rows:
+            for kind in args.inputs:
+                input_args = write_input(kind, tmp, rows, args.parents)
+                result = dict(run(input_args, args, tmp), input=kind, rows=rows, engine=args.engine)
+                results.append(result)
+                print(f"{kind:>7} {rows:>9} {result['created']:>9} {result['errors']:>6} "
+                      f"{result['rps']:>8.0f} {result['p50'] * 1000:>5.1f}ms {result['p95'] * 1000:>5.1f}ms "
+                      f"{result['p99'] * 1000:>5.1f}ms {result['peak_rss_mb']:>7.1f} MB "
+                      f"{result['cpu']:>7.1f}s")
+                previous = baseline.get((kind, rows))
+                if previous:
+                    for line in regressions(result, previous, args.tolerance):
+                        failed = True
+                        print(f"{'':>7} REGRESSÃO: {line}")
+
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2)
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Benchmark of the per-request console and log file output of scripts.list_values.
+
+Worker threads run the output a request produces (URL and status lines, plus
+one log record) without any HTTP, so the numbers are the logging overhead
+alone. The synchronous mode prints and logs from the worker threads, as
+before; the queued modes go through the background writers, with and
+without 1-in-N sampling. The overhead is the extra time per request over a
+run with no output, measured when the worker threads finish and again once
+the queues are drained.
+
+The console is a line-buffered file; --write-latency adds a pause to every
+write call on it, to stand in for a terminal (0 measures a plain file).
+
+Usage (from the directory that contains the package):
+    python -m package.benchmarks.bench_logging --requests 50000 --workers 10 60
+"""
+
+import argparse
+import concurrent.futures
+import contextlib
+import logging
+import os
+import tempfile
+import time
+
+
+def _request(list_values, i: int) -> None:
+    shown = list_values.sample_request()
+    list_values.say(1, f"URL: http://localhost/fieldValues?idAmbiente=1&campo=campo&valor=V{i}", shown)
+    list_values.say(1, "Código de status: 201", shown)
+    logging.debug(f"POST /fieldValues valor=V{i} 201")
+
+
+def _silent(list_values, i: int) -> None:
+    list_values.sample_request()
+
+
+class _SlowConsole:
+    """Line-buffered file whose writes take at least `latency` seconds, like a terminal."""
+
+    def __init__(self, path: str, latency: float) -> None:
+        self.file = open(path, "w", buffering=1, encoding="utf-8")
+        self.latency = latency
+
+    def write(self, text: str) -> int:
+        if self.latency:
+            time.sleep(self.latency)
+        return self.file.write(text)
+
+    def flush(self) -> None:
+        self.file.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.file.close()
+
+
+def _run(mode: str, requests: int, workers: int, sample: int, folder: str, write_latency: float):
+    from ..scripts import list_values
+    from ..util.async_log import BackgroundWriter, Sampler
+
+    root = logging.getLogger()
+    log_path = os.path.join(folder, f"{mode}.log")
+    sink = _SlowConsole(os.path.join(folder, f"{mode}.out"), write_latency)
+    handler = None
+    list_values.verbosity = 1
+    list_values.sample_request = Sampler(sample if mode == "fila + amostra" else 1)
+    if mode == "síncrono":
+        handler = logging.FileHandler(log_path, encoding="utf-8")
+        handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+        list_values.console = None
+    elif mode != "sem log":
+        handler = list_values.BackgroundLogHandler(log_path)
+        handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+        list_values.console = BackgroundWriter(sink)
+    if handler is not None:
+        root.addHandler(handler)
+    root.setLevel(logging.DEBUG if handler is not None else logging.ERROR)
+    work = _silent if mode == "sem log" else _request
+
+    start = time.perf_counter()
+    with sink, contextlib.redirect_stdout(sink):
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+            for _ in executor.map(lambda i: work(list_values, i), range(requests), chunksize=64):
+                pass
+        in_threads = time.perf_counter() - start
+        # As filas só contam como terminadas depois de escritas
+        list_values.stop_console()
+        if handler is not None:
+            root.removeHandler(handler)
+            handler.close()
+    return in_threads, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=50_000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[10, 60])
+    parser.add_argument("--sample-every", type=int, default=100)
+    parser.add_argument("--write-latency", type=float, default=0.0001,
+                        help="segundos de cada escrita no console simulado (0 = arquivo comum)")
+    args = parser.parse_args()
+
+    modes = ("sem log", "síncrono", "fila", "fila + amostra")
+    print(f"{args.requests} requisições simuladas; amostra de 1 a cada {args.sample_every}.")
+    print(f"{'threads':>7} {'modo':>15} {'nas threads':>12} {'custo/req':>10} {'total':>8} {'custo/req':>10}")
+    with tempfile.TemporaryDirectory() as folder:
+        for workers in args.workers:
+            baseline = None
+            for mode in modes:
+                in_threads, total = _run(mode, args.requests, workers, args.sample_every, folder,
+                                         args.write_latency)
+                if baseline is None:
+                    baseline = total
+                thread_cost = (in_threads - baseline) / args.requests * 1e6
+                total_cost = (total - baseline) / args.requests * 1e6
+                print(f"{workers:>7} {mode:>15} {in_threads:>11.2f}s {thread_cost:>8.1f}µs "
+                      f"{total:>7.2f}s {total_cost:>8.1f}µs")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Benchmark of the record sources of scripts.list_values: the JSON part files
+read directly against the previous JSON -> create.py -> xlsx -> Excel reader
+round trip.
+
+A synthetic part set is read by each path while the consumer stands in for
+the uploader: it pauses --send-cost microseconds per row (in groups of 100
+rows, releasing the GIL like a network call). With prefetch the next part
+file is parsed during those pauses.
+
+Usage (from the directory that contains the package):
+    python -m package.benchmarks.bench_record_sources --records 200000 --parts 100
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from ..util.json_parts import load_dataset
+from ..util.record_sources import ExcelSource, JsonPartSource
+from .synthetic import write_part_set
+
+DATASET = "conjunto_componente"
+
+
+def _consume(rows, send_cost: float) -> int:
+    count = 0
+    for count, _ in enumerate(rows, 1):
+        if send_cost and count % 100 == 0:
+            time.sleep(send_cost * 100)
+    return count
+
+
+def _via_excel(data_dir: str, folder: str):
+    import pandas as pd
+
+    # Same steps as create.py followed by list_values reading values.xlsx
+    path = os.path.join(folder, "output.xlsx")
+    pd.DataFrame(load_dataset(DATASET, data_dir, workers=1).to_dict()).to_excel(path, index=False)
+    return ExcelSource(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--records", type=int, default=200_000)
+    parser.add_argument("--parts", type=int, default=100)
+    parser.add_argument("--send-cost", type=float, default=20,
+                        help="microssegundos de envio simulado por linha (0 desliga)")
+    args = parser.parse_args()
+    send_cost = args.send_cost / 1e6
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        write_part_set(data_dir, DATASET, args.records, args.parts)
+        runs = [
+            ("json direto", lambda: JsonPartSource(DATASET, data_dir)),
+            ("json sem prefetch", lambda: JsonPartSource(DATASET, data_dir, prefetch_parts=0)),
+            ("xlsx (create.py)", lambda: _via_excel(data_dir, data_dir)),
+        ]
+        print(f"{args.records} registros em {args.parts} partes; envio simulado de "
+              f"{args.send_cost:.0f} µs por linha ({args.records * send_cost:.1f}s no total).")
+        print(f"{'caminho':>18} {'preparo':>9} {'1ª linha':>9} {'total':>9} {'linhas':>9}")
+        for name, open_rows in runs:
+            start = time.perf_counter()
+            source = open_rows()
+            prepared = time.perf_counter() - start
+            rows = iter(source)
+            first = next(rows)
+            first_row = time.perf_counter() - start
+            count = 1 + _consume(rows, send_cost) if first else 0
+            elapsed = time.perf_counter() - start
+            print(f"{name:>18} {prepared:>8.2f}s {first_row:>8.2f}s {elapsed:>8.2f}s {count:>9}")
+
+
+if __name__ == "__main__":
+    main()
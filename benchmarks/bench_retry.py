@@ -0,0 +1,57 @@
+"""
+Exercise of the WebService retry policy against a local stub server that
+injects 429/503 responses.
+
+Without a policy the injected errors are lost; with it every value should
+end up created, with the circuit breaker pausing the workers on overload.
+
+Usage (from the directory that contains the package):
+    python -m package.benchmarks.bench_retry --values 500 --error-rate 0.2
+"""
+
+import argparse
+import concurrent.futures
+import time
+
+from ..config.batch_transport import FieldValue, PerValueTransport
+from ..config.retry import CircuitBreaker, RetryPolicy
+from ..config.web_service import WebService
+from .stub_server import StubServer
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--values", type=int, default=500)
+    parser.add_argument("--error-rate", type=float, default=0.2)
+    parser.add_argument("--retry-after", type=float, default=None,
+                        help="valor do cabeçalho Retry-After enviado com os erros")
+    parser.add_argument("--workers", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.005)
+    args = parser.parse_args()
+
+    print(f"{'política':>9} {'criados':>8} {'falhas':>7} {'erros inj.':>11} "
+          f"{'pausas':>7} {'tempo':>8}")
+    for with_policy in (False, True):
+        with StubServer(latency=args.latency, error_rate=args.error_rate,
+                        retry_after=args.retry_after) as stub:
+            policy = None
+            if with_policy:
+                policy = RetryPolicy(max_retries=8, backoff_base=0.05, backoff_max=2.0,
+                                     circuit_breaker=CircuitBreaker(cooldown=0.5))
+            service = WebService("Basic x", "application/json", per_second=1000,
+                                 retry_policy=policy)
+            transport = PerValueTransport(service, stub.url)
+            start = time.perf_counter()
+            with concurrent.futures.ThreadPoolExecutor(max_workers=args.workers) as executor:
+                results = list(executor.map(
+                    lambda i: transport.send_one("1", "campo", FieldValue(f"V{i}")),
+                    range(args.values)))
+            elapsed = time.perf_counter() - start
+            ok = sum(1 for result in results if result.ok)
+            trips = policy.circuit_breaker.trips if policy else 0
+            print(f"{'sim' if with_policy else 'não':>9} {ok:>8} {len(results) - ok:>7} "
+                  f"{stub.error_count:>11} {trips:>7} {elapsed:>7.2f}s")
+
+
+if __name__ == "__main__":
+    main()
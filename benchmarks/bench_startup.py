@@ -0,0 +1,100 @@
+"""
+Startup-time regression check for the command-line scripts.
+
+Each module is imported in a fresh interpreter with `python -X importtime`;
+the report shows the cumulative import time of the module and its slowest
+dependencies, and whether any heavy dependency (pandas, openpyxl, requests,
+requests_ratelimiter, aiohttp) was loaded. The exit status is 1 if a module
+takes longer than --max-ms or loads a heavy dependency.
+
+Usage (from the directory that contains the package):
+    python -m package.benchmarks.bench_startup --max-ms 150
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+HEAVY = ("pandas", "openpyxl", "requests", "requests_ratelimiter", "aiohttp", "numpy")
+
+
+def _import_times(module: str, cwd: str) -> dict:
+    """
+    Returns the cumulative import time, in ms, of `module` and of every module
+    it imported (interpreter startup imports such as site are left out).
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=cwd, capture_output=True, text=True, check=True)
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if not cumulative.strip().isdigit():
+            continue
+        times[name.strip()] = int(cumulative) / 1000
+        # Nested imports are printed before their parent, indented
+        if not name[1:].startswith(" "):
+            if name.strip() == module:
+                return times
+            times = {}
+    return times
+
+
+def _loaded_heavy(module: str, cwd: str) -> list:
+    code = (f"import sys, {module}; "
+            f"print(','.join(m for m in {HEAVY!r} if m in sys.modules))")
+    result = subprocess.run([sys.executable, "-c", code], cwd=cwd,
+                            capture_output=True, text=True, check=True)
+    return [name for name in result.stdout.strip().split(",") if name]
+
+
+def _help_time(module: str, cwd: str) -> float:
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-m", module, "--help"], cwd=cwd,
+                   capture_output=True, check=True)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--modules", nargs="+",
+                        default=["package.scripts.list_values", "package.config.factory"])
+    parser.add_argument("--max-ms", type=float, default=150,
+                        help="tempo máximo de importação por módulo, em ms")
+    parser.add_argument("--top", type=int, default=5)
+    args = parser.parse_args()
+
+    package_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    parent = os.path.dirname(package_dir)
+    failed = False
+    # Um diretório vazio garante que nenhum arquivo (log, .env) é criado ou lido por engano
+    with tempfile.TemporaryDirectory() as cwd:
+        env_path = os.pathsep.join(filter(None, [parent, os.environ.get("PYTHONPATH")]))
+        os.environ["PYTHONPATH"] = env_path
+        for module in args.modules:
+            times = _import_times(module, cwd)
+            total = times.get(module, 0.0)
+            heavy = _loaded_heavy(module, cwd)
+            status = "ok" if total <= args.max_ms and not heavy else "FALHOU"
+            failed = failed or status != "ok"
+            print(f"{module}: {total:.1f} ms ({status})")
+            if heavy:
+                print(f"  dependências pesadas carregadas: {', '.join(heavy)}")
+            slowest = sorted(((ms, name) for name, ms in times.items() if name != module), reverse=True)
+            for ms, name in slowest[:args.top]:
+                print(f"  {ms:>8.1f} ms  {name}")
+        print(f"list_values --help: {_help_time('package.scripts.list_values', cwd) * 1000:.0f} ms")
+        files = os.listdir(cwd)
+        if files:
+            failed = True
+            print(f"arquivos criados na importação: {', '.join(files)}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
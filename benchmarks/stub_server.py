@@ -0,0 +1,447 @@
+"""
+This module provides a local stub HTTP server that mimics the greendocs
+fieldValues endpoint, so upload throughput can be measured offline.
+
+It can also run on its own, as a mock server for list_values --server:
+    python -m package.benchmarks.stub_server --port 8080 --latency lognormal:0.02,0.5
+"""
+
+import argparse
+import json
+import math
+import os
+import random
+import ssl
+import subprocess
+import sys
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Union
+from urllib.parse import parse_qs
+
+Latency = Union[float, str, Callable[[random.Random], float]]
+
+
+def latency_sampler(spec: Latency) -> Callable[[random.Random], float]:
+    """
+    Builds the function that draws the delay of each request.
+
+    Args:
+        spec: Seconds (fixed delay), a function of a random.Random, or one of
+            'fixed:S', 'uniform:MIN,MAX', 'exponential:MEAN' and
+            'lognormal:MEDIAN,SIGMA' (a long tail, as seen on real servers).
+
+    Returns:
+        Callable[[random.Random], float]: Returns a delay in seconds.
+    """
+    if callable(spec):
+        return spec
+    if not isinstance(spec, str):
+        delay = float(spec)
+        return lambda rng: delay
+    kind, _, values = spec.partition(":")
+    if not values:
+        kind, values = "fixed", kind
+    try:
+        numbers = [float(value) for value in values.split(",")]
+        if kind == "fixed" and len(numbers) == 1:
+            delay = numbers[0]
+            return lambda rng: delay
+        if kind == "uniform" and len(numbers) == 2:
+            low, high = numbers
+            return lambda rng: rng.uniform(low, high)
+        if kind == "exponential" and len(numbers) == 1:
+            rate = 1 / numbers[0] if numbers[0] > 0 else math.inf
+            return lambda rng: rng.expovariate(rate) if rate != math.inf else 0.0
+        if kind == "lognormal" and len(numbers) == 2:
+            mu, sigma = math.log(numbers[0]), numbers[1]
+            return lambda rng: rng.lognormvariate(mu, sigma)
+    except ValueError:
+        pass
+    raise ValueError(f"invalid latency: {spec!r} (use S, fixed:S, uniform:MIN,MAX, "
+                     f"exponential:MEAN or lognormal:MEDIAN,SIGMA)")
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    """
+    Answers every POST with a small JSON body after a delay.
+
+    POSTs to a path ending in /batch are treated as bulk requests: the JSON body
+    must hold a "valores" list and the answer is one status entry per value.
+    A fraction of the requests can be answered with an injected error status,
+    requests above the capacity (requests per second) get a 429 and POSTs
+    above max_in_flight concurrent requests get a 503. The delay of each
+    answer is drawn from the latency distribution.
+
+    Created values are kept, and a GET lists them one page at a time as
+    [{"id", "valor", "sigla", "idPai"}, ...], filtered by the optional valor
+    and idPai parameters (pagina starts at 1, tamanhoPagina defaults to 500).
+    """
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_POST(self) -> None:
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length) if length else b""
+        with self.server.in_flight():
+            self._post(raw)
+
+    def _post(self, raw: bytes) -> None:
+        if self._inject_error():
+            return
+        path, _, query = self.path.partition("?")
+        if path.endswith("/batch"):
+            values = json.loads(raw or b"{}").get("valores", [])
+            self.server.wait(self.server.per_item_latency * len(values))
+            payload = [{"status": 201, "id": self._next_id(value)} for value in values]
+        else:
+            self.server.wait(self.server.per_item_latency)
+            params = {key: values[0] for key, values in parse_qs(query).items()}
+            payload = {"id": self._next_id(params)}
+        self._send_json(201, payload)
+
+    def do_GET(self) -> None:
+        if self._inject_error():
+            return
+        self.server.wait()
+        params = {key: values[0] for key, values in parse_qs(self.path.partition("?")[2]).items()}
+        page = max(int(params.get("pagina", 1)), 1)
+        size = max(int(params.get("tamanhoPagina", 500)), 1)
+        with self.server.counter_lock:
+            self.server.list_count += 1
+            if "valor" in params:
+                matches = self.server.by_value.get(params["valor"], [])
+            else:
+                matches = self.server.values
+            if "idPai" in params:
+                matches = [entry for entry in matches if entry.get("idPai") == params["idPai"]]
+            payload = matches[(page - 1) * size:page * size]
+        self._send_json(200, payload)
+
+    def _send_json(self, status: int, payload) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _inject_error(self) -> bool:
+        server = self.server
+        with server.counter_lock:
+            if server.capacity:
+                now = time.monotonic()
+                while server.recent and server.recent[0] <= now - 1:
+                    server.recent.popleft()
+                over_capacity = len(server.recent) >= server.capacity
+                if not over_capacity:
+                    server.recent.append(now)
+            else:
+                over_capacity = False
+            if over_capacity:
+                status = 429
+                server.throttled_count += 1
+            elif server.max_in_flight and server.active > server.max_in_flight:
+                status = 503
+            elif server.error_rate and server.random.random() < server.error_rate:
+                status = server.random.choice(server.error_statuses)
+            else:
+                return False
+            server.error_count += 1
+        server.wait()
+        self.send_response(status)
+        if server.retry_after is not None:
+            self.send_header("Retry-After", str(server.retry_after))
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+        return True
+
+    def _next_id(self, value: dict = None) -> int:
+        with self.server.counter_lock:
+            self.server.request_count += 1
+            if value is not None:
+                self.server.store(value, self.server.request_count)
+            return self.server.request_count
+
+    def log_message(self, format, *args) -> None:
+        # Silencia o log padrão de cada requisição
+        pass
+
+
+class _StubHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # Backlog maior para dezenas de workers conectando ao mesmo tempo
+    request_queue_size = 128
+
+    def wait(self, extra: float = 0.0) -> None:
+        delay = self.latency_sampler(self.latency_random) + extra
+        if delay > 0:
+            time.sleep(delay)
+
+    def in_flight(self) -> "_InFlight":
+        return _InFlight(self)
+
+    def handle_error(self, request, client_address) -> None:
+        # Um cliente que desistiu da resposta (timeout) não é um erro do servidor
+        if not isinstance(sys.exc_info()[1], (BrokenPipeError, ConnectionResetError)):
+            super().handle_error(request, client_address)
+
+    def store(self, value: dict, value_id: int) -> None:
+        if not self.keep_values:
+            return
+        entry = {"id": value_id, "valor": value.get("valor"), "sigla": value.get("sigla"),
+                 "idPai": value.get("idPai")}
+        self.values.append(entry)
+        self.by_value.setdefault(entry["valor"], []).append(entry)
+
+
+class _InFlight:
+    # Counts the POSTs being answered, for max_in_flight and the peak
+
+    def __init__(self, server: _StubHTTPServer) -> None:
+        self.server = server
+
+    def __enter__(self) -> None:
+        server = self.server
+        with server.counter_lock:
+            server.active += 1
+            server.peak_in_flight = max(server.peak_in_flight, server.active)
+
+    def __exit__(self, *exc_info) -> None:
+        with self.server.counter_lock:
+            self.server.active -= 1
+
+
+class StubServer:
+    """Runs the stub server in a background thread."""
+
+    def __init__(self, latency: Latency = 0.02, per_item_latency: float = 0.0,
+                 error_rate: float = 0.0, error_statuses=(429, 503), retry_after=None,
+                 capacity: int = 0, seed: int = 0, certfile: str = None, keyfile: str = None,
+                 host: str = "127.0.0.1", port: int = 0, max_in_flight: int = 0,
+                 keep_values: bool = True):
+        """
+        Initializes the stub server.
+
+        Args:
+            latency (Latency): Delay before answering each request: seconds or
+                a distribution, see latency_sampler.
+            per_item_latency (float): Extra seconds per value in the request.
+            error_rate (float): Fraction of requests answered with an error.
+            error_statuses (tuple): Statuses picked for the injected errors.
+            retry_after: Value of the Retry-After header sent with errors, if any.
+            capacity (int): Requests per second accepted before answering 429,
+                0 for no limit.
+            seed (int): Seed of the error injection.
+            certfile (str): Certificate to serve HTTPS with, None for plain HTTP.
+            keyfile (str): Private key of the certificate.
+            host (str): Interface to bind.
+            port (int): Port to bind, 0 picks a free one.
+            max_in_flight (int): Concurrent POSTs answered before answering
+                503, 0 for no limit.
+            keep_values (bool): Keep the created values for the GET listing;
+                load tests of millions of values only need them counted.
+        """
+        self.httpd = _StubHTTPServer((host, port), _StubHandler)
+        self.tls = certfile is not None
+        if self.tls:
+            context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+            context.load_cert_chain(certfile, keyfile)
+            # O handshake acontece na thread de cada conexão, não no accept
+            self.httpd.socket = context.wrap_socket(
+                self.httpd.socket, server_side=True, do_handshake_on_connect=False)
+        self.httpd.latency_sampler = latency_sampler(latency)
+        self.httpd.latency_random = random.Random(seed + 1)
+        self.httpd.per_item_latency = per_item_latency
+        self.httpd.error_rate = error_rate
+        self.httpd.error_statuses = tuple(error_statuses)
+        self.httpd.retry_after = retry_after
+        self.httpd.random = random.Random(seed)
+        self.httpd.error_count = 0
+        self.httpd.capacity = capacity
+        self.httpd.max_in_flight = max_in_flight
+        self.httpd.active = 0
+        self.httpd.peak_in_flight = 0
+        self.httpd.throttled_count = 0
+        self.httpd.recent = deque()
+        self.httpd.request_count = 0
+        self.httpd.list_count = 0
+        self.httpd.keep_values = keep_values
+        self.httpd.values = []
+        self.httpd.by_value = {}
+        self.httpd.counter_lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        """
+        Get the base URL of the server, in the same format as BaseUrl.get_url().
+
+        Returns:
+            The base URL, ending with a slash.
+        """
+        host, port = self.httpd.server_address[:2]
+        scheme = "https" if self.tls else "http"
+        return f"{scheme}://{host}:{port}/"
+
+    @property
+    def request_count(self) -> int:
+        """
+        Get the number of values created so far.
+
+        Returns:
+            The value count.
+        """
+        return self.httpd.request_count
+
+    @property
+    def list_count(self) -> int:
+        """
+        Get the number of GET (list or lookup) requests answered so far.
+
+        Returns:
+            The GET count.
+        """
+        return self.httpd.list_count
+
+    @property
+    def values(self) -> list:
+        """
+        Get the values created so far.
+
+        Returns:
+            One {"id", "valor", "sigla", "idPai"} entry per value, in creation order.
+        """
+        return self.httpd.values
+
+    @property
+    def error_count(self) -> int:
+        """
+        Get the number of injected errors so far.
+
+        Returns:
+            The error count.
+        """
+        return self.httpd.error_count
+
+    def stats(self) -> dict:
+        """
+        Get the server-side counters.
+
+        Returns:
+            dict: created (values), lists (GETs), errors (injected errors,
+            429 and 503 included), throttled (429 over capacity) and
+            peak_in_flight (most POSTs answered at the same time).
+        """
+        httpd = self.httpd
+        with httpd.counter_lock:
+            return {"created": httpd.request_count, "lists": httpd.list_count,
+                    "errors": httpd.error_count, "throttled": httpd.throttled_count,
+                    "peak_in_flight": httpd.peak_in_flight}
+
+    def preload(self, values) -> int:
+        """
+        Stores values as if they had been created before the run.
+
+        Args:
+            values: {"valor", "sigla", "idPai"} dictionaries.
+
+        Returns:
+            The number of values stored.
+        """
+        count = 0
+        with self.httpd.counter_lock:
+            for value in values:
+                self.httpd.request_count += 1
+                self.httpd.store(value, self.httpd.request_count)
+                count += 1
+        return count
+
+    def start(self) -> "StubServer":
+        """
+        Starts serving in a daemon thread.
+
+        Returns:
+            The server itself.
+        """
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """
+        Stops the server and releases the socket.
+        """
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self) -> "StubServer":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+
+def generate_self_signed_cert(directory: str, host: str = "127.0.0.1") -> tuple:
+    """
+    Generates a self-signed certificate for the stub server with openssl.
+
+    Clients can trust it by pointing REQUESTS_CA_BUNDLE at the certificate.
+
+    Args:
+        directory (str): Where to write the files.
+        host (str): IP address the certificate is valid for.
+
+    Returns:
+        tuple: (certfile, keyfile).
+    """
+    certfile = os.path.join(directory, "stub.crt")
+    keyfile = os.path.join(directory, "stub.key")
+    subprocess.run(
+        ["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "1",
+         "-keyout", keyfile, "-out", certfile, "-subj", f"/CN={host}",
+         "-addext", f"subjectAltName=IP:{host}"],
+        check=True, capture_output=True)
+    return certfile, keyfile
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor local que imita o endpoint fieldValues.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency", default="0.02",
+                        help="atraso de cada resposta: segundos ou uniform:MIN,MAX, exponential:MÉDIA, "
+                             "lognormal:MEDIANA,SIGMA")
+    parser.add_argument("--per-item-latency", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-statuses", type=int, nargs="+", default=[429, 503])
+    parser.add_argument("--retry-after", default=None)
+    parser.add_argument("--capacity", type=int, default=0,
+                        help="requisições/s aceitas antes de responder 429 (0 = sem limite)")
+    parser.add_argument("--max-in-flight", type=int, default=0,
+                        help="POSTs simultâneos aceitos antes de responder 503 (0 = sem limite)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    try:
+        stub = StubServer(latency=args.latency, per_item_latency=args.per_item_latency,
+                          error_rate=args.error_rate, error_statuses=args.error_statuses,
+                          retry_after=args.retry_after, capacity=args.capacity, seed=args.seed,
+                          host=args.host, port=args.port, max_in_flight=args.max_in_flight)
+    except ValueError as e:
+        parser.error(str(e))
+    print(f"Servidor de teste em {stub.url} (Ctrl+C para parar).")
+    with stub:
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
+    print(" ".join(f"{name}={value}" for name, value in stub.stats().items()))
+
+
+if __name__ == "__main__":
+    main()
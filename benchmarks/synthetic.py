@@ -0,0 +1,74 @@
+"""
+This module generates synthetic input files (values.xlsx-like workbooks and
+JSON part sets) for the benchmarks.
+"""
+
+import json
+import os
+
+from openpyxl import Workbook
+
+
+def synthetic_rows(rows: int, parents: int = 500):
+    """
+    Yields synthetic (valor, sigla, filtro) rows.
+
+    Args:
+        rows (int): Number of rows to generate.
+        parents (int): Number of distinct parent codes (filtro).
+    """
+    for i in range(rows):
+        yield (f"VALOR {i}", f"S{i % 97}", f"P{i % parents:04d}")
+
+
+def write_values_workbook(path: str, rows: int, parents: int = 500, extra_columns: int = 0) -> str:
+    """
+    Writes a workbook with the valor/sigla/filtro columns used by list_values.
+
+    Args:
+        path (str): Destination file.
+        rows (int): Number of data rows.
+        parents (int): Number of distinct parent codes (filtro).
+        extra_columns (int): Number of unused text columns added after filtro.
+
+    Returns:
+        str: The path of the written file.
+    """
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    extra = tuple(f"extra_{index}" for index in range(extra_columns))
+    sheet.append(("valor", "sigla", "filtro") + extra)
+    for i, row in enumerate(synthetic_rows(rows, parents)):
+        sheet.append(row + tuple(f"{name} {i}" for name in extra))
+    workbook.save(path)
+    return path
+
+
+def write_part_set(directory: str, dataset: str, records: int, parts: int,
+                   parents: int = 500) -> str:
+    """
+    Writes a JSON part set in the same layout as data/<dataset>/<dataset>_partN.json.
+
+    Args:
+        directory (str): The data folder; the dataset subfolder is created in it.
+        dataset (str): The dataset name, e.g. 'conjunto_componente'.
+        records (int): Total number of records, spread evenly over the parts.
+        parts (int): Number of part files.
+        parents (int): Number of distinct parent codes (filtro).
+
+    Returns:
+        str: The dataset folder.
+    """
+    folder = os.path.join(directory, dataset)
+    os.makedirs(folder, exist_ok=True)
+    per_part = -(-records // parts)
+    for part in range(parts):
+        start = part * per_part
+        stop = min(records, start + per_part)
+        content = {
+            str(i + 1): {dataset: {"filtro": f"P{i % parents:04d}", "valor": f"VALOR {i}"}}
+            for i in range(start, stop)
+        }
+        with open(os.path.join(folder, f"{dataset}_part{part + 1}.json"), "w", encoding="utf-8") as file:
+            json.dump(content, file, indent=4)
+    return folder
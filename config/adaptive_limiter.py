@@ -0,0 +1,135 @@
+"""
+This module provides the AdaptiveRateLimiter class, an AIMD rate limiter that
+tunes the request rate from the observed latency and status codes.
+"""
+
+import threading
+import time
+from collections import deque
+
+
+class AdaptiveRateLimiter:
+    """
+    Token bucket whose rate follows an AIMD (additive increase, multiplicative
+    decrease) rule.
+
+    While responses are healthy the rate grows by about `increase_step`
+    requests per second for every second of traffic. A throttling or server
+    error status (429/5xx), or a latency spike above `latency_factor` times the
+    moving average, multiplies the rate by `decrease_factor`. Decreases are
+    spaced by `decrease_cooldown` seconds so a burst of errors from requests
+    already in flight counts as a single signal. The rate always stays within
+    [min_rate, max_rate].
+    """
+
+    def __init__(self, initial_rate: float, min_rate: float, max_rate: float,
+                 increase_step: float = 5.0, decrease_factor: float = 0.7,
+                 latency_factor: float = 3.0, decrease_cooldown: float = 1.0,
+                 history_size: int = 100) -> None:
+        """
+        Initialize the limiter.
+
+        Args:
+            initial_rate: Starting rate, in requests per second.
+            min_rate: Lowest rate the limiter may reach.
+            max_rate: Highest rate the limiter may reach.
+            increase_step: Requests per second added per second of healthy traffic.
+            decrease_factor: Multiplier applied to the rate on a bad signal.
+            latency_factor: Latency, relative to the moving average, treated as a spike.
+            decrease_cooldown: Minimum seconds between two decreases.
+            history_size: Number of recent adjustments kept for the metrics.
+        """
+        if not 0 < min_rate <= max_rate:
+            raise ValueError("rate bounds must satisfy 0 < min_rate <= max_rate")
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.rate = min(max(initial_rate, min_rate), max_rate)
+        self.increase_step = increase_step
+        self.decrease_factor = decrease_factor
+        self.latency_factor = latency_factor
+        self.decrease_cooldown = decrease_cooldown
+        self.increases = 0
+        self.decreases = 0
+        self.adjustments = deque(maxlen=history_size)
+        self._latency_avg = None
+        self._samples = 0
+        self._tokens = 1.0
+        self._updated = time.monotonic()
+        self._last_decrease = 0.0
+        self._last_logged_rate = self.rate
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """
+        Block until a request may be sent at the current rate.
+        """
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(1.0, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+    def record(self, status_code: int, latency: float) -> None:
+        """
+        Feed the outcome of a request back into the limiter.
+
+        Args:
+            status_code: HTTP status of the response.
+            latency: Seconds the request took.
+        """
+        with self._lock:
+            spike = (self._samples >= 20 and self._latency_avg is not None
+                     and latency > self._latency_avg * self.latency_factor)
+            # Only normal responses feed the average, so a spike does not become the baseline
+            if not spike:
+                self._latency_avg = latency if self._latency_avg is None else (
+                    0.9 * self._latency_avg + 0.1 * latency)
+                self._samples += 1
+
+            if status_code == 429 or status_code >= 500:
+                self._decrease(f"status {status_code}")
+            elif spike:
+                self._decrease(f"latency {latency * 1000:.0f} ms")
+            elif status_code < 400 and self.rate < self.max_rate:
+                # About +increase_step per second of traffic: each response adds step/rate
+                self.rate = min(self.max_rate, self.rate + self.increase_step / self.rate)
+                self.increases += 1
+                if self.rate - self._last_logged_rate >= 1 or self.rate == self.max_rate:
+                    self._log("increase")
+
+    def metrics(self) -> dict:
+        """
+        Get the current rate and the adjustment counters.
+
+        Returns:
+            A dictionary with the rate, its bounds, the counters and the
+            recent adjustments as (timestamp, rate, reason) tuples.
+        """
+        with self._lock:
+            return {
+                "rate": round(self.rate, 2),
+                "min_rate": self.min_rate,
+                "max_rate": self.max_rate,
+                "increases": self.increases,
+                "decreases": self.decreases,
+                "latency_avg": self._latency_avg,
+                "adjustments": list(self.adjustments),
+            }
+
+    def _decrease(self, reason: str) -> None:
+        now = time.monotonic()
+        if now - self._last_decrease < self.decrease_cooldown:
+            return
+        self._last_decrease = now
+        self.rate = max(self.min_rate, self.rate * self.decrease_factor)
+        self.decreases += 1
+        self._log(reason)
+
+    def _log(self, reason: str) -> None:
+        self._last_logged_rate = self.rate
+        self.adjustments.append((time.time(), round(self.rate, 2), reason))
@@ -0,0 +1,152 @@
+"""
+This module provides the asyncio counterpart of WebService: an aiohttp client
+with a token-bucket rate limiter and bounded in-flight concurrency.
+"""
+
+import asyncio
+import json
+import time
+
+import aiohttp
+
+
+class AsyncRateLimiter:
+    """
+    Async token bucket that lets at most `per_second` requests through per second.
+    """
+
+    def __init__(self, per_second: float, burst: int = 1) -> None:
+        """
+        Initialize the limiter.
+
+        Args:
+            per_second: Sustained number of requests per second.
+            burst: Number of requests that may go out back to back.
+        """
+        self.per_second = per_second
+        self.capacity = max(1, burst)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        """
+        Wait until a token is available and take it.
+
+        Waiters are served in arrival order.
+        """
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity,
+                                   self._tokens + (now - self._updated) * self.per_second)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.per_second)
+
+
+class AsyncResponse:
+    """The parts of an aiohttp response that outlive the connection."""
+
+    def __init__(self, status_code: int, headers, text: str) -> None:
+        self.status_code = status_code
+        self.headers = headers
+        self.text = text
+
+    def json(self):
+        """
+        Decode the body as JSON.
+
+        Returns:
+            The decoded body.
+        """
+        return json.loads(self.text)
+
+
+class AsyncWebService:
+    """
+    Async client with the same interface as WebService.
+
+    Use it as an async context manager so the aiohttp session is opened and
+    closed on the running event loop.
+    """
+
+    def __init__(self, authorization, content_type, per_second=120, max_in_flight=10,
+                 retry_policy=None):
+        self.limiter = AsyncRateLimiter(per_second)
+        # RetryPolicy opcional, a mesma usada pelo WebService
+        self.retry_policy = retry_policy
+        self.max_in_flight = max_in_flight
+        self.headers = {
+            "Authorization": authorization,
+            "Content-Type": content_type,
+        }
+        self.session = None
+        self._in_flight = None
+
+    async def __aenter__(self):
+        connector = aiohttp.TCPConnector(limit=self.max_in_flight)
+        self.session = aiohttp.ClientSession(connector=connector)
+        self._in_flight = asyncio.Semaphore(self.max_in_flight)
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.session.close()
+
+    async def request(self, url, method, body="", headers={}):
+        all_headers = {k: v for k, v in self.headers.items() if v is not None}
+        all_headers.update(headers)
+
+        policy = self.retry_policy
+        attempt = 0
+        while True:
+            while policy and policy.circuit_breaker.remaining() > 0:
+                await asyncio.sleep(policy.circuit_breaker.remaining())
+            try:
+                async with self._in_flight:
+                    await self.limiter.acquire()
+                    async with self.session.request(
+                            method, url, headers=all_headers, data=body) as raw:
+                        response = AsyncResponse(raw.status, raw.headers.copy(), await raw.text())
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                # Mesma regra do WebService: POST só é repetido se a conexão nem foi aberta
+                if not policy or not policy.should_retry_exception(method, e, attempt):
+                    raise
+                policy.circuit_breaker.record_failure()
+                await asyncio.sleep(policy.delay(attempt))
+                attempt += 1
+                continue
+
+            if policy and policy.should_retry_status(method, response.status_code, attempt):
+                delay = policy.delay(attempt, response.headers)
+                if response.status_code in policy.overload_statuses:
+                    policy.circuit_breaker.trip(delay)
+                else:
+                    policy.circuit_breaker.record_failure()
+                    await asyncio.sleep(delay)
+                attempt += 1
+                continue
+
+            if policy and response.status_code < 400:
+                policy.circuit_breaker.record_success()
+            break
+
+        return self.handle_response(response)
+
+    def handle_response(self, response):
+        if response.status_code >= 400:
+            self.handle_error(response)
+        return response
+
+    def handle_error(self, response):
+        # Sem tratamento padrão: a resposta volta a quem chamou, que decide
+        # pelo status_code
+        pass
+
+
+class MyAsyncWebService(AsyncWebService):
+    def handle_error(self, response):
+        # Lógica específica para tratar erros
+        print(f"Ocorreu um erro: {response.status_code}")
@@ -0,0 +1,226 @@
+"""
+This module provides the transports used to send batches of field values to
+the fieldValues API, with per-item success or failure reporting.
+"""
+
+import json
+from typing import Any, Iterator, List, NamedTuple, Optional
+from urllib.parse import urlencode
+
+FIELD_VALUES_ENDPOINT = "api/v2/fieldValues"
+
+
+class FieldValue(NamedTuple):
+    """A single field value to be created under an optional parent."""
+
+    value: str
+    acronym: Optional[str] = None
+    parent_id: Optional[str] = None
+
+    def to_params(self, env_id: str, field_name: str) -> dict:
+        """
+        Build the fieldValues parameters for this value, without empty entries.
+
+        Args:
+            env_id: Environment ID.
+            field_name: Field name.
+
+        Returns:
+            The request parameters.
+        """
+        params = {
+            "idAmbiente": env_id,
+            "nome": field_name,
+            "valor": self.value,
+            "sigla": self.acronym,
+            "idPai": self.parent_id
+        }
+        return {k: v for k, v in params.items() if v}
+
+
+class ItemResult(NamedTuple):
+    """The outcome of sending one field value."""
+
+    item: FieldValue
+    ok: bool
+    status_code: Optional[int] = None
+    error: Optional[str] = None
+    response: Optional[Any] = None
+
+
+def _json_or_none(response) -> Optional[Any]:
+    content_type = response.headers.get('Content-Type')
+    if content_type and 'application/json' in content_type:
+        try:
+            return response.json()
+        except ValueError:
+            return None
+    return None
+
+
+class BatchTransport:
+    """Interface of a transport that sends a batch of field values."""
+
+    def send_batch(self, env_id: str, field_name: str, items: List[FieldValue]) -> List[ItemResult]:
+        """
+        Send a batch of field values.
+
+        Args:
+            env_id: Environment ID.
+            field_name: Field name.
+            items: The values to send.
+
+        Returns:
+            One ItemResult per item, in the same order.
+        """
+        raise NotImplementedError
+
+
+class PerValueTransport(BatchTransport):
+    """
+    Fallback transport for servers without a bulk endpoint: one POST per value,
+    with the parameters in the query string.
+    """
+
+    def __init__(self, web_service, server: str):
+        """
+        Initialize the transport.
+
+        Args:
+            web_service: The WebService used to send the requests.
+            server: Server URL, as returned by ServiceConfig.get_server().
+        """
+        self.web_service = web_service
+        self.url = f"{server}{FIELD_VALUES_ENDPOINT}"
+
+    def send_one(self, env_id: str, field_name: str, item: FieldValue) -> ItemResult:
+        """
+        Send a single field value.
+
+        Args:
+            env_id: Environment ID.
+            field_name: Field name.
+            item: The value to send.
+
+        Returns:
+            The result of the request.
+        """
+        import requests
+
+        full_url = f"{self.url}?{urlencode(item.to_params(env_id, field_name))}"
+        try:
+            response = self.web_service.request(full_url, method="POST")
+            response.raise_for_status()
+        except requests.exceptions.RequestException as e:
+            status = getattr(e.response, 'status_code', None)
+            return ItemResult(item, False, status, str(e))
+        except Exception as e:
+            return ItemResult(item, False, None, str(e))
+        return ItemResult(item, True, response.status_code, None, _json_or_none(response))
+
+    def send_batch(self, env_id: str, field_name: str, items: List[FieldValue]) -> List[ItemResult]:
+        return [self.send_one(env_id, field_name, item) for item in items]
+
+
+class BulkTransport(BatchTransport):
+    """
+    Transport that sends a whole batch in one JSON POST.
+
+    The request body is {"idAmbiente", "nome", "valores": [{"valor", "sigla",
+    "idPai"}, ...]}. The server is expected to answer with a JSON list holding
+    one {"status": ..., "erro": ...} entry per value, in order. If it answers
+    with anything else, every item fails, since it is unknown which values
+    were created.
+    """
+
+    def __init__(self, web_service, server: str, endpoint: str = f"{FIELD_VALUES_ENDPOINT}/batch"):
+        """
+        Initialize the transport.
+
+        Args:
+            web_service: The WebService used to send the requests.
+            server: Server URL, as returned by ServiceConfig.get_server().
+            endpoint: Path of the bulk endpoint, relative to the server URL.
+        """
+        self.web_service = web_service
+        self.url = f"{server}{endpoint}"
+
+    def send_batch(self, env_id: str, field_name: str, items: List[FieldValue]) -> List[ItemResult]:
+        import requests
+
+        body = json.dumps({
+            "idAmbiente": env_id,
+            "nome": field_name,
+            "valores": [
+                {k: v for k, v in (("valor", item.value), ("sigla", item.acronym),
+                                   ("idPai", item.parent_id)) if v}
+                for item in items
+            ],
+        })
+        try:
+            response = self.web_service.request(
+                self.url, method="POST", body=body,
+                headers={"Content-Type": "application/json"})
+            response.raise_for_status()
+        except requests.exceptions.RequestException as e:
+            status = getattr(e.response, 'status_code', None)
+            return [ItemResult(item, False, status, str(e)) for item in items]
+        except Exception as e:
+            return [ItemResult(item, False, None, str(e)) for item in items]
+
+        entries = _json_or_none(response)
+        if not isinstance(entries, list) or len(entries) != len(items):
+            error = f"unexpected bulk response: expected a list of {len(items)} entries"
+            return [ItemResult(item, False, response.status_code, error, entries) for item in items]
+
+        results = []
+        for item, entry in zip(items, entries):
+            status = entry.get("status", response.status_code) if isinstance(entry, dict) else response.status_code
+            try:
+                status = int(status)
+            except (TypeError, ValueError):
+                results.append(ItemResult(item, False, None, f"invalid status: {status!r}", entry))
+                continue
+            ok = status < 400
+            error = entry.get("erro") if isinstance(entry, dict) and not ok else None
+            results.append(ItemResult(item, ok, status, error, entry))
+        return results
+
+
+def iter_field_values(web_service, server: str, env_id: str, field_name: str,
+                      page_size: int = 500, **filters) -> Iterator[dict]:
+    """
+    Page through the existing values of a field.
+
+    Each page is one GET on the fieldValues endpoint with the pagina
+    (starting at 1) and tamanhoPagina parameters. The server may answer with
+    a list or with an object holding the list under "itens"; a page shorter
+    than `page_size` is the last one.
+
+    Args:
+        web_service: The WebService used to send the requests.
+        server: Server URL, as returned by ServiceConfig.get_server().
+        env_id: Environment ID.
+        field_name: Field name.
+        page_size: Values requested per page.
+        **filters: Extra query parameters, e.g. valor="ABP01".
+
+    Returns:
+        The values, as {"id", "valor", "sigla", "idPai"} dictionaries.
+    """
+    page = 1
+    while True:
+        params = {"idAmbiente": env_id, "nome": field_name, **filters,
+                  "pagina": page, "tamanhoPagina": page_size}
+        response = web_service.request(
+            f"{server}{FIELD_VALUES_ENDPOINT}?{urlencode(params)}", method="GET")
+        response.raise_for_status()
+        entries = _json_or_none(response)
+        if isinstance(entries, dict):
+            entries = entries.get("itens")
+        if not isinstance(entries, list):
+            return
+        yield from entries
+        if len(entries) < page_size:
+            return
+        page += 1
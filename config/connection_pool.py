@@ -0,0 +1,123 @@
+"""
+This module provides an instrumented requests adapter with explicit
+connection-pool sizing, and the counters of connection reuse and handshake time.
+"""
+
+import threading
+import time
+
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+
+class ConnectionStats:
+    """Thread-safe counters of requests, new connections and handshake time."""
+
+    def __init__(self) -> None:
+        self.requests = 0
+        self.connections = 0
+        self.handshake_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def record_request(self) -> None:
+        """
+        Count one request sent through the adapter.
+        """
+        with self._lock:
+            self.requests += 1
+
+    def record_connection(self, seconds: float) -> None:
+        """
+        Count one new connection.
+
+        Args:
+            seconds: Time spent on the TCP (and TLS, for HTTPS) handshake.
+        """
+        with self._lock:
+            self.connections += 1
+            self.handshake_seconds += seconds
+
+    def reuse_rate(self) -> float:
+        """
+        Get the fraction of requests served by an already open connection.
+
+        Returns:
+            A value between 0 and 1.
+        """
+        with self._lock:
+            if not self.requests:
+                return 0.0
+            return max(0.0, 1 - self.connections / self.requests)
+
+    def average_handshake(self) -> float:
+        """
+        Get the average handshake time of the new connections.
+
+        Returns:
+            Seconds per handshake, 0 if no connection was opened.
+        """
+        with self._lock:
+            return self.handshake_seconds / self.connections if self.connections else 0.0
+
+    def snapshot(self) -> dict:
+        """
+        Get every counter at once.
+
+        Returns:
+            A dictionary with the counters, the reuse rate and the average handshake.
+        """
+        return {
+            "requests": self.requests,
+            "connections": self.connections,
+            "reuse_rate": self.reuse_rate(),
+            "average_handshake": self.average_handshake(),
+        }
+
+
+def _timed(connection_cls, stats: ConnectionStats):
+    class TimedConnection(connection_cls):
+        def connect(self):
+            start = time.perf_counter()
+            super().connect()
+            stats.record_connection(time.perf_counter() - start)
+
+    return TimedConnection
+
+
+class PooledAdapter(HTTPAdapter):
+    """
+    HTTPAdapter with an explicit pool size that records connection statistics.
+
+    With `pool_block` (the default) a thread waits for a free connection when
+    the pool is exhausted, instead of opening a throwaway connection that is
+    closed right after the request. Size the pool to the number of workers so
+    every worker keeps its own keep-alive connection.
+    """
+
+    def __init__(self, pool_size: int = 10, pool_block: bool = True, stats: ConnectionStats = None,
+                 **kwargs) -> None:
+        """
+        Initialize the adapter.
+
+        Args:
+            pool_size: Maximum number of connections kept open per host.
+            pool_block: Whether to wait for a free connection when the pool is full.
+            stats: Counters to update. A new ConnectionStats is created if omitted.
+        """
+        self.stats = stats or ConnectionStats()
+        super().__init__(pool_connections=pool_size, pool_maxsize=pool_size,
+                         pool_block=pool_block, **kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": type("TimedHTTPConnectionPool", (HTTPConnectionPool,),
+                         {"ConnectionCls": _timed(HTTPConnection, self.stats)}),
+            "https": type("TimedHTTPSConnectionPool", (HTTPSConnectionPool,),
+                          {"ConnectionCls": _timed(HTTPSConnection, self.stats)}),
+        }
+
+    def send(self, request, *args, **kwargs):
+        self.stats.record_request()
+        return super().send(request, *args, **kwargs)
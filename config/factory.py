@@ -0,0 +1,74 @@
+"""
+This module provides the ServiceFactory class, which builds the service
+configuration and the web service on first use instead of at import time.
+"""
+
+import threading
+from typing import Callable, Optional
+
+from .service_config import ServiceConfig
+from .web_service import WebService
+
+
+class ServiceFactory:
+    """
+    Lazily built ServiceConfig and WebService.
+
+    Nothing is read from the environment and no HTTP session is created until
+    `config` or `web_service` is first accessed, so importing a script that
+    holds a factory (or running it with --help) stays fast.
+    """
+
+    def __init__(self, config_factory: Callable[[], ServiceConfig] = ServiceConfig,
+                 **web_service_options) -> None:
+        """
+        Initialize the factory.
+
+        Args:
+            config_factory: Builds the configuration. Defaults to ServiceConfig().
+            **web_service_options: Keyword arguments passed to WebService, e.g. retry_policy.
+        """
+        self.config_factory = config_factory
+        self.web_service_options = web_service_options
+        self._config: Optional[ServiceConfig] = None
+        self._web_service: Optional[WebService] = None
+        self._lock = threading.Lock()
+
+    @property
+    def config(self) -> ServiceConfig:
+        """
+        Get the service configuration, building it on first access.
+
+        Returns:
+            The configuration.
+        """
+        if self._config is None:
+            with self._lock:
+                if self._config is None:
+                    self._config = self.config_factory()
+        return self._config
+
+    @property
+    def web_service(self) -> WebService:
+        """
+        Get the web service, building it on first access.
+
+        Returns:
+            A WebService with the configured credentials and content type.
+        """
+        if self._web_service is None:
+            config = self.config
+            with self._lock:
+                if self._web_service is None:
+                    self._web_service = WebService(config.get_auth(), config.get_content_type(),
+                                                   **self.web_service_options)
+        return self._web_service
+
+    def is_built(self) -> bool:
+        """
+        Check whether anything was built yet.
+
+        Returns:
+            True once the configuration was requested.
+        """
+        return self._config is not None
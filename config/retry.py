@@ -0,0 +1,238 @@
+"""
+This module provides the retry policy and circuit breaker used by WebService
+to retry failed requests without hammering a throttled server.
+"""
+
+import asyncio
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+
+
+class CircuitBreaker:
+    """
+    Shared pause switch for every worker that uses the same WebService.
+
+    When the server says it is overloaded (429/503), or after
+    `failure_threshold` consecutive failures, the breaker opens and every
+    request waits until it closes again.
+    """
+
+    def __init__(self, failure_threshold: int = 5, cooldown: float = 10.0) -> None:
+        """
+        Initialize the breaker.
+
+        Args:
+            failure_threshold: Consecutive failures that open the breaker.
+            cooldown: Seconds the breaker stays open after too many failures.
+        """
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.trips = 0
+        self._failures = 0
+        self._open_until = 0.0
+        self._lock = threading.Lock()
+
+    def remaining(self) -> float:
+        """
+        Get how long the breaker stays open.
+
+        Returns:
+            Seconds until requests may go out again, 0 if closed.
+        """
+        with self._lock:
+            return max(0.0, self._open_until - time.monotonic())
+
+    def wait(self) -> None:
+        """
+        Block the calling thread while the breaker is open.
+        """
+        remaining = self.remaining()
+        while remaining > 0:
+            time.sleep(remaining)
+            remaining = self.remaining()
+
+    def trip(self, seconds: float) -> None:
+        """
+        Open the breaker for at least `seconds`.
+
+        Args:
+            seconds: How long to pause every worker.
+        """
+        with self._lock:
+            until = time.monotonic() + seconds
+            if until > self._open_until:
+                self._open_until = until
+                self.trips += 1
+
+    def record_success(self) -> None:
+        """
+        Reset the consecutive failure count.
+        """
+        with self._lock:
+            self._failures = 0
+
+    def record_failure(self) -> None:
+        """
+        Count a failure, opening the breaker once the threshold is reached.
+        """
+        with self._lock:
+            self._failures += 1
+            if self._failures < self.failure_threshold:
+                return
+            self._failures = 0
+        self.trip(self.cooldown)
+
+
+class RetryPolicy:
+    """
+    Decides whether and when a failed request is retried.
+
+    Delays grow exponentially with full jitter, capped at `backoff_max`. A
+    Retry-After header sent by the server takes precedence. Retries are
+    idempotency-aware: idempotent methods are retried on any retryable status
+    or connection error, while POST is only retried when the server certainly
+    did not process it (throttling statuses and failed connections).
+    """
+
+    def __init__(self, max_retries: int = 5, backoff_base: float = 0.5, backoff_max: float = 30.0,
+                 jitter: bool = True, retry_statuses=(429, 500, 502, 503, 504),
+                 non_idempotent_statuses=(429, 503), overload_statuses=(429, 503),
+                 circuit_breaker: Optional[CircuitBreaker] = None) -> None:
+        """
+        Initialize the policy.
+
+        Args:
+            max_retries: Maximum number of retries per request.
+            backoff_base: Delay of the first retry, in seconds.
+            backoff_max: Upper bound of any delay, in seconds.
+            jitter: Whether to randomize delays (full jitter).
+            retry_statuses: Statuses retried for idempotent methods.
+            non_idempotent_statuses: Statuses retried for non-idempotent methods.
+            overload_statuses: Statuses that open the circuit breaker.
+            circuit_breaker: Breaker shared by every worker. A new one is
+                created if omitted.
+        """
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.jitter = jitter
+        self.retry_statuses = frozenset(retry_statuses)
+        self.non_idempotent_statuses = frozenset(non_idempotent_statuses)
+        self.overload_statuses = frozenset(overload_statuses)
+        self.circuit_breaker = circuit_breaker or CircuitBreaker()
+
+    def should_retry_status(self, method: str, status_code: int, attempt: int) -> bool:
+        """
+        Check whether a response status is worth another attempt.
+
+        Args:
+            method: HTTP method of the request.
+            status_code: Status of the response.
+            attempt: Number of retries already made.
+
+        Returns:
+            True if the request should be sent again.
+        """
+        if attempt >= self.max_retries:
+            return False
+        if method.upper() in IDEMPOTENT_METHODS:
+            return status_code in self.retry_statuses
+        return status_code in self.non_idempotent_statuses
+
+    def should_retry_exception(self, method: str, exception: Exception, attempt: int) -> bool:
+        """
+        Check whether a request exception is worth another attempt.
+
+        Both requests exceptions (WebService) and aiohttp exceptions
+        (AsyncWebService) are understood.
+
+        Args:
+            method: HTTP method of the request.
+            exception: The exception raised by the session.
+            attempt: Number of retries already made.
+
+        Returns:
+            True if the request should be sent again.
+        """
+        if attempt >= self.max_retries:
+            return False
+        if isinstance(exception, asyncio.TimeoutError) or type(exception).__module__.startswith("aiohttp"):
+            return self._should_retry_aiohttp(method, exception)
+        # Imported here so that importing this module does not load requests
+        import requests
+        from urllib3.exceptions import NewConnectionError
+
+        if method.upper() in IDEMPOTENT_METHODS:
+            return isinstance(exception, (requests.exceptions.ConnectionError,
+                                          requests.exceptions.Timeout))
+        # A POST is only safe to resend if the connection was never opened
+        if isinstance(exception, requests.exceptions.ConnectTimeout):
+            return True
+        if isinstance(exception, requests.exceptions.ConnectionError) and exception.args:
+            return isinstance(getattr(exception.args[0], "reason", None), NewConnectionError)
+        return False
+
+    def _should_retry_aiohttp(self, method: str, exception: Exception) -> bool:
+        import aiohttp
+
+        if method.upper() in IDEMPOTENT_METHODS:
+            return isinstance(exception, (aiohttp.ClientError, asyncio.TimeoutError))
+        # A POST is only safe to resend if the connection was never opened
+        return isinstance(exception, (aiohttp.ClientConnectorError, aiohttp.ConnectionTimeoutError))
+
+    def backoff(self, attempt: int) -> float:
+        """
+        Get the delay before a retry.
+
+        Args:
+            attempt: Number of retries already made.
+
+        Returns:
+            Seconds to wait.
+        """
+        delay = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+        return random.uniform(0, delay) if self.jitter else delay
+
+    def delay(self, attempt: int, headers=None) -> float:
+        """
+        Get the delay before a retry, honoring a Retry-After header.
+
+        Args:
+            attempt: Number of retries already made.
+            headers: Response headers, if there was a response.
+
+        Returns:
+            Seconds to wait.
+        """
+        retry_after = parse_retry_after(headers.get("Retry-After")) if headers else None
+        if retry_after is not None:
+            return min(retry_after, self.backoff_max)
+        return self.backoff(attempt)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parse a Retry-After header, in seconds or as an HTTP date.
+
+    Args:
+        value: The header value.
+
+    Returns:
+        Seconds to wait, or None if the header is missing or invalid.
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        moment = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, moment.timestamp() - time.time())
@@ -3,30 +3,39 @@ This module provides classes to configure and provide access to authentication a
 """
 
 import os
-from dotenv import load_dotenv
 from .encoded import CredentialEncoder
 from .base import BaseUrl
 
-load_dotenv()
-
 
 class ServiceConfig:
     """
     Class to configure and provide access to authentication and server details.
     """
 
-    def __init__(self) -> None:
+    def __init__(self, client: str | None = None, env_id: str | None = None,
+                 mode: str | None = None) -> None:
         """
         Initialize the class by loading environment variables 
         and setting up authentication and server details.
+
+        Args:
+            client: Overrides CLIENT, to target another tenant.
+            env_id: Overrides ENV_ID.
+            mode: Overrides MODE ('dev' or 'prod').
         """
+        # O .env é lido na criação da configuração, não na importação do módulo
+        from dotenv import load_dotenv
+        load_dotenv()
+
         self.env_user = os.getenv("USER")            # Usuário
         self.env_password = os.getenv("PASSWORD")    # Senha
-        self.env_client = os.getenv("CLIENT")        # Servidor
-        self.env_id = os.getenv("ENV_ID")            # ID do ambiente
+        self.env_client = client or os.getenv("CLIENT")        # Servidor
+        self.env_id = env_id or os.getenv("ENV_ID")            # ID do ambiente
         self.env_content_type = os.getenv("CONTENT_TYPE")
         self.env_field_name = os.getenv("METADATA_NAME")
-        self.env_mode = os.getenv("MODE")
+        self.env_mode = mode or os.getenv("MODE")
+        self.env_rate_min = os.getenv("RATE_MIN")    # Limite mínimo de requisições/s
+        self.env_rate_max = os.getenv("RATE_MAX")    # Limite máximo de requisições/s
         
         self.auth = CredentialEncoder(self.env_user, self.env_password)
         self.server = BaseUrl(self.env_client, mode=self.env_mode)
@@ -79,6 +88,16 @@ class ServiceConfig:
         """
         return self.env_field_name
 
+    def get_rate_limits(self) -> tuple:
+        """
+        Get the bounds of the adaptive request rate.
+
+        Returns:
+            tuple: (minimum, maximum) requests per second. Defaults to (10, 480),
+            so the limiter has room to grow above the default --per-second (120).
+        """
+        return float(self.env_rate_min or 10), float(self.env_rate_max or 480)
+
     # def get_metadata(self) -> dict:
     #     """
     #     Get the metadata details.
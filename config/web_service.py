@@ -1,33 +1,122 @@
-from requests_ratelimiter import LimiterSession
-import requests
+import threading
+import time
+
+# requests, requests_ratelimiter e o adaptador são importados no primeiro uso,
+# para que importar este módulo não atrase a inicialização dos scripts
 
 
 class WebService:
-    def __init__(self, authorization, content_type, per_second=120):
-        self.session = LimiterSession(per_second=per_second)
+    def __init__(self, authorization, content_type, per_second=120, retry_policy=None,
+                 rate_limiter=None, pool_size=10, per_thread_session=False):
+        # Com um AdaptiveRateLimiter o ritmo é controlado por ele, não pelo LimiterSession
+        self.rate_limiter = rate_limiter
+        self.per_second = per_second
+        # pool_size deve acompanhar o número de threads para cada uma manter sua conexão
+        self.pool_size = pool_size
+        self.per_thread_session = per_thread_session
+        from .connection_pool import ConnectionStats
+        self.connection_stats = ConnectionStats()
+        self.session = self._new_session(pool_size)
+        self._local = threading.local()
         self.headers = {
             "Authorization": authorization,
             "Content-Type": content_type,
         }
+        # RetryPolicy opcional; sem ela cada requisição é feita uma única vez
+        self.retry_policy = retry_policy
 
     def request(self, url, method, body="", headers={}):
+        import requests
+
         all_headers = self.headers.copy()
         all_headers.update(headers)
 
-        response = self.session.request(
-            method, url, headers=all_headers, data=body)
+        policy = self.retry_policy
+        attempt = 0
+        while True:
+            if policy:
+                # Todas as threads esperam enquanto o servidor pede uma pausa
+                policy.circuit_breaker.wait()
+            try:
+                response = self._send(method, url, all_headers, body)
+            except requests.exceptions.RequestException as e:
+                if not policy or not policy.should_retry_exception(method, e, attempt):
+                    raise
+                policy.circuit_breaker.record_failure()
+                time.sleep(policy.delay(attempt))
+                attempt += 1
+                continue
+
+            if policy and policy.should_retry_status(method, response.status_code, attempt):
+                delay = policy.delay(attempt, response.headers)
+                if response.status_code in policy.overload_statuses:
+                    policy.circuit_breaker.trip(delay)
+                else:
+                    policy.circuit_breaker.record_failure()
+                    time.sleep(delay)
+                attempt += 1
+                continue
+
+            if policy and response.status_code < 400:
+                policy.circuit_breaker.record_success()
+            break
 
         response = self.handle_response(response)
 
         return response
 
+    def get_session(self):
+        if not self.per_thread_session:
+            return self.session
+        # Uma sessão por thread, todas com o mesmo limitador de taxa
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = self._new_session(1, shared=self.session)
+        return session
+
+    def _new_session(self, pool_size, shared=None):
+        import requests
+        from requests_ratelimiter import LimiterSession
+
+        from .connection_pool import PooledAdapter
+
+        if self.rate_limiter:
+            session = requests.Session()
+        elif shared is not None:
+            session = LimiterSession(limiter=shared.limiter)
+        else:
+            session = LimiterSession(per_second=self.per_second)
+        adapter = PooledAdapter(pool_size=pool_size, stats=self.connection_stats)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    def _send(self, method, url, headers, body):
+        import requests
+
+        session = self.get_session()
+        if not self.rate_limiter:
+            return session.request(method, url, headers=headers, data=body)
+
+        self.rate_limiter.acquire()
+        start = time.monotonic()
+        try:
+            response = session.request(method, url, headers=headers, data=body)
+        except requests.exceptions.RequestException:
+            self.rate_limiter.record(599, time.monotonic() - start)
+            raise
+        self.rate_limiter.record(response.status_code, time.monotonic() - start)
+        return response
+
     def handle_response(self, response):
         if response.status_code >= 400:
             self.handle_error(response)
         return response
 
     def handle_error(self, response):
-        raise NotImplementedError
+        # Sem tratamento padrão: a resposta volta a quem chamou, que decide
+        # pelo status_code (ou por raise_for_status)
+        pass
 
 
 class MyWebService(WebService):
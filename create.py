@@ -1,41 +1,70 @@
-import json
-import pandas as pd
+import argparse
 import os
 
+from util.excel_writer import EXCEL_MAX_ROWS, open_writer
+from util.json_parts import DATASETS, iter_part_columns, load_dataset
+from util.snapshot import load_snapshot
 
-def read_json_files(json_folder):
-    data = []
-
-    for filename in os.listdir(json_folder):
-        if filename.endswith('.json'):
-            file_path = os.path.join(json_folder, filename)
-            try:
-                with open(file_path, 'r') as file:
-                    json_data = json.load(file)
-                    for item in json_data.values():  # Iterar sobre os valores do dicionário
-                        conjunto_componente = item.get(
-                            'conjunto_componente', {})
-                        filtro, valor = conjunto_componente.get(
-                            'filtro'), conjunto_componente.get('valor')
-                        if filtro and valor:
-                            data.append({'filtro': filtro, 'valor': valor})
-            except json.JSONDecodeError as e:
-                print(f"Erro ao decodificar JSON em {file_path}: {e}")
-
-    return data
-
-
-# Caminho da pasta onde estão os arquivos JSON
-json_folder = 'data/conjunto_componente'
-
-# Lê os dados dos arquivos JSON
-data = read_json_files(json_folder)
-
-# Cria um DataFrame e salva em um arquivo Excel, se houver dados
-if data:
-    df = pd.DataFrame(data)
-    output_file = 'output.xlsx'
-    df.to_excel(output_file, index=False)
-    print(f'Arquivo Excel "{output_file}" criado com sucesso!')
-else:
-    print("Nenhum dado encontrado nos arquivos JSON.")
+
+def read_json_files(dataset, data_dir='data', workers=None, use_snapshot=False):
+    # Com snapshot, os JSON só são relidos quando algum arquivo mudou
+    if use_snapshot:
+        with load_snapshot(dataset, data_dir, workers=workers) as snapshot:
+            return snapshot.to_columnar()
+    # Lê os arquivos JSON do conjunto de dados em paralelo, em colunas filtro/valor
+    return load_dataset(dataset, data_dir, workers)
+
+
+def iter_dataset_rows(dataset, data_dir='data', workers=None, use_snapshot=False):
+    # Gera as linhas (filtro, valor) à medida que cada parte é lida, sem montar a lista inteira
+    if use_snapshot:
+        with load_snapshot(dataset, data_dir, workers=workers) as snapshot:
+            for row in snapshot.iter_rows():
+                yield row['filtro'], row['valor']
+        return
+    for filtro, valor in iter_part_columns(dataset, data_dir, workers):
+        yield from zip(filtro, valor)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Gera uma planilha Excel (ou CSV) a partir dos arquivos JSON de data/.")
+    parser.add_argument('--dataset', choices=DATASETS, nargs='+', default=['conjunto_componente'],
+                        help="conjuntos de dados (pastas dentro de data/); cada um vira uma aba "
+                             "(ou um arquivo, em CSV)")
+    parser.add_argument('--data-dir', default='data', help="pasta com os conjuntos de dados")
+    parser.add_argument('--output', default='output.xlsx', help="arquivo de saída (.xlsx ou .csv)")
+    parser.add_argument('--format', choices=('xlsx', 'csv'), default=None,
+                        help="formato de saída (padrão: pela extensão de --output)")
+    parser.add_argument('--max-rows', type=int, default=EXCEL_MAX_ROWS,
+                        help="linhas por aba, com o cabeçalho; depois disso os dados continuam "
+                             "em uma nova aba (<conjunto>_2, ...)")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="processos de leitura (padrão: número de CPUs)")
+    parser.add_argument('--snapshot', action='store_true',
+                        help="usa o snapshot binário em data/.snapshots (recriado se os JSON mudarem)")
+    args = parser.parse_args(argv)
+
+    # As linhas são gravadas à medida que os JSON são lidos: a memória não cresce com o arquivo
+    writer = open_writer(args.output, args.format, args.max_rows, single_file=len(args.dataset) == 1)
+    with writer:
+        for dataset in args.dataset:
+            writer.start(dataset, ('filtro', 'valor'))
+            writer.write_rows(iter_dataset_rows(dataset, args.data_dir, args.workers, args.snapshot))
+
+    outputs = getattr(writer, 'files', [args.output])
+    if writer.rows_written:
+        sheets = getattr(writer, 'sheets', None)
+        detail = f" ({len(sheets)} abas: {', '.join(sheets)})" if sheets and len(sheets) > 1 else ""
+        for output_file in outputs:
+            print(f'Arquivo "{output_file}" criado com sucesso!{detail}')
+    else:
+        # Sem dados, nenhum arquivo é deixado para trás
+        for output_file in outputs:
+            if os.path.exists(output_file):
+                os.remove(output_file)
+        print("Nenhum dado encontrado nos arquivos JSON.")
+
+
+if __name__ == '__main__':
+    main()
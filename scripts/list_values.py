@@ -1,39 +1,390 @@
+import argparse
 import json
 import logging
-import pandas as pd
-import requests
-import concurrent.futures
+import multiprocessing
+import queue
+import sys
+import time
 from urllib.parse import urlencode
+from itertools import islice
 from pathlib import Path
-from typing import Optional, Dict, Any
-import threading  # Importar o módulo threading
+from typing import Optional, Dict, Any, List
 
 # Importar classes de configuração
+from ..config.adaptive_limiter import AdaptiveRateLimiter
+from ..config.batch_transport import (FIELD_VALUES_ENDPOINT, BulkTransport, FieldValue,
+                                      PerValueTransport, iter_field_values)
+from ..config.factory import ServiceFactory
+from ..config.retry import RetryPolicy
 from ..config.service_config import ServiceConfig
 from ..config.web_service import WebService
+from ..util.async_log import BackgroundLogHandler, BackgroundWriter, Sampler
+from ..util.batch_uploader import BatchUploader
+from ..util.dedup_registry import DedupRegistry
+from ..util.diff_sync import DeltaReport, ExistingValues
+from ..util.excel_stream import VALUE_DTYPES, ExcelStreamReader, to_text
+from ..util.fanout import FanOutUploader, UploadTarget
+from ..util.hierarchy import HierarchyIndex, normalize_code
+from ..util.json_parts import DATASETS
+from ..util.key_store import request_key
+from ..util.metrics import Metrics
+from ..util.pipeline import BoundedPipeline, PipelineStats
+from ..util.parent_resolver import ParentResolver
+from ..util.progress_journal import ProgressJournal
+from ..util.record_sources import open_source
+from ..util.sharding import SharedRateBudget, ShardRouter, receive_levels
+from ..util.snapshot import load_snapshot
 
-# Configuração do logger
-logging.basicConfig(filename='meu_log.txt', level=logging.ERROR,
-                    format='%(asctime)s - %(levelname)s - %(message)s')
+# Configuração e WebService padrão, criados no primeiro uso (nada é lido do .env na importação)
+services = ServiceFactory(retry_policy=RetryPolicy())
 
-# Inicialização das configurações
-service = ServiceConfig()
-auth = service.get_auth()
-server = service.get_server()
-environment_id = service.get_environment_id()
-content_type = service.get_content_type()
-field_name = service.get_field_name()
-
-call = WebService(auth, content_type)
+# WebService e URL do servidor em uso; None usa os de `services`
+call: Optional[WebService] = None
+server: Optional[str] = None
 
 SCRIPT_DIR = Path(__file__).resolve().parent
-FILE_PATH = SCRIPT_DIR / "../data/values.xlsx"
+DATA_DIR = SCRIPT_DIR / "../data"
+FILE_PATH = DATA_DIR / "values.xlsx"
+PER_SECOND = 120  # Limite de requisições por segundo (mesmo padrão do WebService)
+READ_CHUNK = 500  # Linhas lidas por vez pelo motor assíncrono
+
+# Registro dos valores já enviados (ou em envio), por chave hash de
+# (ambiente, campo, idPai, valor, sigla); o nome antigo foi mantido
+already_sent_urls = DedupRegistry(compact=True)
+
+# Cache código do pai -> ID no servidor (None envia o filtro como idPai, sem conversão)
+parent_resolver: Optional[ParentResolver] = None
+
+# Valores que já existem no servidor (None envia todas as linhas)
+existing_values: Optional[ExistingValues] = None
+
+# Contadores e latências por fase (leitura, dedup, HTTP, JSON) da execução
+metrics = Metrics()
+
+# 0: só erros e progresso; 1: URL e status de cada envio; 2: também cabeçalhos e JSON
+verbosity = 1
+
+# Escrita do console em segundo plano (None escreve direto com print)
+console: Optional[BackgroundWriter] = None
+
+# Decide quais envios mostram as mensagens por requisição (1 mostra todos)
+sample_request = Sampler(1)
+
+# Arquivo atualizado com as métricas a cada linha de progresso e no fim (opcional)
+metrics_path: Optional[str] = None
+metrics_format: Optional[str] = None
+
+# Prefixo das linhas de progresso (identifica o processo no modo --processes)
+progress_prefix = ""
+
+
+def __getattr__(name: str):
+    # Compatibilidade com os antigos atributos do módulo, agora criados sob demanda
+    getters = {
+        "service": lambda: services.config,
+        "auth": lambda: services.config.get_auth(),
+        "environment_id": lambda: services.config.get_environment_id(),
+        "content_type": lambda: services.config.get_content_type(),
+        "field_name": lambda: services.config.get_field_name(),
+    }
+    if name in getters:
+        return getters[name]()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def get_call() -> WebService:
+    """
+    Retorna o WebService usado nos envios, criando o padrão no primeiro uso.
+
+    Returns:
+        O WebService definido por main (ou por quem importou o módulo) ou o padrão.
+    """
+    return call if call is not None else services.web_service
+
+
+def get_server() -> str:
+    """
+    Retorna a URL do servidor, lendo a configuração no primeiro uso.
 
-already_sent_urls = set()  # Conjunto para armazenar as URLs já enviadas
-lock = threading.Lock()  # Criar um lock
+    Returns:
+        A URL definida por quem importou o módulo ou a da configuração.
+    """
+    return server if server is not None else services.config.get_server()
+
+
+def report_progress(line: str) -> None:
+    """
+    Mostra a linha de progresso da fila junto com os contadores e latências,
+    e atualiza o arquivo de métricas, se houver.
+
+    Args:
+        line: Linha de progresso do BoundedPipeline.
+    """
+    say(0, f"{progress_prefix}{line} | {metrics.progress_line()}")
+    if metrics_path:
+        metrics.dump(metrics_path, metrics_format)
+
+
+def print_metrics_summary() -> None:
+    """
+    Mostra os contadores e as latências p50/p95/p99 de cada fase, e grava o
+    arquivo de métricas, se houver.
+    """
+    snapshot = metrics.snapshot()
+    counters = ", ".join(f"{name}={value}" for name, value in sorted(snapshot["counters"].items()))
+    print(f"Contadores: {counters or 'nenhum'}")
+    for phase, latency in snapshot["latency"].items():
+        if latency["count"]:
+            print(f"  {phase:>6}: {latency['count']} medições, p50 {latency['p50'] * 1000:.2f} ms, "
+                  f"p95 {latency['p95'] * 1000:.2f} ms, p99 {latency['p99'] * 1000:.2f} ms")
+    if metrics_path:
+        metrics.dump(metrics_path, metrics_format)
+        print(f"Métricas gravadas em {metrics_path}.")
 
 
-def value_list(env_id: str, field_name: str, value: str, acronym: Optional[str] = None, parent_id: Optional[str] = None) -> None:
+def configure_logging(filename: str = 'meu_log.txt', level: int = logging.ERROR) -> BackgroundLogHandler:
+    """
+    Configura o log de erros em arquivo (feito em main, não na importação).
+
+    As threads de envio só enfileiram os registros; uma thread em segundo
+    plano formata e grava em lotes.
+
+    Args:
+        filename: Arquivo de log.
+        level: Nível mínimo das mensagens gravadas.
+
+    Returns:
+        O handler instalado; feche-o com stop_logging ao terminar.
+    """
+    handler = BackgroundLogHandler(filename)
+    logging.basicConfig(level=level, handlers=[handler],
+                        format='%(asctime)s - %(levelname)s - %(message)s')
+    return handler
+
+
+def stop_logging(handler: BackgroundLogHandler) -> None:
+    """
+    Grava os registros pendentes e remove o handler criado por configure_logging.
+
+    Args:
+        handler: O handler retornado por configure_logging.
+    """
+    logging.getLogger().removeHandler(handler)
+    handler.close()
+
+
+def start_console() -> None:
+    """
+    Passa a escrever as mensagens de say por uma thread em segundo plano.
+    """
+    global console
+    if console is None:
+        console = BackgroundWriter(sys.stdout)
+
+
+def stop_console() -> None:
+    """
+    Escreve as mensagens pendentes e volta a usar print diretamente.
+    """
+    global console
+    if console is not None:
+        writer, console = console, None
+        writer.close()
+
+
+def say(level: int, message: str, shown: bool = True) -> None:
+    """
+    Mostra uma mensagem no console se o nível de detalhe pedido permitir.
+
+    Args:
+        level: Nível mínimo (0 sempre aparece).
+        message: A mensagem.
+        shown: False para mensagens de um envio que ficou fora da amostra.
+    """
+    if shown and verbosity >= level:
+        if console is not None:
+            console.write(message)
+        else:
+            print(message)
+
+
+def snapshot_row_generator(dataset: str, data_dir: str = DATA_DIR):
+    """
+    Gera as linhas (filtro/valor) de um conjunto de dados a partir do snapshot binário.
+
+    O snapshot é recriado se algum arquivo JSON do conjunto mudou. Os códigos
+    são convertidos como em JsonPartSource (11.0 vira '11'), de modo que
+    --snapshot e --source geram as mesmas requisições e chaves de dedup.
+
+    Args:
+        dataset: Nome do conjunto de dados (pasta dentro de data/).
+        data_dir: Pasta com os conjuntos de dados.
+    """
+    with load_snapshot(dataset, str(data_dir)) as snapshot:
+        for row in snapshot.iter_rows():
+            yield {'valor': to_text(row['valor']), 'sigla': None, 'filtro': to_text(row['filtro'])}
+
+
+def build_full_url(env_id: str, field_name: str, item: FieldValue) -> str:
+    """
+    Monta a URL completa da requisição de criação de um valor de campo.
+
+    Args:
+        env_id: ID do ambiente.
+        field_name: Nome do campo.
+        item: Valor, sigla e ID do pai.
+
+    Returns:
+        A URL com os parâmetros não vazios na query string.
+    """
+    return request_url(item.to_params(env_id, field_name))
+
+
+def request_url(params: Dict[str, Any]) -> str:
+    """
+    Monta a URL da requisição a partir de parâmetros já montados (FieldValue.to_params).
+
+    Args:
+        params: Parâmetros da requisição.
+
+    Returns:
+        A URL com os parâmetros na query string.
+    """
+    return f"{get_server()}{FIELD_VALUES_ENDPOINT}?{urlencode(params)}"
+
+
+def item_key(env_id: str, field_name: str, item: FieldValue) -> bytes:
+    """
+    Calcula a chave de dedup de um valor (digest de ambiente, campo, idPai, valor e sigla).
+
+    Args:
+        env_id: ID do ambiente.
+        field_name: Nome do campo.
+        item: Valor, sigla e ID do pai.
+
+    Returns:
+        A chave de tamanho fixo usada no registro de envios.
+    """
+    return request_key(item.to_params(env_id, field_name))
+
+
+def lookup_parent_id(env_id: str, field_name: str, code: str) -> Optional[str]:
+    """
+    Consulta no servidor o ID de um valor já existente.
+
+    Args:
+        env_id: ID do ambiente.
+        field_name: Nome do campo.
+        code: Valor procurado (o código usado na coluna filtro).
+
+    Returns:
+        O ID do valor, ou None se ele não existe.
+    """
+    for entry in iter_field_values(get_call(), get_server(), env_id, field_name, page_size=1, valor=code):
+        if isinstance(entry, dict) and entry.get('id') is not None:
+            return str(entry['id'])
+    return None
+
+
+def prefetch_existing(env_id: str, field_name: str, resolver: Optional[ParentResolver] = None,
+                      existing: Optional[ExistingValues] = None, page_size: int = 500) -> int:
+    """
+    Lê de uma vez, página por página, os valores que já existem no servidor.
+
+    Uma única listagem alimenta o cache de IDs de pais e o conjunto usado
+    para enviar só os valores novos.
+
+    Args:
+        env_id: ID do ambiente.
+        field_name: Nome do campo.
+        resolver: Cache que recebe os IDs (opcional).
+        existing: Conjunto que recebe os valores existentes (opcional).
+        page_size: Valores por página da listagem.
+
+    Returns:
+        Quantidade de valores lidos.
+    """
+    count = 0
+    for entry in iter_field_values(get_call(), get_server(), env_id, field_name, page_size=page_size):
+        if not isinstance(entry, dict):
+            continue
+        if resolver is not None:
+            resolver.learn(normalize_code(entry.get('valor')), entry.get('id'))
+        if existing is not None:
+            existing.add(entry.get('idPai'), entry.get('valor'), entry.get('sigla'))
+        count += 1
+    return count
+
+
+def resolve_parent(code) -> Optional[str]:
+    """
+    Converte o código do pai (coluna filtro) no idPai enviado à API.
+
+    Args:
+        code: Código do pai.
+
+    Returns:
+        O ID do pai no servidor, o próprio código se não houver cache de IDs,
+        ou None se o pai não foi encontrado.
+    """
+    if parent_resolver is None:
+        return code
+    return parent_resolver.resolve(normalize_code(code))
+
+
+def already_on_server(item: FieldValue) -> bool:
+    """
+    Verifica se o valor já existe no servidor, segundo a listagem lida no início.
+
+    Args:
+        item: Valor, sigla e ID do pai.
+
+    Returns:
+        True se o valor pode ser ignorado.
+    """
+    return existing_values is not None and existing_values.contains(item.parent_id, item.value, item.acronym)
+
+
+def dry_run(rows, sample_size: int = 20) -> DeltaReport:
+    """
+    Calcula, sem enviar nada, quais valores seriam criados e quais já existem.
+
+    Args:
+        rows: Gerador de linhas (valor/sigla/filtro).
+        sample_size: Quantidade de valores novos listados como exemplo.
+
+    Returns:
+        O relatório da diferença.
+    """
+    report = DeltaReport(sample_size)
+    for element in rows:
+        if not element.get('valor'):
+            continue
+        parent_id = element.get('filtro')
+        if parent_id:
+            parent_id = resolve_parent(parent_id)
+            if parent_id is None:
+                # O pai também é novo: o valor será criado depois dele
+                report.pending_parent += 1
+                continue
+        report.record(existing_values, parent_id, element['valor'], element.get('sigla'))
+    return report
+
+
+def learn_parent_id(value, response_json) -> None:
+    """
+    Guarda o ID devolvido na criação de um valor, para quando ele for pai de outro.
+
+    Args:
+        value: O valor criado.
+        response_json: Corpo JSON da resposta da criação.
+    """
+    if parent_resolver is not None and isinstance(response_json, dict):
+        parent_resolver.learn(normalize_code(value), response_json.get('id'))
+
+
+def value_list(env_id: str, field_name: str, value: str, acronym: Optional[str] = None, parent_id: Optional[str] = None,
+               full_url: Optional[str] = None) -> bool:
     """
     Envia uma requisição para a API para criar ou atualizar um valor de campo.
 
@@ -43,54 +394,63 @@ def value_list(env_id: str, field_name: str, value: str, acronym: Optional[str]
         value: Valor do campo.
         acronym: Sigla do valor (opcional).
         parent_id: ID do pai (opcional).
+        full_url: URL já montada por quem chamou (opcional; evita montá-la de novo).
+
+    Returns:
+        True se a requisição foi aceita pela API, False em caso de erro.
     """
-    url = f"{server}api/v2/fieldValues"
-    params = {
-        "idAmbiente": env_id,
-        "nome": field_name,
-        "valor": value,
-        "sigla": acronym,
-        "idPai": parent_id
-    }
+    from requests.exceptions import RequestException
 
-    # Remove parâmetros vazios e None
-    params = {k: v for k, v in params.items() if v}
-    full_url = f"{url}?{urlencode(params)}"
+    # Parâmetros vazios e None não entram na URL
+    if full_url is None:
+        full_url = build_full_url(env_id, field_name, FieldValue(value, acronym, parent_id))
 
-    print(f"URL: {full_url}")
+    # As mensagens deste envio só aparecem se ele cair na amostra
+    shown = sample_request()
+    say(1, f"URL: {full_url}", shown)
 
     try:
-        response = call.request(full_url, method="POST")
+        with metrics.time("http"):
+            response = get_call().request(full_url, method="POST")
         response.raise_for_status()  # Lança exceção para erros HTTP
 
-        print(f"Código de status: {response.status_code}")
-        print(f"Cabeçalhos da resposta: {response.headers}")
+        say(1, f"Código de status: {response.status_code}", shown)
+        say(2, f"Cabeçalhos da resposta: {response.headers}", shown)
 
+        # O JSON só é lido quando alguém vai usá-lo (cache de pais ou modo detalhado)
+        if parent_resolver is None and verbosity < 2:
+            return True
         content_type = response.headers.get('Content-Type')
         if content_type and 'application/json' in content_type:
             try:
-                response_json = response.json()
-                print(f"Resposta JSON: {response_json}")
+                with metrics.time("parse"):
+                    response_json = response.json()
+                say(2, f"Resposta JSON: {response_json}", shown)
+                learn_parent_id(value, response_json)
             except json.JSONDecodeError as e:
+                metrics.inc("parse_errors")
                 logging.error(
                     f"Erro ao decodificar JSON: {e}. Resposta: {response.text}")
-                print(
-                    "Erro ao decodificar JSON. Consulte o arquivo de log para detalhes.")
+                say(1, "Erro ao decodificar JSON. Consulte o arquivo de log para detalhes.")
         else:
-            print(f"Resposta (não JSON): {response.text}")
+            say(2, f"Resposta (não JSON): {response.text}", shown)
+        return True
 
-    except requests.exceptions.RequestException as e:
+    except RequestException as e:
+        metrics.inc("http_errors")
         logging.error(
             f"Erro na requisição: {e}. Resposta: {getattr(e.response, 'text', 'N/A')}")
-        print(f"Erro na requisição: {e}")
+        say(0, f"Erro na requisição: {e}")
         if e.response:
-            print(f"Conteúdo da resposta: {e.response.text}")
+            say(2, f"Conteúdo da resposta: {e.response.text}", shown)
     except Exception as e:
+        metrics.inc("errors")
         logging.error(f"Erro geral: {e}")
-        print(f"Ocorreu um erro geral: {e}")
+        say(0, f"Ocorreu um erro geral: {e}")
+    return False
 
 
-def process_element(element: Dict[str, Any], env_id: str, field_name: str, already_sent_urls: set) -> None:
+def process_element(element: Dict[str, Any], env_id: str, field_name: str, already_sent_urls: DedupRegistry) -> None:
     """
     Processa um único elemento do arquivo Excel.
 
@@ -98,7 +458,7 @@ def process_element(element: Dict[str, Any], env_id: str, field_name: str, alrea
         element: Um dicionário representando uma linha do Excel.
         env_id: ID do ambiente.
         field_name: Nome do campo.
-        already_sent_urls: Conjunto para armazenar as URLs já enviadas.
+        already_sent_urls: Registro dos valores já enviados.
     """
     try:
         if not element.get('valor'):
@@ -107,52 +467,61 @@ def process_element(element: Dict[str, Any], env_id: str, field_name: str, alrea
         value = element['valor']
         acronym = element.get('sigla')
         parent_id = element.get('filtro')
+        if parent_id:
+            parent_id = resolve_parent(parent_id)
+            if parent_id is None:
+                metrics.inc("unresolved_parents")
+                logging.error(f"Pai não encontrado: {element.get('filtro')}. Elemento: {element}")
+                say(1, f"Pai não encontrado: {element.get('filtro')}. Ignorando {value}.", sample_request())
+                return
 
-        # Construir a URL completa
-        url = f"{server}api/v2/fieldValues"
-        params = {
-            "idAmbiente": env_id,
-            "nome": field_name,
-            "valor": value,
-            "sigla": acronym,
-            "idPai": parent_id
-        }
-        params = {k: v for k, v in params.items() if v}
-        full_url = f"{url}?{urlencode(params)}"
-
-        # Proteger o acesso ao conjunto already_sent_urls com um lock
-        with lock:
-            # Verificar se a URL já foi enviada
-            if full_url not in already_sent_urls:
-                value_list(env_id, field_name, value, acronym, parent_id)
-                # Adicionar a URL ao conjunto de URLs enviadas
-                already_sent_urls.add(full_url)
+        item = FieldValue(value, acronym, parent_id)
+        if already_on_server(item):
+            metrics.inc("existing")
+            return
+
+        # Parâmetros montados uma única vez: servem à chave de dedup e à URL
+        params = item.to_params(env_id, field_name)
+
+        # Reservar a chave de forma atômica; a requisição roda fora do lock
+        with metrics.time("dedup"):
+            key = request_key(params)
+            claimed = already_sent_urls.claim(key)
+        if not claimed:
+            metrics.inc("duplicates")
+            say(1, f"Valor já enviado: {value} (idPai {parent_id}). Ignorando.", sample_request())
+            return
+
+        sent = False
+        try:
+            sent = value_list(env_id, field_name, value, acronym, parent_id, full_url=request_url(params))
+        finally:
+            # Em caso de falha a chave é liberada para uma nova tentativa
+            if sent:
+                metrics.inc("sent")
+                already_sent_urls.mark_done(key)
             else:
-                print(f"URL já enviada: {full_url}. Ignorando.")
+                already_sent_urls.release(key)
 
     except Exception as e:
+        metrics.inc("errors")
         logging.error(f"Erro ao processar elemento: {element}. Erro: {e}")
-        print(f"Ocorreu um erro ao processar um elemento. Consulte o arquivo de log para mais detalhes.")
+        say(0, f"Ocorreu um erro ao processar um elemento. Consulte o arquivo de log para mais detalhes.")
 
 
-def excel_row_generator(file_path: str, nrows: int = 1000, skiprows: int = 0):
+def excel_row_generator(file_path: str):
     """
-    Gera linhas do arquivo Excel em partes para otimizar o uso de memória.
+    Gera as linhas do arquivo Excel em uma única leitura, com memória constante.
+
+    Cada linha é um dicionário com as colunas da planilha (valor/sigla/filtro);
+    células vazias vêm como None. Valor, sigla e filtro são lidos como texto:
+    um código digitado como 11 continua '11' (e não 11.0).
 
     Args:
         file_path: Caminho para o arquivo Excel.
-        nrows: Número de linhas a serem lidas por vez.
-        skiprows: Número de linhas a serem ignoradas no início do arquivo.
     """
     try:
-        while True:
-            df = pd.read_excel(file_path, nrows=nrows,
-                               skiprows=skiprows, engine='openpyxl')
-            if df.empty:
-                break
-            for _, row in df.iterrows():
-                yield row.to_dict()
-            skiprows += nrows
+        yield from ExcelStreamReader(file_path, dtypes=VALUE_DTYPES)
     except FileNotFoundError:
         print("O arquivo Excel não existe.")
     except Exception as e:
@@ -160,15 +529,853 @@ def excel_row_generator(file_path: str, nrows: int = 1000, skiprows: int = 0):
         print(f"Ocorreu um erro ao ler o arquivo Excel. Consulte o arquivo de log para mais detalhes.")
 
 
-def main():
+def source_row_generator(spec: str, data_dir: str = DATA_DIR):
+    """
+    Gera as linhas de uma fonte de registros: pasta de partes JSON, planilha ou CSV.
+
+    Todas as fontes seguem o mesmo contrato de excel_row_generator (um
+    dicionário valor/sigla/filtro por linha). As partes JSON são lidas uma a
+    uma, com a próxima sendo lida enquanto as linhas da atual são enviadas.
+
+    Args:
+        spec: '<tipo>:<local>' (json, excel ou csv) ou só o local, por exemplo
+            'conjunto_componente', 'data/conjunto_componente', 'valores.csv'.
+        data_dir: Pasta com os conjuntos de dados, para nomes de conjunto.
+    """
+    try:
+        yield from open_source(spec, data_dir)
+    except FileNotFoundError as e:
+        print(f"A entrada não existe: {e.filename or spec}.")
+    except Exception as e:
+        logging.error(f"Erro ao ler a entrada {spec}: {e}")
+        print(f"Ocorreu um erro ao ler a entrada {spec}. Consulte o arquivo de log para mais detalhes.")
+
+
+def process_batch(batch: List[FieldValue], uploader: BatchUploader, already_sent_urls: DedupRegistry) -> None:
+    """
+    Envia um lote de valores e atualiza o registro item a item.
+
+    Args:
+        batch: Valores de um mesmo pai.
+        uploader: Agrupador responsável pelo envio.
+        already_sent_urls: Registro dos valores já enviados.
+    """
+    try:
+        with metrics.time("http"):
+            results = uploader.send(batch)
+        for result in results:
+            key = item_key(uploader.env_id, uploader.field_name, result.item)
+            if result.ok:
+                metrics.inc("sent")
+                learn_parent_id(result.item.value, result.response)
+                already_sent_urls.mark_done(key)
+            else:
+                # Em caso de falha a chave é liberada para uma nova tentativa
+                metrics.inc("http_errors")
+                already_sent_urls.release(key)
+                logging.error(
+                    f"Erro ao enviar valor: {result.item}. Status: {result.status_code}. Erro: {result.error}")
+    except Exception as e:
+        metrics.inc("errors")
+        for item in batch:
+            already_sent_urls.release(item_key(uploader.env_id, uploader.field_name, item))
+        logging.error(f"Erro ao enviar lote: {batch}. Erro: {e}")
+        say(0, f"Ocorreu um erro ao enviar um lote. Consulte o arquivo de log para mais detalhes.")
+
+
+def run_threads(rows, env_id: str, field_name: str, already_sent_urls: DedupRegistry,
+                workers: int = 10, queue_size: Optional[int] = None,
+                report_interval: float = 0) -> PipelineStats:
+    """
+    Envia as linhas com um conjunto fixo de threads alimentado por uma fila limitada.
+
+    Quando a fila enche, a leitura da planilha espera; o uso de memória depende
+    do tamanho da fila, não do tamanho da entrada.
+
+    Args:
+        rows: Gerador de linhas (valor/sigla/filtro).
+        env_id: ID do ambiente.
+        field_name: Nome do campo.
+        already_sent_urls: Registro dos valores já enviados.
+        workers: Número de threads de envio.
+        queue_size: Máximo de linhas pendentes (padrão: 4 por thread).
+        report_interval: Intervalo, em segundos, das linhas de progresso (0 desliga).
+
+    Returns:
+        Os contadores da execução.
+    """
+    pipeline = BoundedPipeline(
+        lambda element: process_element(element, env_id, field_name, already_sent_urls),
+        workers=workers, queue_size=queue_size, report_interval=report_interval,
+        report=report_progress)
+    return pipeline.run(rows)
+
+
+def run_batched(rows, env_id: str, field_name: str, already_sent_urls: DedupRegistry,
+                batch_size: int, bulk: bool = False, workers: int = 10,
+                queue_size: Optional[int] = None, report_interval: float = 0) -> BatchUploader:
+    """
+    Agrupa as linhas por pai (idPai) e envia os lotes em paralelo.
+
+    Args:
+        rows: Gerador de linhas (valor/sigla/filtro).
+        env_id: ID do ambiente.
+        field_name: Nome do campo.
+        already_sent_urls: Registro dos valores já enviados.
+        batch_size: Quantidade máxima de valores por lote.
+        bulk: Se True, usa o endpoint de envio em lote; senão, uma requisição por valor.
+        workers: Número de threads de envio.
+        queue_size: Máximo de lotes pendentes (padrão: 4 por thread).
+        report_interval: Intervalo, em segundos, das linhas de progresso (0 desliga).
+
+    Returns:
+        O agrupador, com o relatório de sucessos e falhas.
+    """
+    web_service, url = get_call(), get_server()
+    transport = BulkTransport(web_service, url) if bulk else PerValueTransport(web_service, url)
+    uploader = BatchUploader(transport, env_id, field_name, batch_size)
+
+    def batches():
+        for element in rows:
+            if not element.get('valor'):
+                continue
+            parent_id = element.get('filtro')
+            if parent_id:
+                try:
+                    parent_id = resolve_parent(parent_id)
+                except Exception as e:
+                    # Falha na consulta ao servidor: o valor fica para uma nova execução
+                    metrics.inc("errors")
+                    logging.error(f"Erro ao processar elemento: {element}. Erro: {e}")
+                    continue
+                if parent_id is None:
+                    metrics.inc("unresolved_parents")
+                    logging.error(f"Pai não encontrado: {element.get('filtro')}. Elemento: {element}")
+                    continue
+            item = FieldValue(element['valor'], element.get('sigla'), parent_id)
+            if already_on_server(item):
+                metrics.inc("existing")
+                continue
+            with metrics.time("dedup"):
+                claimed = already_sent_urls.claim(item_key(env_id, field_name, item))
+            if not claimed:
+                metrics.inc("duplicates")
+                continue
+            batch = uploader.add(item)
+            if batch:
+                yield batch
+        yield from uploader.drain()
+
+    pipeline = BoundedPipeline(
+        lambda batch: process_batch(batch, uploader, already_sent_urls),
+        workers=workers, queue_size=queue_size, report_interval=report_interval,
+        report=report_progress)
+    pipeline.run(batches())
+
+    report = uploader.report
+    say(0, f"Lotes enviados: {report.batches}. Valores criados: {report.succeeded}. "
+           f"Falhas: {report.failed}.")
+    return uploader
+
+
+async def value_list_async(client, env_id: str, field_name: str, item: FieldValue,
+                           full_url: Optional[str] = None) -> bool:
+    """
+    Versão assíncrona de value_list.
+
+    Args:
+        client: AsyncWebService aberto.
+        env_id: ID do ambiente.
+        field_name: Nome do campo.
+        item: Valor, sigla e ID do pai.
+        full_url: URL já montada por quem chamou (opcional).
+
+    Returns:
+        True se a requisição foi aceita pela API, False em caso de erro.
+    """
+    if full_url is None:
+        full_url = build_full_url(env_id, field_name, item)
+    shown = sample_request()
+    say(1, f"URL: {full_url}", shown)
+
+    try:
+        with metrics.time("http"):
+            response = await client.request(full_url, method="POST")
+        say(1, f"Código de status: {response.status_code}", shown)
+        if response.status_code >= 400:
+            metrics.inc("http_errors")
+            logging.error(
+                f"Erro na requisição: {response.status_code}. Resposta: {response.text}")
+            return False
+        if parent_resolver is not None or verbosity >= 2:
+            try:
+                with metrics.time("parse"):
+                    response_json = response.json()
+                say(2, f"Resposta JSON: {response_json}", shown)
+                learn_parent_id(item.value, response_json)
+            except ValueError:
+                metrics.inc("parse_errors")
+        return True
+    except Exception as e:
+        metrics.inc("errors")
+        logging.error(f"Erro geral: {e}")
+        say(0, f"Ocorreu um erro geral: {e}")
+    return False
+
+
+async def process_element_async(client, element: Dict[str, Any], env_id: str, field_name: str,
+                                already_sent_urls: DedupRegistry) -> None:
+    """
+    Versão assíncrona de process_element.
+
+    Args:
+        client: AsyncWebService aberto.
+        element: Um dicionário representando uma linha do Excel.
+        env_id: ID do ambiente.
+        field_name: Nome do campo.
+        already_sent_urls: Registro dos valores já enviados.
+    """
+    if not element.get('valor'):
+        return
+
+    parent_id = element.get('filtro')
+    if parent_id:
+        import asyncio
+
+        # A consulta ao servidor, se houver, roda fora do loop de eventos
+        parent_id = await asyncio.to_thread(resolve_parent, parent_id)
+        if parent_id is None:
+            metrics.inc("unresolved_parents")
+            logging.error(f"Pai não encontrado: {element.get('filtro')}. Elemento: {element}")
+            return
+
+    item = FieldValue(element['valor'], element.get('sigla'), parent_id)
+    if already_on_server(item):
+        metrics.inc("existing")
+        return
+    params = item.to_params(env_id, field_name)
+    with metrics.time("dedup"):
+        key = request_key(params)
+        claimed = already_sent_urls.claim(key)
+    if not claimed:
+        metrics.inc("duplicates")
+        say(1, f"Valor já enviado: {item.value} (idPai {parent_id}). Ignorando.", sample_request())
+        return
+
+    sent = False
+    try:
+        sent = await value_list_async(client, env_id, field_name, item, full_url=request_url(params))
+    finally:
+        if sent:
+            metrics.inc("sent")
+            already_sent_urls.mark_done(key)
+        else:
+            already_sent_urls.release(key)
+
+
+def _next_chunk(iterator, size: int) -> list:
+    return list(islice(iterator, size))
+
+
+async def run_async(rows, env_id: str, field_name: str, already_sent_urls: DedupRegistry,
+                    max_in_flight: int = 10, per_second: float = PER_SECOND,
+                    retry_policy: Optional[RetryPolicy] = None, report_interval: float = 0) -> int:
+    """
+    Envia as linhas com asyncio em vez de threads.
+
+    A leitura da planilha roda em uma thread auxiliar, em blocos, e alimenta uma
+    fila limitada: quando a rede não acompanha, a leitura espera. Assim o uso de
+    memória depende do tamanho da fila, não do tamanho da entrada.
+
+    Args:
+        rows: Gerador de linhas (valor/sigla/filtro).
+        env_id: ID do ambiente.
+        field_name: Nome do campo.
+        already_sent_urls: Registro dos valores já enviados.
+        max_in_flight: Máximo de requisições simultâneas.
+        per_second: Limite de requisições por segundo.
+        retry_policy: Política de novas tentativas (opcional).
+        report_interval: Intervalo, em segundos, das linhas de progresso (0 desliga).
+
+    Returns:
+        O número de linhas processadas.
+    """
+    # Importados aqui para que o motor de threads não dependa do asyncio/aiohttp
+    import asyncio
+
+    from ..config.async_web_service import AsyncWebService
+
+    config = services.config
+    loop = asyncio.get_running_loop()
+    iterator = iter(rows)
+    queue = asyncio.Queue(maxsize=max(READ_CHUNK, max_in_flight * 2))
+    processed = 0
+
+    async def consumer(client):
+        nonlocal processed
+        while True:
+            element = await queue.get()
+            if element is None:
+                return
+            try:
+                await process_element_async(client, element, env_id, field_name, already_sent_urls)
+            except Exception as e:
+                metrics.inc("errors")
+                logging.error(f"Erro ao processar elemento: {element}. Erro: {e}")
+            processed += 1
+
+    async def reporter():
+        while True:
+            await asyncio.sleep(report_interval)
+            report_progress(f"Fila: {queue.qsize()}/{queue.maxsize}")
+
+    async with AsyncWebService(config.get_auth(), config.get_content_type(), per_second=per_second,
+                               max_in_flight=max_in_flight, retry_policy=retry_policy) as client:
+        consumers = [asyncio.create_task(consumer(client)) for _ in range(max_in_flight)]
+        progress = asyncio.create_task(reporter()) if report_interval > 0 else None
+        while True:
+            chunk = await loop.run_in_executor(None, _next_chunk, iterator, READ_CHUNK)
+            if not chunk:
+                break
+            for element in chunk:
+                await queue.put(element)
+        for _ in consumers:
+            await queue.put(None)
+        await asyncio.gather(*consumers)
+        if progress:
+            progress.cancel()
+    return processed
+
+
+def load_levels(file_path, snapshot: Optional[str] = None, parents_first: bool = False,
+                source: Optional[str] = None):
+    """
+    Abre a entrada (planilha, snapshot ou outra fonte) e, se pedido, separa as linhas por nível.
+
+    Args:
+        file_path: Caminho da planilha.
+        snapshot: Conjunto de dados lido do snapshot em vez da planilha (opcional).
+        parents_first: Se True, agrupa as linhas para criar cada pai antes dos filhos.
+        source: Fonte de registros lida em vez da planilha (ver source_row_generator).
+
+    Returns:
+        As linhas e a lista de níveis; sem parents_first há um único nível
+        com o gerador de linhas.
+    """
+    if snapshot:
+        rows = snapshot_row_generator(snapshot)
+    elif source:
+        rows = source_row_generator(source)
+    else:
+        rows = excel_row_generator(file_path)
+    # Tempo de leitura de cada linha (fase "read" das métricas)
+    rows = metrics.timed(rows, "read")
+
+    # Com parents_first, cada nível só começa depois que o anterior terminou
+    if not parents_first:
+        return rows, [rows]
+    rows = list(rows)
+    index = HierarchyIndex.from_rows(rows)
+    levels = list(index.levels(rows))
+    print(f"Envio por níveis: {len(levels)} níveis, {len(rows)} linhas.")
+    cycles = index.cycles()
+    if cycles:
+        say(0, f"Aviso: {len(cycles)} códigos formam um ciclo de pais e filhos "
+               f"(ex.: {', '.join(cycles[:5])}); a ordem entre eles não é garantida.")
+    return rows, levels
+
+
+def parse_target(spec: str) -> ServiceConfig:
+    """
+    Lê um destino no formato CLIENTE:ID_AMBIENTE[:MODO].
+
+    Usuário, senha, tipo de conteúdo e nome do campo vêm do ambiente (.env).
+
+    Args:
+        spec: O destino, por exemplo "cliente:12:dev".
+
+    Returns:
+        A configuração do destino.
+    """
+    parts = spec.split(":")
+    if len(parts) not in (2, 3) or not all(parts):
+        raise ValueError(f"destino inválido: {spec!r} (use CLIENTE:ID_AMBIENTE[:MODO])")
+    return ServiceConfig(client=parts[0], env_id=parts[1], mode=parts[2] if len(parts) == 3 else None)
+
+
+def adaptive_rate_limiter(config: ServiceConfig, per_second: float) -> AdaptiveRateLimiter:
+    """
+    Cria o limitador adaptativo com os limites RATE_MIN/RATE_MAX do ambiente.
+
+    O limitador começa em per_second; se per_second já estiver no teto
+    (RATE_MAX), começa no ponto médio entre RATE_MIN e RATE_MAX, para que o
+    AIMD tenha espaço para subir.
+
+    Args:
+        config: Configuração do ambiente.
+        per_second: Limite inicial de requisições por segundo.
+
+    Returns:
+        O limitador adaptativo.
+    """
+    min_rate, max_rate = config.get_rate_limits()
+    initial_rate = per_second if per_second < max_rate else (min_rate + max_rate) / 2
+    return AdaptiveRateLimiter(initial_rate, min_rate, max_rate)
+
+
+def build_target(config: ServiceConfig, workers: int = 10, retry_policy: Optional[RetryPolicy] = None,
+                 adaptive_rate: bool = False, journal_path: Optional[str] = None,
+                 per_second: float = PER_SECOND) -> UploadTarget:
+    """
+    Monta um destino do envio em leque, com limite de taxa, pool de conexões,
+    diário de progresso e contadores próprios.
+
+    Args:
+        config: Configuração do destino.
+        workers: Número de threads de envio deste destino.
+        retry_policy: Política de novas tentativas (opcional).
+        adaptive_rate: Se True, o limite de requisições/s se ajusta à resposta do servidor.
+        journal_path: Arquivo de progresso deste destino (opcional).
+        per_second: Limite de requisições por segundo deste destino.
+
+    Returns:
+        O destino pronto para o envio.
+    """
+    rate_limiter = None
+    if adaptive_rate:
+        rate_limiter = adaptive_rate_limiter(config, per_second)
+    web_service = WebService(config.get_auth(), config.get_content_type(), per_second=per_second,
+                             retry_policy=retry_policy, rate_limiter=rate_limiter, pool_size=workers)
+    registry = DedupRegistry(ProgressJournal(journal_path) if journal_path else None, compact=True)
+    name = f"{config.env_client}/{config.get_environment_id()}"
+    return UploadTarget(name, PerValueTransport(web_service, config.get_server()),
+                        config.get_environment_id(), config.get_field_name(), registry)
+
+
+def run_fanout(levels, targets: List[UploadTarget], workers: int = 10,
+               queue_size: Optional[int] = None, report_interval: float = 0) -> None:
+    """
+    Lê a entrada uma única vez e envia os mesmos valores a todos os destinos ao mesmo tempo.
+
+    Args:
+        levels: Níveis de linhas (valor/sigla/filtro), enviados um de cada vez.
+        targets: Os destinos.
+        workers: Número de threads de envio por destino.
+        queue_size: Máximo de valores pendentes por destino.
+        report_interval: Intervalo, em segundos, das linhas de progresso (0 desliga).
+    """
+    uploader = FanOutUploader(targets, workers, queue_size, report_interval)
+    uploader.run_levels([
+        [FieldValue(element['valor'], element.get('sigla'), element.get('filtro'))
+         for element in level if element.get('valor')]
+        for level in levels
+    ])
+    for target in targets:
+        summary = target.summary()
+        print(f"[{summary['target']}] Valores enviados: {summary['sent']}. "
+              f"Já enviados: {summary['skipped']}. Falhas: {summary['failed']}. "
+              f"Tempo: {summary['elapsed']:.1f}s ({summary['throughput']:.1f} linhas/s).")
+
+
+def shard_journal_path(journal_path: str, shard: int, shards: int) -> str:
+    """
+    Retorna o arquivo de progresso de um processo do modo --processes.
+
+    O número de processos faz parte do nome: uma retomada só encontra os
+    arquivos se usar o mesmo número de processos.
+
+    Args:
+        journal_path: Arquivo de progresso pedido (--journal).
+        shard: Índice do processo, a partir de 0.
+        shards: Número de processos.
+
+    Returns:
+        O arquivo de progresso do processo.
+    """
+    return f"{journal_path}.{shard + 1}-de-{shards}"
+
+
+def shard_worker(shard: int, shards: int, settings: Dict[str, Any], rows_queue, results,
+                 budget: SharedRateBudget) -> None:
+    """
+    Processo de envio de um shard: recebe as linhas pela fila e as envia com
+    sessão HTTP, registro de envios e métricas próprios.
+
+    Args:
+        shard: Índice deste processo, a partir de 0.
+        shards: Número de processos.
+        settings: Servidor, credenciais e opções de envio montados por run_sharded.
+        rows_queue: Fila com as linhas deste shard (ver ShardRouter).
+        results: Fila onde este processo avisa o fim de cada nível e manda o relatório final.
+        budget: Limite de requisições/s dividido entre todos os processos.
+    """
+    global call, server, verbosity, sample_request, metrics, progress_prefix
+    server = settings["server"]
+    verbosity = settings["verbosity"]
+    sample_request = Sampler(settings["sample_every"])
+    metrics = Metrics()
+    progress_prefix = f"[{shard + 1}/{shards}] "
+    log_handler = configure_logging(level=settings["log_level"])
+    retry_policy = RetryPolicy(max_retries=settings["max_retries"]) if settings["max_retries"] > 0 else None
+    call = WebService(settings["auth"], settings["content_type"], retry_policy=retry_policy,
+                      rate_limiter=budget, pool_size=settings["workers"],
+                      per_thread_session=settings["per_thread_session"])
+    journal_path = settings["journal"]
+    journal = ProgressJournal(shard_journal_path(journal_path, shard, shards)) if journal_path else None
+    registry = DedupRegistry(journal, compact=True)
+    if len(registry):
+        print(f"{progress_prefix}Retomando envio: {len(registry)} valores já registrados em {journal.path}.")
+
+    processed = elapsed = 0
+    start_console()
+    try:
+        for level in receive_levels(rows_queue):
+            stats = run_threads(level, settings["env_id"], settings["field_name"], registry,
+                                settings["workers"], settings["queue_size"], settings["progress_interval"])
+            processed += stats.processed
+            elapsed += stats.elapsed()
+            results.put(("level", shard, stats.processed))
+    except BaseException as e:
+        results.put(("error", shard, f"{type(e).__name__}: {e}"))
+        raise
+    finally:
+        stop_console()
+        registry.close()
+        stop_logging(log_handler)
+    results.put(("done", shard, {
+        "processed": processed,
+        "elapsed": elapsed,
+        "sent": registry.done_count(),
+        "metrics": metrics.export(),
+        "connections": call.connection_stats.snapshot(),
+    }))
+
+
+def run_sharded(levels, settings: Dict[str, Any], processes: int, per_second: float) -> None:
+    """
+    Envia as linhas com vários processos, um por shard, para não ficar preso ao GIL.
+
+    Cada linha vai para o shard do seu filtro (idPai), de modo que todos os
+    filhos de um pai ficam no mesmo processo e chegam a ele na ordem da
+    entrada. A linha que cria o próprio pai, porém, vai para o shard do avô,
+    que pode ser outro processo; por isso main sempre chama esta função com
+    os níveis de --parents-first, e um nível só começa depois que todos os
+    processos terminaram o anterior. O limite de requisições/s
+    vale para a soma dos processos. No fim, os contadores e latências de
+    todos os processos são somados em um único relatório.
+
+    Args:
+        levels: Níveis de linhas (valor/sigla/filtro), enviados um de cada vez.
+        settings: Servidor, credenciais e opções de envio de cada processo.
+        processes: Número de processos.
+        per_second: Limite de requisições por segundo de todos os processos juntos.
+    """
+    context = multiprocessing.get_context("spawn")
+    budget = SharedRateBudget(per_second, context)
+    queues = [context.Queue(maxsize=max(2 * settings["workers"], 4)) for _ in range(processes)]
+    results = context.Queue()
+    workers = [context.Process(target=shard_worker, name=f"shard-{shard + 1}",
+                               args=(shard, processes, settings, queues[shard], results, budget))
+               for shard in range(processes)]
+    for worker in workers:
+        worker.start()
+
+    def alive() -> bool:
+        return all(worker.is_alive() for worker in workers)
+
+    def wait_for(kind: str) -> list:
+        # Espera a mensagem `kind` de cada processo, sem travar se um deles morrer
+        received = []
+        while len(received) < processes:
+            try:
+                message, shard, payload = results.get(timeout=1)
+            except queue.Empty:
+                if not alive():
+                    raise RuntimeError("um processo de envio terminou inesperadamente")
+                continue
+            if message == "error":
+                raise RuntimeError(f"erro no processo {shard + 1}: {payload}")
+            if message == kind:
+                received.append((shard, payload))
+        return sorted(received)
+
+    router = ShardRouter(queues, alive=alive)
+    start = time.perf_counter()
+    try:
+        for level in levels:
+            router.route(level)
+            router.end_level()
+            wait_for("level")
+        router.stop()
+        reports = wait_for("done")
+    except BaseException:
+        for worker in workers:
+            worker.terminate()
+        raise
+    finally:
+        for worker in workers:
+            worker.join()
+    elapsed = time.perf_counter() - start
+
+    processed = sent = connections = 0
+    for shard, report in reports:
+        metrics.merge(report["metrics"])
+        processed += report["processed"]
+        sent += report["sent"]
+        connections += report["connections"]["connections"]
+        print(f"[{shard + 1}/{processes}] Linhas processadas: {report['processed']}. "
+              f"Valores enviados: {report['sent']}. Tempo: {report['elapsed']:.1f}s.")
+    print(f"Linhas processadas: {processed}. Valores enviados: {sent}. "
+          f"Tempo: {elapsed:.1f}s ({processed / elapsed if elapsed else 0.0:.1f} linhas/s, "
+          f"{processes} processos).")
+    print(f"Conexões abertas: {connections}. Limite: {budget.rate:.0f} req/s no total "
+          f"({budget.metrics()['granted']} requisições).")
+
+
+def main(argv: Optional[List[str]] = None):
     """
     Função principal para ler o arquivo Excel e processar os elementos em paralelo.
     """
-    already_sent_urls = set()  # Inicializa o conjunto de URLs enviadas
-    with concurrent.futures.ThreadPoolExecutor(max_workers=10) as executor:
-        for element in excel_row_generator(FILE_PATH):
-            executor.submit(process_element, element,
-                            environment_id, field_name, already_sent_urls)
+    parser = argparse.ArgumentParser(
+        description="Envia os valores da planilha para a API de fieldValues.")
+    parser.add_argument("--file", default=FILE_PATH, help="planilha de entrada")
+    parser.add_argument("--snapshot", choices=DATASETS, default=None,
+                        help="lê as linhas do snapshot binário deste conjunto de dados em vez da planilha")
+    parser.add_argument("--source", default=None, metavar="[TIPO:]LOCAL",
+                        help="lê as linhas direto de uma fonte em vez da planilha: nome do conjunto ou "
+                             "pasta de partes JSON, arquivo .csv ou .xlsx (tipos: json, csv, excel)")
+    parser.add_argument("--engine", choices=("threads", "async"), default="threads",
+                        help="motor de envio: ThreadPoolExecutor ou asyncio")
+    parser.add_argument("--server", default=None, metavar="URL",
+                        help="URL base do servidor em vez da do CLIENT/MODE (ex.: o servidor de teste "
+                             "local de benchmarks/stub_server.py)")
+    parser.add_argument("--per-second", type=float, default=PER_SECOND,
+                        help="limite de requisições por segundo (no modo adaptativo, o limite inicial)")
+    parser.add_argument("--workers", type=int, default=10,
+                        help="número de threads de envio (ou requisições simultâneas no modo async)")
+    parser.add_argument("--processes", type=int, default=1,
+                        help="divide as linhas por pai (filtro) entre N processos de envio, cada um com "
+                             "--workers threads; o limite de requisições/s vale para a soma deles. "
+                             "Implica --parents-first: um pai e seus filhos podem cair em processos "
+                             "diferentes, então cada nível só começa depois do anterior. "
+                             "Com --journal, cada processo usa o arquivo <journal>.<i>-de-<N>")
+    parser.add_argument("--queue-size", type=int, default=None,
+                        help="máximo de itens pendentes na fila (padrão: 4 por thread)")
+    parser.add_argument("--progress-interval", type=float, default=5,
+                        help="segundos entre as linhas de progresso (0 desliga)")
+    parser.add_argument("--adaptive-rate", action="store_true",
+                        help="ajusta o limite de requisições/s entre RATE_MIN e RATE_MAX "
+                             "(padrão: 10 e 480) conforme a latência e os erros observados")
+    parser.add_argument("--per-thread-session", action="store_true",
+                        help="uma sessão HTTP por thread em vez de um pool compartilhado")
+    parser.add_argument("--max-retries", type=int, default=5,
+                        help="novas tentativas em caso de 429/503 ou falha de conexão (0 desliga)")
+    parser.add_argument("--journal", default=None,
+                        help="arquivo de progresso; valores já registrados nele não são reenviados")
+    parser.add_argument("--batch-size", type=int, default=0,
+                        help="agrupa os valores por pai em lotes deste tamanho (0 = sem lotes)")
+    parser.add_argument("--bulk", action="store_true",
+                        help="envia cada lote em uma única requisição (requer endpoint de lote)")
+    parser.add_argument("--parents-first", action="store_true",
+                        help="envia os valores nível por nível, criando cada pai antes dos filhos")
+    parser.add_argument("--resolve-parents", action="store_true",
+                        help="envia como idPai o ID do pai no servidor em vez do código da coluna filtro "
+                             "(use com --parents-first para criar os pais antes)")
+    parser.add_argument("--parent-cache-ttl", type=float, default=3600,
+                        help="segundos que um ID de pai fica no cache")
+    parser.add_argument("--sync", action="store_true",
+                        help="lê os valores existentes uma vez e envia só os que faltam no servidor")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="só mostra quantos valores seriam criados e quantos já existem (implica --sync)")
+    parser.add_argument("--page-size", type=int, default=500,
+                        help="valores por página na listagem dos valores existentes")
+    parser.add_argument("--target", action="append", default=[], metavar="CLIENTE:ID_AMBIENTE[:MODO]",
+                        help="envia a mesma entrada a vários destinos ao mesmo tempo (repita a opção); "
+                             "com --journal, cada destino usa o arquivo <journal>.<cliente>-<ambiente>")
+    parser.add_argument("-v", "--verbose", action="count", default=0,
+                        help="mais detalhes: -v mostra também cabeçalhos e JSON das respostas "
+                             "e grava o log em nível DEBUG")
+    parser.add_argument("-q", "--quiet", action="store_true",
+                        help="não mostra cada envio, só erros, progresso e o resumo")
+    parser.add_argument("--sample-every", type=int, default=100, metavar="N",
+                        help="mostra as mensagens de um envio a cada N (1 mostra todos); "
+                             "o progresso e os erros sempre aparecem")
+    parser.add_argument("--metrics-out", default=None,
+                        help="arquivo com contadores e latências, atualizado a cada linha de progresso")
+    parser.add_argument("--metrics-format", choices=("json", "prometheus"), default=None,
+                        help="formato do arquivo de métricas (padrão: prometheus para .prom, senão json)")
+    args = parser.parse_args(argv)
+
+    global verbosity, metrics, metrics_path, metrics_format, sample_request
+    verbosity = 0 if args.quiet else 1 + args.verbose
+    sample_request = Sampler(args.sample_every)
+    metrics = Metrics()
+    metrics_path, metrics_format = args.metrics_out, args.metrics_format
+    log_handler = configure_logging(level=logging.DEBUG if verbosity >= 2 else logging.ERROR)
+    if args.engine == "async" and args.batch_size > 0:
+        parser.error("--batch-size não é suportado com --engine async")
+    if args.engine == "async" and args.per_thread_session:
+        parser.error("--per-thread-session não é suportado com --engine async (use --workers)")
+    if args.source and args.snapshot:
+        parser.error("use --source ou --snapshot, não os dois")
+    if args.processes < 1:
+        parser.error("--processes deve ser pelo menos 1")
+    if args.processes > 1 and (args.engine == "async" or args.batch_size > 0 or args.target
+                               or args.adaptive_rate or args.resolve_parents or args.sync or args.dry_run):
+        parser.error("--processes só é suportado com o motor de threads, sem lotes, --target, "
+                     "--adaptive-rate, --resolve-parents, --sync ou --dry-run")
+    if args.processes > 1:
+        # Um pai e seus filhos podem cair em processos diferentes: só a ordem por níveis garante o pai antes
+        args.parents_first = True
+
+    global call, server
+    if args.server:
+        server = args.server if args.server.endswith("/") else args.server + "/"
+    retry_policy = RetryPolicy(max_retries=args.max_retries) if args.max_retries > 0 else None
+
+    if args.target:
+        if args.engine == "async" or args.batch_size > 0:
+            parser.error("--target só é suportado com o motor de threads, sem lotes")
+        if args.resolve_parents or args.sync or args.dry_run:
+            parser.error("--target não é suportado com --resolve-parents, --sync ou --dry-run")
+        if args.server:
+            parser.error("--server não se aplica a --target: cada destino usa o servidor do seu cliente")
+        try:
+            configs = [parse_target(spec) for spec in args.target]
+        except ValueError as e:
+            parser.error(str(e))
+        targets = []
+        try:
+            for config in configs:
+                journal_path = None
+                if args.journal:
+                    journal_path = f"{args.journal}.{config.env_client}-{config.get_environment_id()}"
+                # Cada destino tem a própria política: a pausa de um não trava os outros
+                policy = RetryPolicy(max_retries=args.max_retries) if args.max_retries > 0 else None
+                targets.append(build_target(config, args.workers, policy, args.adaptive_rate, journal_path,
+                                            args.per_second))
+            _, levels = load_levels(args.file, args.snapshot, args.parents_first, args.source)
+            run_fanout(levels, targets, args.workers, args.queue_size, args.progress_interval)
+        finally:
+            for target in targets:
+                target.registry.close()
+            stop_logging(log_handler)
+        return
+
+    # A configuração só é lida depois dos argumentos: --help não toca no .env
+    service = services.config
+    environment_id = service.get_environment_id()
+    field_name = service.get_field_name()
+
+    if args.processes > 1:
+        settings = {
+            "server": get_server(), "auth": service.get_auth(), "content_type": service.get_content_type(),
+            "env_id": environment_id, "field_name": field_name, "workers": args.workers,
+            "queue_size": args.queue_size, "progress_interval": args.progress_interval,
+            "max_retries": args.max_retries, "per_thread_session": args.per_thread_session,
+            "journal": args.journal, "verbosity": verbosity,
+            "sample_every": args.sample_every, "log_level": logging.getLogger().level,
+        }
+        _, levels = load_levels(args.file, args.snapshot, args.parents_first, args.source)
+        try:
+            run_sharded(levels, settings, args.processes, args.per_second)
+            print_metrics_summary()
+        finally:
+            stop_logging(log_handler)
+        return
+
+    rate_limiter = None
+    if args.adaptive_rate:
+        if args.engine == "async":
+            parser.error("--adaptive-rate não é suportado com --engine async")
+        rate_limiter = adaptive_rate_limiter(service, args.per_second)
+    # Uma conexão keep-alive por thread: o pool acompanha o número de threads
+    call = WebService(service.get_auth(), service.get_content_type(), per_second=args.per_second, retry_policy=retry_policy,
+                      rate_limiter=rate_limiter, pool_size=args.workers,
+                      per_thread_session=args.per_thread_session)
+
+    global parent_resolver, existing_values
+    parent_resolver = existing_values = None
+    if args.resolve_parents:
+        parent_resolver = ParentResolver(
+            lambda code: lookup_parent_id(environment_id, field_name, code), ttl=args.parent_cache_ttl)
+    if args.sync or args.dry_run:
+        existing_values = ExistingValues()
+    if parent_resolver is not None or existing_values is not None:
+        # Uma única listagem serve aos dois
+        loaded = prefetch_existing(environment_id, field_name, parent_resolver, existing_values,
+                                   args.page_size)
+        print(f"Valores existentes lidos do servidor: {loaded}.")
+
+    # Inicializa o registro de URLs enviadas, retomando o diário de progresso se houver
+    journal = ProgressJournal(args.journal) if args.journal else None
+    already_sent_urls = DedupRegistry(journal, compact=True)
+    if len(already_sent_urls):
+        print(f"Retomando envio: {len(already_sent_urls)} valores já registrados em {args.journal}.")
+
+    rows, levels = load_levels(args.file, args.snapshot, args.parents_first, args.source)
+
+    # Daqui em diante as threads de envio só enfileiram as mensagens do console
+    start_console()
+    try:
+        if args.dry_run:
+            report = dry_run(rows)
+            print("Diferença em relação ao servidor (nada foi enviado):")
+            for line in report.lines():
+                print(f"  {line}")
+            return
+
+        if args.engine == "async":
+            import asyncio
+
+            processed, start = 0, time.perf_counter()
+            for level in levels:
+                processed += asyncio.run(run_async(level, environment_id, field_name,
+                                                   already_sent_urls, max_in_flight=args.workers,
+                                                   per_second=args.per_second, retry_policy=call.retry_policy,
+                                                   report_interval=args.progress_interval))
+            elapsed = time.perf_counter() - start
+            say(0, f"Linhas processadas: {processed}. Valores enviados: {already_sent_urls.done_count()}. "
+                   f"Tempo: {elapsed:.1f}s ({processed / elapsed if elapsed else 0.0:.1f} linhas/s).")
+            return
+
+        if args.batch_size > 0:
+            for level in levels:
+                run_batched(level, environment_id, field_name,
+                            already_sent_urls, args.batch_size, args.bulk, args.workers,
+                            args.queue_size, args.progress_interval)
+            return
+
+        processed = elapsed = 0
+        for level in levels:
+            stats = run_threads(level, environment_id, field_name,
+                                already_sent_urls, args.workers, args.queue_size, args.progress_interval)
+            processed += stats.processed
+            elapsed += stats.elapsed()
+        say(0, f"Linhas processadas: {processed}. Valores enviados: {already_sent_urls.done_count()}. "
+               f"Tempo: {elapsed:.1f}s ({processed / elapsed if elapsed else 0.0:.1f} linhas/s).")
+    finally:
+        stop_console()
+        already_sent_urls.close()
+        keys, memory = len(already_sent_urls), already_sent_urls.memory()
+        if keys and memory:
+            print(f"Registro de envios: {keys} chaves em {memory / 1024:.0f} KB "
+                  f"({memory / keys:.0f} bytes/chave).")
+        if args.engine == "threads":
+            connections = call.connection_stats.snapshot()
+            print(f"Conexões abertas: {connections['connections']} "
+                  f"(reuso {connections['reuse_rate']:.1%}, "
+                  f"handshake médio {connections['average_handshake'] * 1000:.1f} ms).")
+        if parent_resolver is not None:
+            cache = parent_resolver.stats()
+            print(f"Cache de pais: {cache['hits']} acertos, {cache['misses']} faltas, "
+                  f"{cache['fetches']} consultas ao servidor.")
+        if call.rate_limiter:
+            limits = call.rate_limiter.metrics()
+            print(f"Limite final: {limits['rate']} req/s "
+                  f"({limits['increases']} aumentos, {limits['decreases']} reduções).")
+        print_metrics_summary()
+        stop_logging(log_handler)
 
 
 if __name__ == "__main__":
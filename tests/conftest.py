@@ -0,0 +1,27 @@
+import pytest
+
+from ..config.factory import ServiceFactory
+from ..scripts import list_values as list_values_module
+from ..util.dedup_registry import DedupRegistry
+from ..util.metrics import Metrics
+
+ENVIRONMENT = {"USER": "test", "PASSWORD": "test", "CLIENT": "test", "ENV_ID": "1",
+               "CONTENT_TYPE": "application/json", "METADATA_NAME": "campo", "MODE": "dev"}
+
+
+@pytest.fixture
+def list_values(monkeypatch, tmp_path):
+    """scripts.list_values with the test environment and fresh module state."""
+    monkeypatch.chdir(tmp_path)
+    for name, value in ENVIRONMENT.items():
+        monkeypatch.setenv(name, value)
+    module = list_values_module
+    monkeypatch.setattr(module, "services", ServiceFactory())
+    monkeypatch.setattr(module, "call", None)
+    monkeypatch.setattr(module, "server", None)
+    monkeypatch.setattr(module, "already_sent_urls", DedupRegistry(compact=True))
+    monkeypatch.setattr(module, "parent_resolver", None)
+    monkeypatch.setattr(module, "existing_values", None)
+    monkeypatch.setattr(module, "metrics", Metrics())
+    monkeypatch.setattr(module, "verbosity", 0)
+    return module
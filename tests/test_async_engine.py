@@ -0,0 +1,115 @@
+import asyncio
+
+import aiohttp
+import pytest
+
+from ..benchmarks.stub_server import StubServer
+from ..config.async_web_service import AsyncWebService
+from ..config.retry import RetryPolicy
+from ..util.dedup_registry import DedupRegistry
+
+
+def _rows(count):
+    return [{"valor": f"VALOR {i}", "sigla": f"S{i}", "filtro": f"P{i % 5}"} for i in range(count)]
+
+
+def _policy():
+    return RetryPolicy(max_retries=20, backoff_base=0.001, backoff_max=0.01)
+
+
+def _run(list_values, stub, rows, registry):
+    list_values.server = stub.url
+    return asyncio.run(list_values.run_async(rows, "1", "campo", registry, max_in_flight=4,
+                                             per_second=10_000, retry_policy=_policy()))
+
+
+def test_every_row_is_sent_once(list_values):
+    registry = DedupRegistry(compact=True)
+    rows = _rows(50)
+    with StubServer(latency=0) as stub:
+        assert _run(list_values, stub, rows + rows[:10], registry) == 60
+        values = stub.values
+    assert sorted(entry["valor"] for entry in values) == sorted(row["valor"] for row in rows)
+    assert {(entry["valor"], entry["idPai"]) for entry in values} == \
+        {(row["valor"], row["filtro"]) for row in rows}
+    assert registry.done_count() == 50
+    assert list_values.metrics.snapshot()["counters"]["duplicates"] == 10
+
+
+def test_throttled_posts_are_retried(list_values):
+    registry = DedupRegistry(compact=True)
+    rows = _rows(40)
+    with StubServer(latency=0, error_rate=0.3, error_statuses=(429, 503), retry_after=0) as stub:
+        _run(list_values, stub, rows, registry)
+        values, errors = stub.values, stub.error_count
+    assert errors > 0
+    assert sorted(entry["valor"] for entry in values) == sorted(row["valor"] for row in rows)
+    assert registry.done_count() == 40
+
+
+def test_server_errors_are_not_retried_for_post(list_values):
+    registry = DedupRegistry(compact=True)
+    with StubServer(latency=0, error_rate=1.0, error_statuses=(500,)) as stub:
+        _run(list_values, stub, _rows(10), registry)
+        values, errors = stub.values, stub.error_count
+    assert values == []
+    assert errors == 10
+    assert registry.done_count() == 0
+    assert len(registry) == 0
+    assert list_values.metrics.snapshot()["counters"]["http_errors"] == 10
+
+
+def _count_attempts(client, timeout=None):
+    attempts = []
+    send = client.session.request
+
+    def request(method, url, **kwargs):
+        attempts.append(method)
+        if timeout is not None:
+            kwargs["timeout"] = aiohttp.ClientTimeout(total=timeout)
+        return send(method, url, **kwargs)
+
+    client.session.request = request
+    return attempts
+
+
+def test_timeouts_are_retried_for_get_but_not_for_post():
+    async def run():
+        policy = RetryPolicy(max_retries=2, backoff_base=0.001, backoff_max=0.001)
+        with StubServer(latency=0.5) as slow:
+            url = f"{slow.url}api/v2/fieldValues"
+            async with AsyncWebService("Basic x", "application/json", retry_policy=policy) as client:
+                attempts = _count_attempts(client, timeout=0.05)
+                with pytest.raises(asyncio.TimeoutError):
+                    await client.request(url, method="GET")
+                assert attempts == ["GET"] * 3
+                attempts.clear()
+                with pytest.raises(asyncio.TimeoutError):
+                    await client.request(url, method="POST")
+                assert attempts == ["POST"]
+
+    asyncio.run(run())
+
+
+def test_only_connect_errors_are_retried_for_post():
+    policy = RetryPolicy()
+    assert policy.should_retry_exception("GET", aiohttp.ServerDisconnectedError(), 0)
+    assert not policy.should_retry_exception("POST", aiohttp.ServerDisconnectedError(), 0)
+    assert policy.should_retry_exception("POST", aiohttp.ConnectionTimeoutError(), 0)
+    assert not policy.should_retry_exception("POST", aiohttp.SocketTimeoutError(), 0)
+    assert not policy.should_retry_exception("GET", aiohttp.ServerDisconnectedError(), policy.max_retries)
+
+
+def test_post_is_retried_when_the_connection_is_refused():
+    async def run():
+        with StubServer(latency=0) as stub:
+            url = f"{stub.url}api/v2/fieldValues"
+        # The server is stopped: every attempt fails to connect
+        policy = RetryPolicy(max_retries=2, backoff_base=0.001, backoff_max=0.001)
+        async with AsyncWebService("Basic x", "application/json", retry_policy=policy) as client:
+            attempts = _count_attempts(client)
+            with pytest.raises(aiohttp.ClientConnectorError):
+                await client.request(url, method="POST")
+            assert attempts == ["POST"] * 3
+
+    asyncio.run(run())
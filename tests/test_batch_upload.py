@@ -0,0 +1,119 @@
+import json
+
+from ..benchmarks.stub_server import StubServer
+from ..config.batch_transport import BulkTransport, FieldValue, ItemResult
+from ..util.batch_uploader import BatchUploader
+from ..util.dedup_registry import DedupRegistry
+from ..util.diff_sync import ExistingValues
+from ..util.parent_resolver import ParentResolver
+
+
+class _Recorder:
+    def __init__(self):
+        self.batches = []
+
+    def send_batch(self, env_id, field_name, items):
+        self.batches.append(list(items))
+        return [ItemResult(item, True, 201) for item in items]
+
+
+class _Response:
+    def __init__(self, payload, status_code=200):
+        self.status_code = status_code
+        self.headers = {"Content-Type": "application/json"}
+        self.payload = payload
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.payload
+
+
+class _Service:
+    def __init__(self, payload):
+        self.payload = payload
+        self.bodies = []
+
+    def request(self, url, method, body="", headers={}):
+        self.bodies.append(json.loads(body))
+        return _Response(self.payload)
+
+
+def test_values_are_grouped_by_parent():
+    uploader = BatchUploader(_Recorder(), "1", "campo", batch_size=2)
+    assert uploader.add(FieldValue("a", None, "P1")) is None
+    assert uploader.add(FieldValue("b", None, "P2")) is None
+    assert uploader.add(FieldValue("c", None, "P1")) == [FieldValue("a", None, "P1"), FieldValue("c", None, "P1")]
+    assert uploader.add(FieldValue("d", None, None)) is None
+    assert uploader.add(FieldValue("e", None, "P1")) is None
+
+
+def test_drain_flushes_the_partial_batches_once():
+    uploader = BatchUploader(_Recorder(), "1", "campo", batch_size=3)
+    for value, parent in [("a", "P1"), ("b", "P2"), ("c", "P1"), ("d", None)]:
+        assert uploader.add(FieldValue(value, None, parent)) is None
+    batches = list(uploader.drain())
+    assert sorted(batches) == sorted([[FieldValue("a", None, "P1"), FieldValue("c", None, "P1")],
+                                      [FieldValue("b", None, "P2")], [FieldValue("d", None, None)]])
+    assert list(uploader.drain()) == []
+
+
+def test_send_records_the_results():
+    recorder = _Recorder()
+    uploader = BatchUploader(recorder, "1", "campo", batch_size=2)
+    uploader.send([FieldValue("a"), FieldValue("b")])
+    assert recorder.batches == [[FieldValue("a"), FieldValue("b")]]
+    assert (uploader.report.batches, uploader.report.succeeded, uploader.report.failed) == (1, 2, 0)
+
+
+def test_bulk_partial_failure_marks_only_the_failed_items():
+    items = [FieldValue("a", "A", "P1"), FieldValue("b", None, "P1"), FieldValue("c", None, "P1")]
+    service = _Service([{"status": 201, "id": 1}, {"status": 409, "erro": "já existe"}, {"status": "201", "id": 3}])
+    results = BulkTransport(service, "http://server/").send_batch("1", "campo", items)
+    assert [(result.item, result.ok, result.status_code) for result in results] == [
+        (items[0], True, 201), (items[1], False, 409), (items[2], True, 201)]
+    assert results[1].error == "já existe"
+    assert service.bodies == [{"idAmbiente": "1", "nome": "campo", "valores": [
+        {"valor": "a", "sigla": "A", "idPai": "P1"}, {"valor": "b", "idPai": "P1"}, {"valor": "c", "idPai": "P1"}]}]
+
+
+def test_bulk_response_without_one_entry_per_item_fails_every_item():
+    items = [FieldValue("a"), FieldValue("b")]
+    for payload in ({"ok": True}, [{"status": 201}]):
+        results = BulkTransport(_Service(payload), "http://server/").send_batch("1", "campo", items)
+        assert [result.ok for result in results] == [False, False]
+
+
+def test_bulk_entry_with_an_invalid_status_fails():
+    items = [FieldValue("a"), FieldValue("b")]
+    service = _Service([{"status": None}, {"status": "abc"}])
+    results = BulkTransport(service, "http://server/").send_batch("1", "campo", items)
+    assert [result.ok for result in results] == [False, False]
+    assert results[1].error == "invalid status: 'abc'"
+
+
+def test_run_batched_counts_every_skipped_row(list_values):
+    existing = ExistingValues()
+    existing.add("P1", "on server")
+    list_values.existing_values = existing
+    list_values.parent_resolver = ParentResolver(lambda code: None if code == "MISSING" else code)
+    rows = [
+        {"valor": "a", "filtro": "P1"},
+        {"valor": "a", "filtro": "P1"},
+        {"valor": "on server", "filtro": "P1"},
+        {"valor": "b", "filtro": "MISSING"},
+        {"valor": "c", "filtro": "P2"},
+    ]
+    registry = DedupRegistry(compact=True)
+    with StubServer(latency=0) as stub:
+        list_values.server = stub.url
+        uploader = list_values.run_batched(rows, "1", "campo", registry, batch_size=10, bulk=True, workers=2)
+        created = sorted(entry["valor"] for entry in stub.values)
+    assert created == ["a", "c"]
+    assert uploader.report.succeeded == 2
+    counters = list_values.metrics.snapshot()["counters"]
+    assert counters["duplicates"] == 1
+    assert counters["existing"] == 1
+    assert counters["unresolved_parents"] == 1
+    assert counters["sent"] == 2
@@ -0,0 +1,98 @@
+import random
+import threading
+
+from ..util.dedup_registry import DedupRegistry
+from ..util.key_store import request_key
+from ..util.progress_journal import ProgressJournal
+
+
+def _run_threads(count, target):
+    barrier = threading.Barrier(count)
+
+    def run(index):
+        barrier.wait()
+        target(index)
+
+    threads = [threading.Thread(target=run, args=(index,)) for index in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def test_concurrent_claims_have_a_single_winner():
+    for compact in (False, True):
+        registry = DedupRegistry(compact=compact)
+        key = request_key({"valor": "ABP01"}) if compact else "ABP01"
+        wins = []
+        _run_threads(16, lambda index: wins.append(index) if registry.claim(key) else None)
+        assert len(wins) == 1
+        assert registry.state(key) == DedupRegistry.IN_FLIGHT
+
+
+def test_release_lets_the_key_be_claimed_again():
+    registry = DedupRegistry()
+    assert registry.claim("a")
+    assert not registry.claim("a")
+    registry.release("a")
+    assert registry.state("a") is None
+    assert registry.claim("a")
+
+
+def test_release_after_mark_done_keeps_the_key_done():
+    registry = DedupRegistry()
+    assert registry.claim("a")
+    registry.mark_done("a")
+    registry.release("a")
+    assert registry.state("a") == DedupRegistry.DONE
+    assert not registry.claim("a")
+
+
+def test_claim_release_and_mark_done_race(tmp_path):
+    # Every thread tries every key; a claimed send fails (release) about half
+    # of the time, so keys bounce between owners until one of them succeeds
+    keys = [request_key({"valor": f"V{i}"}) for i in range(200)]
+    journal = ProgressJournal(str(tmp_path / "journal.txt"), sync_every=50)
+    registry = DedupRegistry(journal, compact=True)
+    sent = []
+    sent_lock = threading.Lock()
+
+    def worker(index):
+        rng = random.Random(index)
+        pending = list(keys)
+        while pending:
+            key = pending.pop(rng.randrange(len(pending)))
+            while registry.state(key) != DedupRegistry.DONE:
+                if not registry.claim(key):
+                    continue
+                if rng.random() < 0.5:
+                    registry.release(key)
+                    continue
+                with sent_lock:
+                    sent.append(key)
+                registry.mark_done(key)
+
+    _run_threads(8, worker)
+    registry.close()
+
+    assert sorted(sent) == sorted(keys)
+    assert registry.done_count() == len(keys)
+    assert sorted(bytes.fromhex(line) for line in ProgressJournal(journal.path).load()) == sorted(keys)
+
+
+def test_resume_skips_keys_done_by_a_previous_run(tmp_path):
+    path = str(tmp_path / "journal.txt")
+    first = DedupRegistry(ProgressJournal(path), compact=True)
+    done = [request_key({"valor": f"V{i}"}) for i in range(10)]
+    for key in done:
+        assert first.claim(key)
+        first.mark_done(key)
+    first.close()
+    # A crash in the middle of the next line
+    with open(path, "a", encoding="utf-8") as file:
+        file.write(request_key({"valor": "torn"}).hex()[:7])
+
+    second = DedupRegistry(ProgressJournal(path), compact=True)
+    assert all(not second.claim(key) for key in done)
+    assert second.claim(request_key({"valor": "torn"}))
+    second.close()
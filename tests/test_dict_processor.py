@@ -0,0 +1,76 @@
+import pandas as pd
+import pytest
+
+from ..benchmarks.bench_dict_processor import legacy_process
+from ..util.dict_processor import DictProcessor, is_empty
+
+TWO_KEYS = [
+    {"filtro": "P0001", "valor": "ABP01"},
+    {"filtro": 11.0, "valor": "Válvula ç"},
+    {"filtro": 11, "valor": 12},
+    {"filtro": "", "valor": "Engenheiro"},
+    {"filtro": "Pedro", "valor": None},
+    {"filtro": None, "valor": ""},
+]
+ONE_KEY = [{"valor": "ABP01"}, {"valor": 11.0}, {"valor": ""}, {"valor": None}, {"valor": 7}]
+MIXED = [*TWO_KEYS[:2], {}, {"a": 1, "b": 2, "c": 3}, *ONE_KEY[:2]]
+
+
+def _columns(rows):
+    return {name: [row[name] for row in rows] for name in rows[0]}
+
+
+@pytest.mark.parametrize("rows", [TWO_KEYS, ONE_KEY, MIXED, []], ids=["2-key", "1-key", "mixed", "empty"])
+def test_rows_match_the_previous_implementation(rows):
+    assert DictProcessor(rows).process() == legacy_process(rows)
+    assert list(DictProcessor(iter(rows)).iter_labels()) == legacy_process(rows)
+
+
+@pytest.mark.parametrize("rows", [TWO_KEYS, ONE_KEY], ids=["2-key", "1-key"])
+def test_columns_match_the_rows(rows):
+    expected = legacy_process(rows)
+    assert DictProcessor.process_columns(_columns(rows)) == expected
+    for skip_empty in (False, True):
+        assert (DictProcessor.process_columns(_columns(rows), skip_empty=skip_empty)
+                == DictProcessor(rows, skip_empty=skip_empty).process())
+
+
+def test_columns_of_a_data_frame_match_its_records():
+    frame = pd.DataFrame({"filtro": ["P1", 11, None, "P4"], "valor": ["A", "B", "C", float("nan")]})
+    records = frame.to_dict(orient="records")
+    assert DictProcessor.process_columns(frame) == legacy_process(records)
+    assert (DictProcessor.process_columns(frame, skip_empty=True)
+            == DictProcessor(records, skip_empty=True).process() == ["P1 - A", "11 - B", "C", "P4"])
+
+
+def test_other_column_counts_give_no_labels():
+    assert DictProcessor.process_columns({}) == []
+    assert DictProcessor.process_columns({"a": [1], "b": [2], "c": [3]}) == []
+
+
+def test_skip_empty_with_two_keys():
+    assert DictProcessor(TWO_KEYS, skip_empty=True).process() == [
+        "P0001 - ABP01", "11.0 - Válvula ç", "11 - 12", "Engenheiro", "Pedro"]
+
+
+def test_skip_empty_with_one_key():
+    assert DictProcessor(ONE_KEY, skip_empty=True).process() == ["ABP01", 11.0, 7]
+    assert DictProcessor([{"valor": float("nan")}], skip_empty=True).process() == []
+
+
+def test_skip_empty_keeps_rows_without_empty_values_unchanged():
+    rows = TWO_KEYS[:3] + [{"valor": 0}, {"filtro": 0, "valor": False}]
+    assert DictProcessor(rows, skip_empty=True).process() == legacy_process(rows)
+
+
+@pytest.mark.parametrize("value, empty", [
+    (None, True), ("", True), (float("nan"), True),
+    (" ", False), (0, False), (0.0, False), (False, False), ("nan", False),
+])
+def test_is_empty(value, empty):
+    assert is_empty(value) is empty
+
+
+def test_display_prints_one_label_per_line(capsys):
+    DictProcessor([{"Nome": "", "Cargo": "Engenheiro"}, {"Nome": "Pedro", "Cargo": "Analista"}]).display()
+    assert capsys.readouterr().out == " - Engenheiro\nPedro - Analista\n"
@@ -0,0 +1,88 @@
+from ..benchmarks.stub_server import StubServer
+from ..util.diff_sync import DeltaReport, ExistingValues, value_key
+from ..util.parent_resolver import ParentResolver
+
+
+def test_keys_are_normalized():
+    assert value_key(11, "A", None) == value_key("11.0", "A", "") == value_key(11.0, "A", None)
+    assert value_key(None, 7, None) == value_key("", "7", None)
+    assert value_key(11, "A", None) != value_key(12, "A", None)
+    assert value_key(11, "A", None) != value_key(11, "A", "S")
+
+
+def test_existing_values_match_normalized_parents():
+    existing = ExistingValues()
+    assert existing.add_entries([{"valor": "C1", "sigla": None, "idPai": 11}, "not a value",
+                                 {"valor": "C2", "sigla": "S", "idPai": None}]) == 2
+    assert existing.contains("11.0", "C1")
+    assert existing.contains("11", "C1", "")
+    assert existing.contains(None, "C2", "S")
+    assert not existing.contains("11", "C2", "S")
+    assert len(existing) == 2
+
+
+def test_prefetch_reads_every_page(list_values):
+    values = [{"valor": f"V{i}", "sigla": None, "idPai": 11 if i % 2 else None} for i in range(23)]
+    existing = ExistingValues()
+    resolver = ParentResolver(lambda code: None)
+    with StubServer(latency=0) as stub:
+        stub.preload(values)
+        list_values.server = stub.url
+        assert list_values.prefetch_existing("1", "campo", resolver, existing, page_size=5) == 23
+        # Four full pages and a short last one
+        assert stub.list_count == 5
+    assert len(existing) == 23
+    assert all(existing.contains("11.0" if i % 2 else "", f"V{i}") for i in range(23))
+    assert resolver.resolve("V22") == "23"
+
+
+def test_prefetch_stops_after_an_exactly_full_page(list_values):
+    with StubServer(latency=0) as stub:
+        stub.preload({"valor": f"V{i}", "sigla": None, "idPai": None} for i in range(10))
+        list_values.server = stub.url
+        assert list_values.prefetch_existing("1", "campo", existing=ExistingValues(), page_size=5) == 10
+        assert stub.list_count == 3
+
+
+def test_report_counts_inserts_skips_and_duplicates():
+    existing = ExistingValues()
+    existing.add(11, "on server")
+    report = DeltaReport(sample_size=2)
+    assert report.record(existing, "11.0", "on server") == "skip"
+    assert report.record(existing, "11", "new") == "insert"
+    assert report.record(existing, 11.0, "new") == "duplicate"
+    assert report.record(existing, None, "other", "S") == "insert"
+    assert report.record(existing, None, "third") == "insert"
+    assert report.record(None, 11, "on server") == "insert"
+    assert (report.inserts, report.skips, report.duplicates) == (4, 1, 1)
+    assert report.sample == [("11", "new", None), (None, "other", "S")]
+
+
+def test_report_lines():
+    report = DeltaReport()
+    report.record(None, "P1", "Válvula", "V")
+    report.record(None, "P1", "Válvula", "V")
+    report.pending_parent = 3
+    assert report.lines() == [
+        "a criar: 1",
+        "ignorados (já existem no servidor): 0",
+        "repetidos na entrada: 1",
+        "valores sob um pai que ainda não está no servidor: 3",
+        "  + valor='Válvula' sigla='V' idPai='P1'",
+    ]
+
+
+def test_dry_run_uses_the_prefetched_values(list_values):
+    existing = ExistingValues()
+    existing.add("11", "C1")
+    list_values.existing_values = existing
+    list_values.parent_resolver = ParentResolver(lambda code: "11" if code == "EQ" else None)
+    rows = [
+        {"valor": "C1", "sigla": None, "filtro": "EQ"},
+        {"valor": "C2", "sigla": None, "filtro": "EQ"},
+        {"valor": "C2", "sigla": None, "filtro": "EQ"},
+        {"valor": "K1", "sigla": None, "filtro": "NEW"},
+        {"valor": "", "sigla": None, "filtro": "EQ"},
+    ]
+    report = list_values.dry_run(rows)
+    assert (report.inserts, report.skips, report.duplicates, report.pending_parent) == (1, 1, 1, 1)
@@ -0,0 +1,102 @@
+import pandas as pd
+import pytest
+from openpyxl import Workbook
+
+from ..util.excel_stream import ExcelStreamReader, to_float, to_int, to_text
+from ..util.read_excel import ExcelReader
+
+
+def _workbook(path, rows, header=("valor", "sigla", "filtro", "codigo", "extra")):
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.append(header)
+    for row in rows:
+        sheet.append(row)
+    workbook.save(path)
+    return str(path)
+
+
+@pytest.mark.parametrize("value", [11, 11.0, "11", " 11 ", "11.0"])
+def test_to_int_accepts_whole_numbers(value):
+    assert to_int(value) == 11
+
+
+def test_to_int_accepts_negative_numbers():
+    assert to_int("-3") == -3
+    assert to_int(-3.0) == -3
+
+
+@pytest.mark.parametrize("value", [11.5, "11.5", "abc", float("nan")])
+def test_to_int_rejects_other_values(value):
+    with pytest.raises(ValueError):
+        to_int(value)
+
+
+def test_empty_cells_stay_none():
+    assert to_int(None) is None
+    assert to_int("") is None
+    assert to_float("") is None
+    assert to_text(None) is None
+
+
+def test_to_text_keeps_integer_codes_as_integers():
+    assert to_text(11) == "11"
+    assert to_text(11.0) == "11"
+    assert to_text(11.5) == "11.5"
+    assert to_text("ABP01") == "ABP01"
+
+
+def test_dtypes_are_applied_per_column(tmp_path):
+    path = _workbook(tmp_path / "values.xlsx", [
+        ("A", None, 11, 11, "x"),
+        ("B", "S", 11.0, "11", "y"),
+        ("C", None, "11", 11.0, None),
+    ])
+    reader = ExcelStreamReader(path, dtypes={"valor": str, "filtro": str, "codigo": int})
+    rows = list(reader.iter_dicts())
+    assert [row["filtro"] for row in rows] == ["11", "11", "11"]
+    assert [row["codigo"] for row in rows] == [11, 11, 11]
+    assert [row["sigla"] for row in rows] == [None, "S", None]
+
+
+def test_fractional_value_in_an_int_column_fails(tmp_path):
+    path = _workbook(tmp_path / "values.xlsx", [("A", None, "P1", 11.5, None)])
+    with pytest.raises(ValueError):
+        list(ExcelStreamReader(path, dtypes={"codigo": int}).iter_dicts())
+
+
+def test_columns_are_projected_in_the_requested_order(tmp_path):
+    path = _workbook(tmp_path / "values.xlsx", [("A", "S", "P1", 1, "x"), (None, None, None, None, None),
+                                                 ("B",)])
+    reader = ExcelStreamReader(path, columns=("filtro", "valor"))
+    assert list(reader.iter_tuples()) == [("P1", "A"), (None, "B")]
+    assert reader.header == ("filtro", "valor")
+    with pytest.raises(ValueError):
+        list(ExcelStreamReader(path, columns=("valor", "missing")).iter_tuples())
+
+
+def test_chunks_cover_every_row(tmp_path):
+    path = _workbook(tmp_path / "values.xlsx", [(f"V{i}", None, f"P{i}", i, None) for i in range(7)])
+    chunks = list(ExcelStreamReader(path).iter_chunks(3))
+    assert [len(chunk) for chunk in chunks] == [3, 3, 1]
+    assert [row["valor"] for chunk in chunks for row in chunk] == [f"V{i}" for i in range(7)]
+
+
+def test_read_to_dict_matches_pandas(tmp_path):
+    path = _workbook(tmp_path / "values.xlsx", [
+        ("ABP01", "A1", 11, 1, "x"),
+        ("Válvula ç", None, 11.0, 2, None),
+        (12, "B", "P3", 3, "y"),
+        (12.5, None, None, 4, None),
+    ])
+    expected = pd.read_excel(path, dtype={"valor": str, "sigla": str, "filtro": str}).fillna("")
+    assert ExcelReader(path).read_to_dict() == expected.to_dict(orient="records")
+
+
+def test_read_to_dict_without_dtypes_matches_the_pandas_reader(tmp_path):
+    path = _workbook(tmp_path / "values.xlsx", [
+        ("ABP01", "A1", "P1", 1, "x"),
+        ("ABP02", None, "P2", 2, None),
+    ])
+    expected = pd.read_excel(path).fillna("").to_dict(orient="records")
+    assert ExcelReader(path, dtypes=None).read_to_dict() == expected
@@ -0,0 +1,102 @@
+import csv
+
+import pytest
+from openpyxl import load_workbook
+
+from ..util.excel_writer import StreamingCsvWriter, StreamingExcelWriter, open_writer
+
+HEADER = ("filtro", "valor")
+
+
+def _rows(count, start=0):
+    return [(f"P{i % 4}" if i % 3 else 11.0, f"Válvula {i}") for i in range(start, start + count)]
+
+
+def _text(value):
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return "" if value is None else str(value)
+
+
+def _sheets(path):
+    workbook = load_workbook(path, read_only=True)
+    try:
+        return {sheet.title: [tuple(row) for row in sheet.iter_rows(values_only=True)]
+                for sheet in workbook.worksheets}
+    finally:
+        workbook.close()
+
+
+def _csv(path):
+    with open(path, newline="", encoding="utf-8") as file:
+        return [tuple(row) for row in csv.reader(file)]
+
+
+@pytest.mark.parametrize("count, sheets", [(0, 1), (1, 1), (3, 1), (4, 2), (6, 2), (7, 3)])
+def test_sheets_roll_over_without_losing_rows(tmp_path, count, sheets):
+    rows = _rows(count)
+    path = tmp_path / "out.xlsx"
+    with StreamingExcelWriter(path, max_rows=4) as writer:
+        writer.start("componente", HEADER)
+        assert writer.write_rows(rows) == count
+    assert writer.sheets == ["componente"] + [f"componente_{part}" for part in range(2, sheets + 1)]
+    written = _sheets(path)
+    assert list(written) == writer.sheets
+    for sheet_rows in written.values():
+        assert sheet_rows[0] == HEADER
+        assert 1 <= len(sheet_rows) <= 4
+    assert [row for sheet_rows in written.values() for row in sheet_rows[1:]] == rows
+    assert writer.rows_written == count
+
+
+def test_every_dataset_gets_its_own_sheets(tmp_path):
+    path = tmp_path / "out.xlsx"
+    with StreamingExcelWriter(path, max_rows=3) as writer:
+        writer.start("conjunto_componente_com_um_nome_longo", HEADER)
+        writer.write_rows(_rows(5))
+        writer.start("item", ("valor",))
+        for row in _rows(2, start=5):
+            writer.append(row[1:])
+    written = _sheets(path)
+    assert list(written) == ["conjunto_componente_com_um_nome", "conjunto_componente_com_um_no_2",
+                             "conjunto_componente_com_um_no_3", "item"]
+    assert all(len(title) <= 31 for title in written)
+    assert written["item"] == [("valor",), ("Válvula 5",), ("Válvula 6",)]
+    assert writer.rows_written == 7
+
+
+def test_max_rows_must_leave_room_for_a_row(tmp_path):
+    with pytest.raises(ValueError):
+        StreamingExcelWriter(tmp_path / "out.xlsx", max_rows=1)
+    with pytest.raises(RuntimeError):
+        StreamingExcelWriter(tmp_path / "out.xlsx").append(("a", "b"))
+
+
+def test_csv_writes_one_file_per_dataset(tmp_path):
+    with StreamingCsvWriter(tmp_path / "out.csv", single_file=True) as writer:
+        writer.start("componente", HEADER)
+        writer.write_rows(_rows(3))
+        writer.start("item", HEADER)
+        writer.append(("P1", "A"))
+    assert writer.files == [str(tmp_path / "out.csv"), str(tmp_path / "out_item.csv")]
+    assert _csv(writer.files[0]) == [HEADER, ("11", "Válvula 0"), ("P1", "Válvula 1"), ("P2", "Válvula 2")]
+    assert _csv(writer.files[1]) == [HEADER, ("P1", "A")]
+
+
+@pytest.mark.parametrize("count", [0, 5, 9])
+def test_csv_and_xlsx_hold_the_same_rows(tmp_path, count):
+    rows = _rows(count)
+    outputs = {}
+    for extension in ("xlsx", "csv"):
+        with open_writer(tmp_path / f"out.{extension}", max_rows=3) as writer:
+            writer.start("componente", HEADER)
+            writer.write_rows(rows)
+        outputs[extension] = writer
+    assert isinstance(outputs["xlsx"], StreamingExcelWriter)
+    assert isinstance(outputs["csv"], StreamingCsvWriter)
+    sheets = _sheets(outputs["xlsx"].path)
+    xlsx_rows = [tuple(_text(value) for value in row) for sheet_rows in sheets.values() for row in sheet_rows[1:]]
+    csv_rows = _csv(outputs["csv"].files[0])
+    assert csv_rows[0] == HEADER
+    assert xlsx_rows == csv_rows[1:] == [tuple(_text(value) for value in row) for row in rows]
+    assert outputs["xlsx"].rows_written == outputs["csv"].rows_written == count
@@ -0,0 +1,79 @@
+import re
+
+import pytest
+
+from ..benchmarks.stub_server import StubServer
+from ..config.batch_transport import FieldValue, PerValueTransport
+from ..config.web_service import WebService
+from ..util.fanout import FanOutUploader, UploadTarget
+
+
+def _target(name, stub, timeout=None):
+    service = WebService("Basic x", "application/json", per_second=10_000, pool_size=4)
+    if timeout is not None:
+        send = service.session.request
+
+        def request(method, url, **kwargs):
+            return send(method, url, **{**kwargs, "timeout": timeout})
+
+        service.session.request = request
+    return UploadTarget(name, PerValueTransport(service, stub.url), "1", "campo")
+
+
+def _levels(count):
+    parents = [{"valor": f"P{i}", "sigla": None, "filtro": None} for i in range(count // 2)]
+    children = [{"valor": f"C{i}", "sigla": "S", "filtro": f"P{i % 3}"} for i in range(count - count // 2)]
+    return [parents, children]
+
+
+@pytest.mark.parametrize("failing", [
+    {"error_rate": 1.0, "error_statuses": (503,)},
+    {"latency": 1.0, "timeout": 0.1},
+], ids=["503", "hangs"])
+def test_healthy_target_gets_every_row(list_values, capsys, failing):
+    failing = dict(failing)
+    timeout = failing.pop("timeout", None)
+    levels = _levels(20)
+    with StubServer(latency=0) as healthy_stub, StubServer(**failing) as failing_stub:
+        healthy = _target("saudavel", healthy_stub)
+        broken = _target("falhando", failing_stub, timeout)
+        list_values.run_fanout(levels, [healthy, broken], workers=4)
+        created = healthy_stub.values
+    assert sorted(entry["valor"] for entry in created) == sorted(row["valor"] for level in levels for row in level)
+    assert all(entry["idPai"] == f"P{int(entry['valor'][1:]) % 3}" for entry in created if entry["valor"][0] == "C")
+    assert healthy.summary()["sent"] == 20
+    assert healthy.summary()["failed"] == 0
+    assert broken.summary()["sent"] == 0
+    assert broken.summary()["failed"] == 20
+
+    lines = capsys.readouterr().out.splitlines()
+    assert any(re.match(r"\[saudavel\] Valores enviados: 20\. Já enviados: 0\. Falhas: 0\.", line)
+               for line in lines)
+    assert any(re.match(r"\[falhando\] Valores enviados: 0\. Já enviados: 0\. Falhas: 20\.", line)
+               for line in lines)
+
+
+def test_slow_target_does_not_hold_up_the_fast_one():
+    items = [FieldValue(f"V{i}") for i in range(8)]
+    with StubServer(latency=0) as fast_stub, StubServer(latency=0.2) as slow_stub:
+        fast, slow = _target("rapido", fast_stub), _target("lento", slow_stub)
+        stats = FanOutUploader([fast, slow], workers=2).run(items)
+    assert stats["rapido"].processed == stats["lento"].processed == 8
+    assert (fast.sent, slow.sent) == (8, 8)
+    # Each target's time is its own, not the slowest target's
+    assert slow.summary()["elapsed"] >= 0.7
+    assert fast.summary()["elapsed"] < slow.summary()["elapsed"] / 2
+
+
+def test_a_value_already_sent_is_skipped_per_target():
+    with StubServer(latency=0) as first_stub, StubServer(latency=0) as second_stub:
+        first, second = _target("a", first_stub), _target("b", second_stub)
+        first.registry.mark_done(first.key(FieldValue("V0")))
+        FanOutUploader([first, second], workers=2).run([FieldValue("V0"), FieldValue("V1")])
+    assert (first.sent, first.skipped) == (1, 1)
+    assert (second.sent, second.skipped) == (2, 0)
+
+
+def test_at_least_one_target_is_required():
+    with pytest.raises(ValueError):
+        FanOutUploader([])
@@ -0,0 +1,121 @@
+import random
+
+from ..util.hierarchy import HierarchyIndex, normalize_code
+
+
+def _level_of(levels):
+    return {row["valor"]: position for position, level in enumerate(levels) for row in level}
+
+
+def test_codes_are_normalized():
+    assert normalize_code(11) == normalize_code(11.0) == normalize_code("11") == normalize_code(" 11 ") == "11"
+    assert normalize_code(11.5) == "11.5"
+    assert normalize_code(float("nan")) is None
+    assert normalize_code("") is None
+    assert normalize_code(None) is None
+
+
+def test_numeric_and_text_codes_are_the_same_node():
+    index = HierarchyIndex.from_rows([
+        {"valor": 11, "filtro": "EQ"},
+        {"valor": "C1", "filtro": 11.0},
+        {"valor": "C2", "filtro": "11"},
+    ])
+    assert index.children_of("11") == ["C1", "C2"]
+    assert index.parents_of(11.0) == ["EQ"]
+    assert index.depth("C2") == 2
+
+
+def test_parents_come_before_their_children():
+    rng = random.Random(7)
+    rows, codes = [], ["ROOT"]
+    for i in range(300):
+        code = f"N{i}"
+        rows.append({"valor": code, "filtro": rng.choice(codes)})
+        codes.append(code)
+    rng.shuffle(rows)
+    index = HierarchyIndex.from_rows(rows)
+    levels = list(index.levels(rows))
+    level = _level_of(levels)
+    for row in rows:
+        if row["filtro"] in level:
+            assert level[row["filtro"]] < level[row["valor"]]
+    assert sum(len(group) for group in levels) == len(rows)
+    # Rows keep their input order inside a level
+    for group in levels:
+        assert group == [row for row in rows if row in group]
+
+
+def test_depth_follows_the_longest_chain():
+    index = HierarchyIndex.from_rows([
+        {"valor": "B", "filtro": "A"},
+        {"valor": "C", "filtro": "B"},
+        {"valor": "C", "filtro": "A"},
+    ])
+    assert index.depth("A") == 0
+    assert index.depth("B") == 1
+    assert index.depth("C") == 2
+
+
+def test_cycles_terminate_and_are_reported():
+    rows = [
+        {"valor": "A", "filtro": "C"},
+        {"valor": "B", "filtro": "A"},
+        {"valor": "C", "filtro": "B"},
+        {"valor": "D", "filtro": "C"},
+        {"valor": "X", "filtro": "ROOT"},
+    ]
+    index = HierarchyIndex.from_rows(rows)
+    assert sorted(index.cycles()) == ["A", "B", "C"]
+    levels = list(index.levels(rows))
+    assert sorted(row["valor"] for level in levels for row in level) == ["A", "B", "C", "D", "X"]
+    level = _level_of(levels)
+    assert level["C"] < level["D"]
+
+
+def test_self_parent_is_a_cycle():
+    index = HierarchyIndex.from_rows([{"valor": "A", "filtro": "A"}])
+    assert index.cycles() == ["A"]
+    assert index.depth("A") == 0
+
+
+def test_tree_has_no_cycles():
+    index = HierarchyIndex.from_rows([{"valor": "B", "filtro": "A"}, {"valor": "C", "filtro": "B"}])
+    assert index.cycles() == []
+
+
+def test_orphan_rows_go_to_the_level_below_their_missing_parent():
+    rows = [
+        {"valor": "EQ1", "filtro": None},
+        {"valor": "C1", "filtro": "EQ1"},
+        {"valor": "C2", "filtro": "MISSING"},
+        {"valor": "K1", "filtro": "C2"},
+    ]
+    index = HierarchyIndex.from_rows(rows)
+    assert index.is_orphan("MISSING")
+    assert not index.is_orphan("EQ1")
+    assert index.orphans() == ["MISSING"]
+    levels = list(index.levels(rows))
+    level = _level_of(levels)
+    assert level["EQ1"] == 0
+    assert level["C1"] == level["C2"] == 1
+    assert level["K1"] == 2
+
+
+def test_roots_are_not_orphans():
+    index = HierarchyIndex()
+    index.add("EQ1", "C1")
+    index.roots["EQ1"] = None
+    assert not index.is_orphan("EQ1")
+    assert index.orphans() == []
+
+
+def test_descendants_by_depth():
+    index = HierarchyIndex.from_rows([
+        {"valor": "C1", "filtro": "EQ"},
+        {"valor": "C2", "filtro": "EQ"},
+        {"valor": "K1", "filtro": "C1"},
+        {"valor": "K2", "filtro": "C2"},
+    ])
+    assert index.descendants("EQ") == ["C1", "C2", "K1", "K2"]
+    assert index.descendants("EQ", depth=2) == ["K1", "K2"]
@@ -0,0 +1,68 @@
+import random
+from collections import Counter
+from urllib.parse import urlencode
+
+from ..util.key_store import CompactKeyTable, journal_key, request_key
+
+
+def _check(table, expected):
+    assert len(table) == len(expected)
+    assert all(table.get(key) == value for key, value in expected.items())
+    counts = Counter(expected.values())
+    assert all(table.count(value) == counts[value] for value in ("a", "b", "c"))
+
+
+def test_compact_table_matches_a_dict_under_random_operations():
+    rng = random.Random(1234)
+    table, expected = CompactKeyTable(capacity=8), {}
+    keys = [request_key({"valor": str(i)}) for i in range(3000)]
+    for step in range(60_000):
+        key = rng.choice(keys)
+        operation = rng.random()
+        if operation < 0.4:
+            value = rng.choice("abc")
+            table[key] = expected[key] = value
+        elif operation < 0.6:
+            value = rng.choice("abc")
+            assert table.setdefault(key, value) == expected.setdefault(key, value)
+        elif operation < 0.85:
+            if key in expected:
+                del expected[key]
+                del table[key]
+            else:
+                assert key not in table
+        else:
+            assert table.get(key, "missing") == expected.get(key, "missing")
+        if step % 5000 == 0:
+            _check(table, expected)
+    _check(table, expected)
+
+
+def test_compact_table_reuses_deleted_slots_without_growing():
+    table = CompactKeyTable(capacity=64)
+    slots = table.memory()
+    for i in range(10_000):
+        key = request_key({"valor": str(i)})
+        table[key] = "a"
+        del table[key]
+    assert len(table) == 0
+    assert table.memory() == slots
+
+
+def test_compact_table_grows_and_keeps_every_key():
+    table = CompactKeyTable(capacity=8)
+    keys = [request_key({"valor": str(i)}) for i in range(5000)]
+    for key in keys:
+        table[key] = "a"
+    assert table.memory() > 8 * 17
+    assert all(key in table for key in keys)
+    assert table.count("a") == len(keys)
+
+
+def test_journal_key_reads_hex_digests_and_legacy_urls():
+    params = {"idAmbiente": "1", "nome": "campo", "valor": "ABP01", "idPai": 11.0}
+    key = request_key(params)
+    assert journal_key(key.hex()) == key
+    url = "http://localhost/api/fieldValues?" + urlencode({**params, "idPai": "11.0"})
+    assert journal_key(url) == key
+    assert journal_key(url.replace("11.0", "11.5")) != key
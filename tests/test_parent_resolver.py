@@ -0,0 +1,148 @@
+import threading
+
+import pytest
+
+from ..util.parent_resolver import ParentResolver
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class _BlockingFetch:
+    # Holds every fetch until released, so the other threads pile up behind it
+    def __init__(self, result=None, error=None):
+        self.result = result
+        self.error = error
+        self.calls = []
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def __call__(self, code):
+        self.calls.append(code)
+        self.started.set()
+        self.release.wait(5)
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+def _resolve_in_threads(resolver, count):
+    results, errors = [], []
+
+    def run():
+        try:
+            results.append(resolver.resolve("P1"))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=run) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    return threads, results, errors
+
+
+def _wait_for_waiters(resolver, fetch, threads):
+    fetch.started.wait(5)
+    # Every thread has either started the fetch or is waiting for it
+    while resolver.stats()["misses"] < len(threads):
+        threading.Event().wait(0.001)
+    fetch.release.set()
+    for thread in threads:
+        thread.join(5)
+
+
+def test_concurrent_misses_share_one_fetch():
+    fetch = _BlockingFetch(result=42)
+    resolver = ParentResolver(fetch)
+    threads, results, errors = _resolve_in_threads(resolver, 8)
+    _wait_for_waiters(resolver, fetch, threads)
+    assert fetch.calls == ["P1"]
+    assert results == ["42"] * 8
+    assert errors == []
+    assert resolver.resolve("P1") == "42"
+    assert resolver.stats()["fetches"] == 1
+
+
+def test_fetch_error_reaches_every_waiter_and_is_not_cached():
+    fetch = _BlockingFetch(error=ConnectionError("server down"))
+    resolver = ParentResolver(fetch)
+    threads, results, errors = _resolve_in_threads(resolver, 8)
+    _wait_for_waiters(resolver, fetch, threads)
+    assert results == []
+    assert len(errors) == 8
+    assert all(isinstance(e, ConnectionError) for e in errors)
+    assert len(resolver) == 0
+
+    fetch.error, fetch.result = None, "7"
+    assert resolver.resolve("P1") == "7"
+    assert fetch.calls == ["P1", "P1"]
+
+
+def test_ids_expire_after_ttl():
+    clock, calls = _Clock(), []
+    resolver = ParentResolver(lambda code: calls.append(code) or "1", ttl=10, clock=clock)
+    assert resolver.resolve("P1") == "1"
+    clock.now = 9
+    assert resolver.resolve("P1") == "1"
+    assert calls == ["P1"]
+    clock.now = 10
+    assert resolver.get("P1") is None
+    assert resolver.resolve("P1") == "1"
+    assert calls == ["P1", "P1"]
+
+
+def test_unknown_codes_are_cached_for_negative_ttl():
+    clock, calls = _Clock(), []
+    resolver = ParentResolver(lambda code: calls.append(code), ttl=100, negative_ttl=5, clock=clock)
+    assert resolver.resolve("P1") is None
+    clock.now = 4
+    assert resolver.resolve("P1") is None
+    assert calls == ["P1"]
+    clock.now = 5
+    assert resolver.resolve("P1") is None
+    assert calls == ["P1", "P1"]
+
+
+def test_learning_an_id_replaces_a_negative_entry():
+    calls = []
+    resolver = ParentResolver(lambda code: calls.append(code))
+    assert resolver.resolve("P1") is None
+    resolver.learn("P1", 9)
+    assert resolver.resolve("P1") == "9"
+    assert calls == ["P1"]
+
+
+def test_least_recently_used_code_is_evicted():
+    resolver = ParentResolver(maxsize=2)
+    resolver.learn("A", 1)
+    resolver.learn("B", 2)
+    assert resolver.get("A") == "1"
+    resolver.learn("C", 3)
+    assert resolver.get("B") is None
+    assert resolver.get("A") == "1"
+    assert resolver.get("C") == "3"
+    assert len(resolver) == 2
+
+
+def test_without_fetch_only_learned_ids_resolve():
+    resolver = ParentResolver()
+    assert resolver.resolve("P1") is None
+    assert resolver.learn_many([("P1", 1), (None, 2), ("P2", None)]) == 1
+    assert resolver.resolve("P1") == "1"
+
+
+def test_owner_thread_reraises_the_fetch_error():
+    def fetch(code):
+        raise TimeoutError(code)
+
+    resolver = ParentResolver(fetch)
+    with pytest.raises(TimeoutError):
+        resolver.resolve("P1")
+    with pytest.raises(TimeoutError):
+        resolver.resolve("P1")
+    assert resolver.stats()["fetches"] == 2
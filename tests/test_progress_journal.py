@@ -0,0 +1,70 @@
+import os
+
+from ..util import progress_journal
+from ..util.progress_journal import ProgressJournal
+
+
+def _count_fsyncs(monkeypatch):
+    calls = []
+    real_fsync = os.fsync
+
+    def fsync(fd):
+        calls.append(fd)
+        real_fsync(fd)
+
+    monkeypatch.setattr(progress_journal.os, "fsync", fsync)
+    return calls
+
+
+def test_load_ignores_a_torn_last_line(tmp_path):
+    path = tmp_path / "journal.txt"
+    path.write_text("a\nb\nto", encoding="utf-8")
+    assert list(ProgressJournal(str(path)).load()) == ["a", "b"]
+
+
+def test_open_cuts_off_a_torn_last_line(tmp_path):
+    path = tmp_path / "journal.txt"
+    path.write_text("a\nb\nto", encoding="utf-8")
+    with ProgressJournal(str(path)) as journal:
+        journal.append("c")
+    assert path.read_text(encoding="utf-8") == "a\nb\nc\n"
+
+
+def test_open_cuts_off_a_torn_line_longer_than_a_block(tmp_path):
+    path = tmp_path / "journal.txt"
+    path.write_text("a\n" + "x" * 10_000, encoding="utf-8")
+    with ProgressJournal(str(path)) as journal:
+        journal.append("b")
+    assert path.read_text(encoding="utf-8") == "a\nb\n"
+
+
+def test_open_empties_a_journal_holding_only_a_torn_line(tmp_path):
+    path = tmp_path / "journal.txt"
+    path.write_text("torn", encoding="utf-8")
+    ProgressJournal(str(path)).open().close()
+    assert path.read_text(encoding="utf-8") == ""
+
+
+def test_fsync_every_n_keys(tmp_path, monkeypatch):
+    calls = _count_fsyncs(monkeypatch)
+    journal = ProgressJournal(str(tmp_path / "journal.txt"), sync_every=10, sync_interval=3600).open()
+    for i in range(25):
+        journal.append(str(i))
+    assert len(calls) == 2
+    journal.close()
+    assert len(calls) == 3
+    assert len(list(journal.load())) == 25
+
+
+def test_fsync_after_the_interval(tmp_path, monkeypatch):
+    calls = _count_fsyncs(monkeypatch)
+    now = [0.0]
+    monkeypatch.setattr(progress_journal.time, "monotonic", lambda: now[0])
+    journal = ProgressJournal(str(tmp_path / "journal.txt"), sync_every=1000, sync_interval=1.0).open()
+    journal.append("a")
+    journal.append("b")
+    assert calls == []
+    now[0] = 1.5
+    journal.append("c")
+    assert len(calls) == 1
+    journal.close()
@@ -0,0 +1,142 @@
+import csv
+import json
+import threading
+import time
+
+import pytest
+from openpyxl import Workbook
+
+from ..util.record_sources import CsvSource, ExcelSource, JsonPartSource, open_source, prefetch
+
+DATASET = "conjunto_componente"
+# (filtro, valor) as each format stores them: JSON and Excel keep numbers, CSV only has text
+ROWS = [(11.0, "BU01"), ("11", "Válvula ç"), (12, 13.0), ("P0001", "ABP01")]
+EXPECTED = [
+    {"valor": "BU01", "sigla": None, "filtro": "11"},
+    {"valor": "Válvula ç", "sigla": None, "filtro": "11"},
+    {"valor": "13", "sigla": None, "filtro": "12"},
+    {"valor": "ABP01", "sigla": None, "filtro": "P0001"},
+]
+
+
+def _text(value):
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return "" if value is None else str(value)
+
+
+def _json(tmp_path, parts=2):
+    folder = tmp_path / DATASET
+    folder.mkdir()
+    size = -(-len(ROWS) // parts)
+    for part in range(parts):
+        records = {"1": {DATASET: {"filtro": "filtro", "valor": "valor"}}}
+        for position, (filtro, valor) in enumerate(ROWS[part * size:(part + 1) * size], start=2):
+            records[str(position)] = {DATASET: {"filtro": filtro, "valor": valor}}
+        (folder / f"{DATASET}_part{part + 1}.json").write_text(json.dumps(records, ensure_ascii=False),
+                                                               encoding="utf-8")
+    return JsonPartSource.from_folder(folder)
+
+
+def _excel(tmp_path):
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.append(("valor", "sigla", "filtro"))
+    for filtro, valor in ROWS:
+        sheet.append((valor, None, filtro))
+    path = tmp_path / "values.xlsx"
+    workbook.save(path)
+    return ExcelSource(path)
+
+
+def _csv(tmp_path):
+    path = tmp_path / "values.csv"
+    with open(path, "w", newline="", encoding="utf-8-sig") as file:
+        writer = csv.writer(file, delimiter=";")
+        writer.writerow(("valor", "sigla", "filtro"))
+        for filtro, valor in ROWS:
+            writer.writerow((_text(valor), "", _text(filtro)))
+    return CsvSource(path)
+
+
+def _prefetch_threads():
+    return [thread for thread in threading.enumerate() if thread.name == "prefetch"]
+
+
+@pytest.mark.parametrize("make_source", [_json, _excel, _csv], ids=["json", "excel", "csv"])
+def test_sources_yield_the_same_rows(tmp_path, make_source):
+    source = make_source(tmp_path)
+    assert list(source) == EXPECTED
+    # Each iteration reads the source again
+    assert list(source) == EXPECTED
+
+
+def test_json_source_skips_rows_without_filtro_or_valor(tmp_path):
+    folder = tmp_path / DATASET
+    folder.mkdir()
+    records = {str(i): {DATASET: {"filtro": filtro, "valor": valor}}
+               for i, (filtro, valor) in enumerate([(None, "EQ01"), ("P1", ""), ("P1", "A")], start=1)}
+    (folder / f"{DATASET}_part1.json").write_text(json.dumps(records), encoding="utf-8")
+    assert list(JsonPartSource.from_folder(folder)) == [{"valor": "A", "sigla": None, "filtro": "P1"}]
+
+
+def test_json_source_without_prefetch(tmp_path):
+    source = _json(tmp_path, parts=3)
+    source.prefetch_parts = 0
+    assert list(source) == EXPECTED
+
+
+def test_open_source_infers_the_kind(tmp_path, monkeypatch):
+    _json(tmp_path)
+    _excel(tmp_path)
+    _csv(tmp_path)
+    monkeypatch.chdir(tmp_path)
+    assert isinstance(open_source(DATASET, data_dir=str(tmp_path)), JsonPartSource)
+    assert isinstance(open_source("values.csv"), CsvSource)
+    assert isinstance(open_source("values.xlsx"), ExcelSource)
+    assert isinstance(open_source("csv:values.xlsx"), CsvSource)
+    assert [list(open_source(spec, str(tmp_path))) for spec in (DATASET, "values.csv", "values.xlsx")] == [
+        EXPECTED] * 3
+
+
+def test_prefetch_keeps_the_order_and_raises_producer_errors():
+    assert list(prefetch(range(50), depth=3)) == list(range(50))
+
+    def failing():
+        yield 1
+        raise KeyError("part")
+
+    items = prefetch(failing())
+    assert next(items) == 1
+    with pytest.raises(KeyError):
+        next(items)
+
+
+def test_prefetch_stops_when_the_consumer_stops_early():
+    produced = []
+
+    def parts():
+        for i in range(1000):
+            produced.append(i)
+            yield i
+
+    items = prefetch(parts(), depth=2)
+    assert [next(items) for _ in range(3)] == [0, 1, 2]
+    items.close()
+    deadline = time.monotonic() + 5
+    while _prefetch_threads() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert _prefetch_threads() == []
+    # The producer stayed at most `depth` items (plus the one it was offering) ahead
+    assert len(produced) <= 3 + 2 + 1
+
+
+def test_json_source_stops_prefetching_when_the_consumer_stops_early(tmp_path):
+    rows = iter(_json(tmp_path, parts=5))
+    assert next(rows) == EXPECTED[0]
+    rows.close()
+    assert list(rows) == []
+    deadline = time.monotonic() + 5
+    while _prefetch_threads() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert _prefetch_threads() == []
@@ -0,0 +1,141 @@
+import threading
+import time
+from email.utils import formatdate
+
+import pytest
+import requests
+
+from ..benchmarks.stub_server import StubServer
+from ..config.retry import CircuitBreaker, RetryPolicy, parse_retry_after
+from ..config.web_service import WebService
+
+
+def _service(policy, timeout=None):
+    service = WebService("Basic x", "application/json", per_second=10_000, retry_policy=policy)
+    attempts = []
+    send = service.session.request
+
+    def request(method, url, **kwargs):
+        attempts.append((method, time.monotonic()))
+        if timeout is not None:
+            kwargs["timeout"] = timeout
+        return send(method, url, **kwargs)
+
+    service.session.request = request
+    return service, attempts
+
+
+def _policy(max_retries=3):
+    return RetryPolicy(max_retries=max_retries, backoff_base=0.001, backoff_max=1.0)
+
+
+@pytest.mark.parametrize("status", [429, 503])
+def test_post_is_retried_on_throttling(status):
+    service, attempts = _service(_policy())
+    with StubServer(latency=0, error_rate=1.0, error_statuses=(status,), retry_after=0) as stub:
+        response = service.request(f"{stub.url}api/v2/fieldValues?valor=A", method="POST")
+    assert response.status_code == status
+    assert len(attempts) == 4
+
+
+def test_throttled_posts_end_up_created():
+    service, attempts = _service(RetryPolicy(max_retries=20, backoff_base=0.001, backoff_max=0.01))
+    with StubServer(latency=0, error_rate=0.4, error_statuses=(429, 503), retry_after=0) as stub:
+        statuses = [service.request(f"{stub.url}api/v2/fieldValues?valor=V{i}", method="POST").status_code
+                    for i in range(30)]
+        values, errors = stub.values, stub.error_count
+    assert statuses == [201] * 30
+    assert sorted(entry["valor"] for entry in values) == sorted(f"V{i}" for i in range(30))
+    assert len(attempts) == 30 + errors
+
+
+def test_post_is_not_retried_on_server_error():
+    service, attempts = _service(_policy())
+    with StubServer(latency=0, error_rate=1.0, error_statuses=(500,)) as stub:
+        response = service.request(f"{stub.url}api/v2/fieldValues?valor=A", method="POST")
+    assert response.status_code == 500
+    assert len(attempts) == 1
+
+
+def test_get_is_retried_on_server_error():
+    service, attempts = _service(_policy())
+    with StubServer(latency=0, error_rate=1.0, error_statuses=(500,)) as stub:
+        response = service.request(f"{stub.url}api/v2/fieldValues", method="GET")
+    assert response.status_code == 500
+    assert len(attempts) == 4
+
+
+def test_post_is_not_retried_on_read_timeout():
+    service, attempts = _service(_policy(), timeout=0.05)
+    with StubServer(latency=0.5) as stub:
+        with pytest.raises(requests.exceptions.ReadTimeout):
+            service.request(f"{stub.url}api/v2/fieldValues?valor=A", method="POST")
+        assert len(attempts) == 1
+        with pytest.raises(requests.exceptions.ReadTimeout):
+            service.request(f"{stub.url}api/v2/fieldValues", method="GET")
+        assert len(attempts) == 1 + 4
+
+
+def test_parse_retry_after_seconds_and_http_date():
+    assert parse_retry_after("3") == 3.0
+    assert parse_retry_after("0.5") == 0.5
+    assert parse_retry_after("-1") == 0.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("soon") is None
+    assert 8 <= parse_retry_after(formatdate(time.time() + 10, usegmt=True)) <= 10
+    assert parse_retry_after(formatdate(time.time() - 60, usegmt=True)) == 0.0
+
+
+def test_delay_honors_retry_after():
+    policy = RetryPolicy(backoff_base=0.001, backoff_max=5.0)
+    assert policy.delay(0, {"Retry-After": "2"}) == 2.0
+    assert 2 <= policy.delay(0, {"Retry-After": formatdate(time.time() + 3, usegmt=True)}) <= 3
+    # Capped at backoff_max
+    assert policy.delay(0, {"Retry-After": "60"}) == 5.0
+    # Without the header, the jittered backoff
+    assert 0 <= policy.delay(0, {}) <= 0.001
+
+
+def test_retry_after_pauses_the_retry():
+    service, attempts = _service(_policy(max_retries=1))
+    with StubServer(latency=0, error_rate=1.0, error_statuses=(429,), retry_after=0.3) as stub:
+        service.request(f"{stub.url}api/v2/fieldValues?valor=A", method="POST")
+    assert len(attempts) == 2
+    assert attempts[1][1] - attempts[0][1] >= 0.29
+
+
+def test_tripped_breaker_pauses_the_other_workers():
+    policy = RetryPolicy(max_retries=1, backoff_base=0.001, backoff_max=1.0,
+                         circuit_breaker=CircuitBreaker())
+    service, attempts = _service(policy)
+    with StubServer(latency=0, error_rate=1.0, error_statuses=(503,), retry_after=0.4) as stub:
+        url = f"{stub.url}api/v2/fieldValues?valor=A"
+        first = threading.Thread(target=service.request, args=(url, "POST"))
+        first.start()
+        while policy.circuit_breaker.trips == 0:
+            time.sleep(0.001)
+        tripped = time.monotonic()
+        # A second worker starts while the breaker is open
+        second = threading.Thread(target=service.request, args=(url, "POST"))
+        second.start()
+        first.join(5)
+        second.join(5)
+    assert len(attempts) == 4
+    # Only the first request went out before the pause
+    assert all(moment >= tripped + 0.3 for _, moment in attempts[1:])
+
+
+def test_breaker_opens_after_consecutive_failures():
+    breaker = CircuitBreaker(failure_threshold=3, cooldown=0.2)
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.remaining() == 0
+    breaker.record_failure()
+    assert 0 < breaker.remaining() <= 0.2
+    start = time.monotonic()
+    breaker.wait()
+    assert time.monotonic() - start >= 0.15
+    assert breaker.trips == 1
@@ -0,0 +1,106 @@
+import multiprocessing
+import queue
+import time
+
+import pytest
+
+from ..util.sharding import END_OF_LEVEL, STOP, SharedRateBudget, ShardRouter, receive_levels, shard_of
+
+CODES = ["P0001", "ABP01", 11, 11.0, "11", "Válvula", None, "", 0]
+
+
+def _shards(codes, shards):
+    return [shard_of(code, shards) for code in codes]
+
+
+def _acquire(budget, count, times):
+    for _ in range(count):
+        budget.acquire()
+        times.put(time.monotonic())
+
+
+def test_shard_is_stable_across_processes():
+    with multiprocessing.get_context("spawn").Pool(1) as pool:
+        assert pool.apply(_shards, (CODES, 7)) == _shards(CODES, 7)
+
+
+def test_equal_codes_share_a_shard():
+    for shards in (2, 3, 8):
+        assert shard_of(11, shards) == shard_of(11.0, shards) == shard_of("11", shards) == shard_of(" 11", shards)
+        assert shard_of(None, shards) == shard_of("", shards) == 0
+        assert all(0 <= shard < shards for shard in _shards(CODES, shards))
+
+
+def test_router_chunks_rows_per_shard_in_order():
+    queues = [queue.Queue() for _ in range(3)]
+    router = ShardRouter(queues, chunk_size=2)
+    rows = [{"valor": f"V{i}", "filtro": f"P{i % 5}"} for i in range(40)]
+    router.route(rows)
+    router.end_level()
+    router.route(rows[:3])
+    router.end_level()
+    router.stop()
+
+    for shard, rows_queue in enumerate(queues):
+        messages = []
+        while not rows_queue.empty():
+            messages.append(rows_queue.get())
+        assert messages[-1] == STOP
+        assert messages.count(END_OF_LEVEL) == 2
+        assert all(len(message) <= 2 for message in messages if isinstance(message, list))
+        first_level = messages[:messages.index(END_OF_LEVEL)]
+        expected = [row for row in rows if shard_of(row["filtro"], 3) == shard]
+        assert [row for chunk in first_level for row in chunk] == expected
+    assert sum(router.routed) == 43
+
+
+def test_receive_levels_follows_the_protocol():
+    rows_queue = queue.Queue()
+    router = ShardRouter([rows_queue], chunk_size=2)
+    router.route([{"valor": i, "filtro": "P"} for i in range(5)])
+    router.end_level()
+    router.end_level()
+    router.route([{"valor": 9, "filtro": "P"}])
+    router.end_level()
+    router.stop()
+    levels = [[row["valor"] for row in level] for level in receive_levels(rows_queue)]
+    assert levels == [[0, 1, 2, 3, 4], [], [9]]
+
+
+def test_router_raises_instead_of_hanging_when_a_worker_died():
+    full = queue.Queue(maxsize=1)
+    full.put("message nobody reads")
+    router = ShardRouter([full], chunk_size=1, alive=lambda: False)
+    with pytest.raises(RuntimeError):
+        router.route([{"valor": "V", "filtro": "P"}])
+
+
+def test_budget_spaces_the_slots():
+    budget = SharedRateBudget(50)
+    start = time.monotonic()
+    for _ in range(11):
+        budget.acquire()
+    # The first slot is free; the next ten are 1/50 s apart
+    assert time.monotonic() - start >= 0.19
+    assert budget.metrics() == {"rate": 50, "granted": 11, "increases": 0, "decreases": 0}
+
+
+def test_budget_caps_the_rate_of_every_process_together():
+    context = multiprocessing.get_context("spawn")
+    budget = SharedRateBudget(40, context)
+    times = context.Queue()
+    workers = [context.Process(target=_acquire, args=(budget, 10, times)) for _ in range(2)]
+    for worker in workers:
+        worker.start()
+    moments = sorted(times.get(timeout=30) for _ in range(20))
+    for worker in workers:
+        worker.join(30)
+    assert budget.metrics()["granted"] == 20
+    # 20 slots at 40 per second take at least 19/40 s, whichever process got
+    # them (less a margin for a late timestamp of the first slot)
+    assert moments[-1] - moments[0] >= 19 / 40 - 0.05
+
+
+def test_budget_rejects_a_non_positive_rate():
+    with pytest.raises(ValueError):
+        SharedRateBudget(0)
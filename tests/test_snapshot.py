@@ -0,0 +1,112 @@
+import json
+import os
+
+import pytest
+
+from ..util import snapshot as snapshot_module
+from ..util.json_parts import ColumnarRecords
+from ..util.snapshot import Snapshot, fingerprint_parts, load_snapshot, snapshot_path, write_snapshot
+
+DATASET = "componente"
+
+
+def _part(data_dir, number, rows):
+    folder = data_dir / DATASET
+    folder.mkdir(parents=True, exist_ok=True)
+    records = {"1": {DATASET: {"filtro": "filtro", "valor": "valor"}}}
+    for position, (filtro, valor) in enumerate(rows, start=2):
+        records[str(position)] = {DATASET: {"filtro": filtro, "valor": valor}}
+    path = folder / f"{DATASET}_part{number}.json"
+    path.write_text(json.dumps(records, ensure_ascii=False), encoding="utf-8")
+    return path
+
+
+@pytest.fixture
+def builds(monkeypatch):
+    calls = []
+    load_dataset = snapshot_module.load_dataset
+
+    def counting(*args, **kwargs):
+        calls.append(args)
+        return load_dataset(*args, **kwargs)
+
+    monkeypatch.setattr(snapshot_module, "load_dataset", counting)
+    return calls
+
+
+def test_round_trip_keeps_values_and_types(tmp_path):
+    filtro = [11, 11.0, "11", True, False, 1, "Válvula ç", "日本", 2.5, -3, 2 ** 40]
+    valor = ["a", "a", "b", "True", "0", 1.0, "ÁÉÍ", "x", float("inf"), "-3", "€"]
+    records = ColumnarRecords()
+    records.extend(filtro, valor)
+    path = write_snapshot(records, str(tmp_path / "x.snap"), DATASET, "fp")
+    with Snapshot(path) as snapshot:
+        assert len(snapshot) == len(filtro)
+        assert (snapshot.dataset, snapshot.fingerprint) == (DATASET, "fp")
+        for column, expected in (("filtro", filtro), ("valor", valor)):
+            decoded = snapshot.column(column)
+            assert decoded == expected
+            assert [type(value) for value in decoded] == [type(value) for value in expected]
+        assert snapshot.read_to_dict() == [{"filtro": f, "valor": v} for f, v in zip(filtro, valor)]
+
+
+def test_empty_records_round_trip(tmp_path):
+    path = write_snapshot(ColumnarRecords(), str(tmp_path / "x.snap"), DATASET, "fp")
+    with Snapshot(path) as snapshot:
+        assert len(snapshot) == 0
+        assert snapshot.read_to_dict() == []
+
+
+def test_load_snapshot_matches_the_part_files(tmp_path, builds):
+    _part(tmp_path, 1, [(11.0, "BU01"), ("P1", "Válvula")])
+    _part(tmp_path, 2, [(12, True)])
+    with load_snapshot(DATASET, str(tmp_path), workers=1) as snapshot:
+        assert snapshot.read_to_dict() == [
+            {"filtro": 11.0, "valor": "BU01"}, {"filtro": "P1", "valor": "Válvula"}, {"filtro": 12, "valor": True}]
+    with load_snapshot(DATASET, str(tmp_path), workers=1) as snapshot:
+        assert len(snapshot) == 3
+    assert len(builds) == 1
+
+
+def test_touching_a_part_file_triggers_a_rebuild(tmp_path, builds):
+    part = _part(tmp_path, 1, [("P1", "A")])
+    load_snapshot(DATASET, str(tmp_path), workers=1).close()
+    before = fingerprint_parts([str(part)])
+    stat = os.stat(part)
+    os.utime(part, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert fingerprint_parts([str(part)]) != before
+    with load_snapshot(DATASET, str(tmp_path), workers=1) as snapshot:
+        assert snapshot.fingerprint == fingerprint_parts([str(part)])
+    assert len(builds) == 2
+
+
+def test_adding_a_part_file_triggers_a_rebuild(tmp_path, builds):
+    _part(tmp_path, 1, [("P1", "A")])
+    load_snapshot(DATASET, str(tmp_path), workers=1).close()
+    _part(tmp_path, 2, [("P2", "B")])
+    with load_snapshot(DATASET, str(tmp_path), workers=1) as snapshot:
+        assert [row["valor"] for row in snapshot.iter_rows()] == ["A", "B"]
+    assert len(builds) == 2
+
+
+@pytest.mark.parametrize("damage", [
+    lambda data: data[:len(data) - 3],
+    lambda data: data[:len(snapshot_module.MAGIC) + 6],
+    lambda data: data[:len(snapshot_module.MAGIC)],
+    lambda data: b"",
+    lambda data: b"PK\x03\x04 not a snapshot at all",
+    lambda data: b"TSNAP\x00\x01\x00" + data[len(snapshot_module.MAGIC):],
+])
+def test_damaged_snapshot_is_rejected_and_rebuilt(tmp_path, builds, damage):
+    _part(tmp_path, 1, [("P1", "A"), ("P1", "B")])
+    load_snapshot(DATASET, str(tmp_path), workers=1).close()
+    path = snapshot_path(DATASET, str(tmp_path))
+    with open(path, "rb") as file:
+        data = file.read()
+    with open(path, "wb") as file:
+        file.write(damage(data))
+    with pytest.raises(ValueError):
+        Snapshot(path).close()
+    with load_snapshot(DATASET, str(tmp_path), workers=1) as snapshot:
+        assert snapshot.column("valor") == ["A", "B"]
+    assert len(builds) == 2
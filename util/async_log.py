@@ -0,0 +1,175 @@
+"""
+This module provides the BackgroundWriter class and the BackgroundLogHandler
+built on it, which move console and log file output off the worker threads:
+callers only enqueue a line, and a single background thread writes the lines
+in batches. Sampler picks which requests get per-request output.
+"""
+
+import itertools
+import logging
+import queue
+import threading
+from typing import Any, Callable, Optional, TextIO
+
+_STOP = object()
+
+
+class BackgroundWriter:
+    """
+    Queue-backed writer with one background thread.
+
+    `write` never touches the stream, so worker threads do not contend for
+    the stdout lock or wait on file I/O. The background thread renders and
+    writes up to `batch_size` lines at a time, with one flush per batch.
+    """
+
+    def __init__(self, stream: Optional[TextIO] = None, path: Optional[str] = None,
+                 render: Callable[[Any], str] = str, batch_size: int = 512) -> None:
+        """
+        Initializes the writer and starts its thread.
+
+        Args:
+            stream (Optional[TextIO]): Where to write, e.g. sys.stdout.
+            path (Optional[str]): File to append to instead of a stream; it is
+                opened on the first write.
+            render (Callable[[Any], str]): Turns a queued item into text, in the
+                background thread (e.g. a logging.Formatter's format).
+            batch_size (int): Maximum number of lines per write.
+        """
+        if (stream is None) == (path is None):
+            raise ValueError("pass either a stream or a path")
+        self.stream = stream
+        self.path = path
+        self.render = render
+        self.batch_size = batch_size
+        self.written = 0
+        self.batches = 0
+        self.dropped = 0
+        # SimpleQueue: put is a single C call, without the locks of queue.Queue
+        self._queue: "queue.SimpleQueue[Any]" = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, name="background-writer", daemon=True)
+        self._thread.start()
+
+    def write(self, item: Any) -> None:
+        """
+        Queues one line (or an item for `render`); returns immediately.
+
+        Args:
+            item: The line, without the trailing newline.
+        """
+        self._queue.put(item)
+
+    def flush(self) -> None:
+        """
+        Blocks until every line queued so far has been written.
+        """
+        if self._thread.is_alive():
+            written = threading.Event()
+            self._queue.put(written)
+            written.wait()
+
+    def close(self) -> None:
+        """
+        Writes the pending lines and stops the thread.
+        """
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join()
+        if self.path is not None and self.stream is not None:
+            self.stream.close()
+
+    def _run(self) -> None:
+        while True:
+            # Whatever piled up while the last batch was written goes in this one
+            batch = [self._queue.get()]
+            try:
+                while len(batch) < self.batch_size:
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                pass
+            stop = False
+            lines, waiters = [], []
+            for entry in batch:
+                if entry is _STOP:
+                    stop = True
+                elif isinstance(entry, threading.Event):
+                    waiters.append(entry)
+                else:
+                    try:
+                        lines.append(f"{self.render(entry)}\n")
+                    except Exception as e:
+                        lines.append(f"<unrenderable log entry: {e}>\n")
+            if lines:
+                try:
+                    if self.stream is None:
+                        self.stream = open(self.path, "a", encoding="utf-8")
+                    self.stream.write("".join(lines))
+                    self.stream.flush()
+                    self.written += len(lines)
+                    self.batches += 1
+                except (OSError, ValueError):
+                    # A closed or broken stream must not stop the thread (flush waits on it)
+                    self.dropped += len(lines)
+            for waiter in waiters:
+                waiter.set()
+            if stop:
+                return
+
+
+class BackgroundLogHandler(logging.Handler):
+    """
+    logging handler that hands records to a BackgroundWriter.
+
+    The record is formatted in the writer thread, not in the caller.
+    """
+
+    def __init__(self, path: str, level: int = logging.NOTSET, batch_size: int = 512) -> None:
+        """
+        Initializes the handler and its writer.
+
+        Args:
+            path (str): Log file, opened in append mode on the first record.
+            level (int): Minimum level handled.
+            batch_size (int): Maximum number of records per write.
+        """
+        super().__init__(level)
+        self.writer = BackgroundWriter(path=path, render=self.format, batch_size=batch_size)
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.writer.write(record)
+
+    def flush(self) -> None:
+        self.writer.flush()
+
+    def close(self) -> None:
+        self.writer.close()
+        super().close()
+
+
+class Sampler:
+    """Thread-safe 1-in-N sampler for per-request output."""
+
+    def __init__(self, every: int = 1) -> None:
+        """
+        Initializes the sampler.
+
+        Args:
+            every (int): Keep one call in `every`; 1 keeps all, 0 keeps none.
+        """
+        self.every = every
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+
+    def __call__(self) -> bool:
+        """
+        Decides whether the current request is shown.
+
+        Returns:
+            bool: True for one call in `every`.
+        """
+        if self.every <= 0:
+            return False
+        if self.every == 1:
+            return True
+        with self._lock:
+            return next(self._counter) % self.every == 0
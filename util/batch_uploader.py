@@ -0,0 +1,120 @@
+"""
+This module provides the BatchUploader class, which groups field values by
+parent into batches and sends them through a pluggable transport.
+"""
+
+import threading
+from typing import Dict, Iterator, List, Optional
+
+from ..config.batch_transport import BatchTransport, FieldValue, ItemResult
+
+
+class BatchReport:
+    """Thread-safe tally of the per-item results of an upload."""
+
+    def __init__(self) -> None:
+        """
+        Initializes an empty report.
+        """
+        self.batches = 0
+        self.succeeded = 0
+        self.failures: List[ItemResult] = []
+        self._lock = threading.Lock()
+
+    def record(self, results: List[ItemResult]) -> None:
+        """
+        Adds the results of one batch to the report.
+
+        Args:
+            results (List[ItemResult]): The results returned by the transport.
+        """
+        with self._lock:
+            self.batches += 1
+            for result in results:
+                if result.ok:
+                    self.succeeded += 1
+                else:
+                    self.failures.append(result)
+
+    @property
+    def failed(self) -> int:
+        """
+        Get the number of items that failed.
+
+        Returns:
+            int: The failure count.
+        """
+        return len(self.failures)
+
+
+class BatchUploader:
+    """
+    Groups field values by parent (idPai) and sends them in batches.
+
+    `add` buffers an item and hands back a full batch once its parent reached
+    `batch_size` items; `drain` returns the partial batches left at the end.
+    Sending is done by `send`, which may be called from several threads.
+    """
+
+    def __init__(self, transport: BatchTransport, env_id: str, field_name: str, batch_size: int = 50):
+        """
+        Initializes the uploader.
+
+        Args:
+            transport (BatchTransport): The transport used to send batches.
+            env_id (str): Environment ID.
+            field_name (str): Field name.
+            batch_size (int): Maximum number of values per batch.
+        """
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        self.transport = transport
+        self.env_id = env_id
+        self.field_name = field_name
+        self.batch_size = batch_size
+        self.report = BatchReport()
+        self._pending: Dict[Optional[str], List[FieldValue]] = {}
+        self._lock = threading.Lock()
+
+    def add(self, item: FieldValue) -> Optional[List[FieldValue]]:
+        """
+        Buffers an item under its parent.
+
+        Args:
+            item (FieldValue): The value to send.
+
+        Returns:
+            Optional[List[FieldValue]]: A full batch ready to be sent, or None.
+        """
+        with self._lock:
+            pending = self._pending.setdefault(item.parent_id, [])
+            pending.append(item)
+            if len(pending) < self.batch_size:
+                return None
+            del self._pending[item.parent_id]
+            return pending
+
+    def drain(self) -> Iterator[List[FieldValue]]:
+        """
+        Yields every partial batch still buffered, emptying the buffer.
+
+        Returns:
+            Iterator[List[FieldValue]]: The remaining batches.
+        """
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        yield from pending.values()
+
+    def send(self, batch: List[FieldValue]) -> List[ItemResult]:
+        """
+        Sends one batch through the transport and records the results.
+
+        Args:
+            batch (List[FieldValue]): The values to send.
+
+        Returns:
+            List[ItemResult]: One result per item, in the same order.
+        """
+        results = self.transport.send_batch(self.env_id, self.field_name, batch)
+        self.report.record(results)
+        return results
@@ -0,0 +1,158 @@
+"""
+This module provides the DedupRegistry class, a thread-safe registry used to
+make sure each field value is sent to the API only once.
+"""
+
+import threading
+from typing import Hashable, Iterable, Optional
+
+from .key_store import CompactKeyTable, journal_key
+from .progress_journal import ProgressJournal
+
+
+class DedupRegistry:
+    """
+    Thread-safe registry of keys that were claimed for sending.
+
+    A key is claimed atomically and the internal lock is released right away,
+    so the HTTP request itself runs outside the lock. Each key is either
+    "in flight" (claimed, request not finished yet) or "done" (sent
+    successfully). A failed send releases the key so it can be retried.
+
+    When a ProgressJournal is given, the keys it already holds are loaded as
+    done and every key marked done is appended to it, so a new run only sends
+    what the previous one did not finish.
+
+    In compact mode the keys are fixed-width digests (see key_store.request_key)
+    kept in a CompactKeyTable instead of a dict; they are journaled as hex.
+    """
+
+    IN_FLIGHT = "in_flight"
+    DONE = "done"
+
+    def __init__(self, journal: Optional[ProgressJournal] = None, compact: bool = False) -> None:
+        """
+        Initializes the registry.
+
+        Args:
+            journal (Optional[ProgressJournal]): Durable record of done keys.
+                Its keys are loaded as done and it is opened for appending.
+            compact (bool): Store digest keys in a CompactKeyTable. Journal
+                lines are converted with key_store.journal_key, which also
+                reads journals of full URLs.
+        """
+        self.compact = compact
+        if compact:
+            self._states = CompactKeyTable()
+        else:
+            self._states = {}
+        self._lock = threading.Lock()
+        self.journal = journal
+        if journal is not None:
+            self.restore(journal.load())
+            journal.open()
+
+    def restore(self, keys: Iterable[Hashable]) -> None:
+        """
+        Marks keys sent by a previous run as done.
+
+        Args:
+            keys (Iterable[Hashable]): The keys to restore.
+        """
+        with self._lock:
+            for key in keys:
+                if self.compact and isinstance(key, str):
+                    key = journal_key(key)
+                self._states[key] = self.DONE
+
+    def claim(self, key: Hashable) -> bool:
+        """
+        Atomically claims a key for sending.
+
+        Args:
+            key (Hashable): The key identifying the value to send.
+
+        Returns:
+            bool: True if the caller now owns the key and must send it,
+            False if the key is already in flight or done.
+        """
+        with self._lock:
+            # One probe: the key is only added if it was absent
+            count = len(self._states)
+            self._states.setdefault(key, self.IN_FLIGHT)
+            return len(self._states) > count
+
+    def mark_done(self, key: Hashable) -> None:
+        """
+        Marks a claimed key as successfully sent.
+
+        Args:
+            key (Hashable): The key that was sent.
+        """
+        with self._lock:
+            self._states[key] = self.DONE
+        if self.journal is not None:
+            self.journal.append(key.hex() if isinstance(key, bytes) else key)
+
+    def release(self, key: Hashable) -> None:
+        """
+        Releases a claimed key after a failed send so it can be claimed again.
+
+        Keys that are already done are left untouched.
+
+        Args:
+            key (Hashable): The key whose send failed.
+        """
+        with self._lock:
+            if self._states.get(key) == self.IN_FLIGHT:
+                del self._states[key]
+
+    def state(self, key: Hashable) -> Optional[str]:
+        """
+        Get the current state of a key.
+
+        Args:
+            key (Hashable): The key to look up.
+
+        Returns:
+            Optional[str]: IN_FLIGHT, DONE or None if the key is unknown.
+        """
+        with self._lock:
+            return self._states.get(key)
+
+    def done_count(self) -> int:
+        """
+        Get the number of keys that were sent successfully.
+
+        Returns:
+            int: The number of keys in the DONE state.
+        """
+        with self._lock:
+            if self.compact:
+                return self._states.count(self.DONE)
+            return sum(1 for state in self._states.values() if state == self.DONE)
+
+    def memory(self) -> Optional[int]:
+        """
+        Get the bytes used by the key table, in compact mode.
+
+        Returns:
+            Optional[int]: The size in bytes, None for the dict store.
+        """
+        with self._lock:
+            return self._states.memory() if self.compact else None
+
+    def close(self) -> None:
+        """
+        Syncs and closes the journal, if any.
+        """
+        if self.journal is not None:
+            self.journal.close()
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._states
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._states)
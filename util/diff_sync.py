@@ -0,0 +1,155 @@
+"""
+This module provides the ExistingValues set and the DeltaReport counters used
+to send only the field values that do not exist on the server yet.
+"""
+
+from typing import Iterable, List, Optional
+
+from .key_store import _INTEGRAL_FLOAT, request_key
+
+
+def value_key(parent_id, value, acronym) -> bytes:
+    """
+    Computes the hashed key of a field value, with key_store.request_key.
+
+    The parts are normalized first, so 11.0 and '11', or None and '', give
+    the same key. The idPai is an integer ID, so its text form '11.0' (as the
+    filtro column may hold it) is also taken as 11. Environment and field are
+    left out: one set only holds the values of one field.
+
+    Args:
+        parent_id: The idPai sent to the server.
+        value: The value.
+        acronym: The acronym (sigla).
+
+    Returns:
+        bytes: A 16-byte digest.
+    """
+    if isinstance(parent_id, str) and _INTEGRAL_FLOAT.fullmatch(parent_id.strip()):
+        parent_id = int(float(parent_id))
+    return request_key({"idPai": parent_id, "valor": value, "sigla": acronym})
+
+
+class ExistingValues:
+    """
+    Set of the (idPai, valor, sigla) triples that already exist on the server.
+
+    Only the 16-byte digest of each triple is kept.
+    """
+
+    def __init__(self) -> None:
+        """
+        Initializes an empty set.
+        """
+        self._keys = set()
+
+    def add(self, parent_id, value, acronym=None) -> None:
+        """
+        Adds one existing value.
+
+        Args:
+            parent_id: Its idPai.
+            value: The value.
+            acronym: Its sigla.
+        """
+        self._keys.add(value_key(parent_id, value, acronym))
+
+    def add_entries(self, entries: Iterable[dict]) -> int:
+        """
+        Adds values as returned by the fieldValues listing.
+
+        Args:
+            entries (Iterable[dict]): {"valor", "sigla", "idPai"} dictionaries.
+
+        Returns:
+            int: The number of entries read.
+        """
+        count = 0
+        for entry in entries:
+            if isinstance(entry, dict):
+                self.add(entry.get('idPai'), entry.get('valor'), entry.get('sigla'))
+                count += 1
+        return count
+
+    def contains(self, parent_id, value, acronym=None) -> bool:
+        """
+        Checks whether a value already exists.
+
+        Args:
+            parent_id: The idPai that would be sent.
+            value: The value.
+            acronym: The sigla.
+
+        Returns:
+            bool: True if the server already has it.
+        """
+        return value_key(parent_id, value, acronym) in self._keys
+
+    def __contains__(self, key: bytes) -> bool:
+        return key in self._keys
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+
+class DeltaReport:
+    """Counts of the values to insert and skip, for a dry run."""
+
+    def __init__(self, sample_size: int = 20) -> None:
+        """
+        Initializes the counters.
+
+        Args:
+            sample_size (int): How many of the values to insert are kept as examples.
+        """
+        self.inserts = 0
+        self.skips = 0
+        self.duplicates = 0
+        self.pending_parent = 0
+        self.sample_size = sample_size
+        self.sample: List[tuple] = []
+        self._seen = set()
+
+    def record(self, existing: Optional[ExistingValues], parent_id, value, acronym=None) -> str:
+        """
+        Classifies one input value.
+
+        Args:
+            existing (Optional[ExistingValues]): The server values, None if unknown.
+            parent_id: The idPai that would be sent.
+            value: The value.
+            acronym: The sigla.
+
+        Returns:
+            str: 'insert', 'skip' (already on the server) or 'duplicate'
+            (repeated in the input).
+        """
+        key = value_key(parent_id, value, acronym)
+        if existing is not None and key in existing:
+            self.skips += 1
+            return 'skip'
+        if key in self._seen:
+            self.duplicates += 1
+            return 'duplicate'
+        self._seen.add(key)
+        self.inserts += 1
+        if len(self.sample) < self.sample_size:
+            self.sample.append((parent_id, value, acronym))
+        return 'insert'
+
+    def lines(self) -> List[str]:
+        """
+        Formats the report.
+
+        Returns:
+            List[str]: One line per counter, then the sample of values to insert.
+        """
+        lines = [
+            f"a criar: {self.inserts}",
+            f"ignorados (já existem no servidor): {self.skips}",
+            f"repetidos na entrada: {self.duplicates}",
+            f"valores sob um pai que ainda não está no servidor: {self.pending_parent}",
+        ]
+        lines += [f"  + valor={value!r} sigla={acronym!r} idPai={parent_id!r}"
+                  for parent_id, value, acronym in self.sample]
+        return lines
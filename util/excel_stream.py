@@ -0,0 +1,194 @@
+"""
+This module provides the ExcelStreamReader class to stream the rows of an
+Excel file in a single pass with constant memory.
+"""
+
+from itertools import islice
+from typing import Any, Callable, Dict, Iterator, List, Mapping, Optional, Sequence, Tuple, Union
+
+# Column types of the values.xlsx sheet read by list_values
+VALUE_DTYPES = {"valor": str, "sigla": str, "filtro": str}
+
+
+def to_text(value: Any) -> Optional[str]:
+    """
+    Converts a cell value to a string, keeping integer codes as integers.
+
+    Excel stores every number as a float, so a code typed as 11 may come back
+    as 11.0; it is returned as '11'.
+
+    Args:
+        value: The cell value.
+
+    Returns:
+        Optional[str]: The text, or None for an empty cell.
+    """
+    if value is None:
+        return None
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def to_int(value: Any) -> Optional[int]:
+    """
+    Converts a cell value to an integer.
+
+    Args:
+        value: The cell value, e.g. 11, 11.0, '11', '-3' or '11.0'.
+
+    Returns:
+        Optional[int]: The integer, or None for an empty cell.
+
+    Raises:
+        ValueError: If the value is not a whole number, e.g. 11.5 or '11.5';
+            truncating it would silently turn it into another code.
+    """
+    if value is None or value == "":
+        return None
+    if isinstance(value, str):
+        value = value.strip()
+        try:
+            return int(value)
+        except ValueError:
+            value = float(value)
+    if isinstance(value, float) and not value.is_integer():
+        raise ValueError(f"not an integer: {value!r}")
+    return int(value)
+
+
+def to_float(value: Any) -> Optional[float]:
+    """
+    Converts a cell value to a float.
+
+    Args:
+        value: The cell value.
+
+    Returns:
+        Optional[float]: The float, or None for an empty cell.
+    """
+    if value is None or value == "":
+        return None
+    return float(value)
+
+
+CONVERTERS: Dict[type, Callable[[Any], Any]] = {str: to_text, int: to_int, float: to_float}
+
+Dtype = Union[type, Callable[[Any], Any]]
+
+
+class ExcelStreamReader:
+    """
+    Streams the rows of an Excel sheet without loading the whole workbook.
+
+    The workbook is opened once in read-only mode and rows are yielded as they
+    are parsed, so the cost is linear in the size of the file and memory use
+    does not depend on the number of rows. The first row is used as header.
+    Empty cells are returned as None and fully empty rows are skipped.
+    """
+
+    def __init__(self, excel_file_path: str, sheet_name: Optional[str] = None,
+                 columns: Optional[Sequence[str]] = None,
+                 dtypes: Optional[Mapping[str, Dtype]] = None):
+        """
+        Initializes the reader with the path to the Excel file.
+
+        Args:
+            excel_file_path (str): The path to the Excel file to be read.
+            sheet_name (Optional[str]): The sheet to read. Defaults to the
+                active (first) sheet.
+            columns (Optional[Sequence[str]]): Only these columns are returned,
+                in this order. Defaults to every column.
+            dtypes (Optional[Mapping[str, Dtype]]): Column name -> str, int,
+                float or a conversion function. Empty cells stay None; columns
+                missing from the sheet are ignored.
+        """
+        self.file_path = excel_file_path
+        self.sheet_name = sheet_name
+        self.columns = tuple(columns) if columns is not None else None
+        self.dtypes = dict(dtypes or {})
+        self.header: Tuple[str, ...] = ()
+
+    def _projection(self, header: Tuple[str, ...]) -> Tuple[Tuple[str, ...], List[int]]:
+        if self.columns is None:
+            return header, list(range(len(header)))
+        missing = [name for name in self.columns if name not in header]
+        if missing:
+            raise ValueError(f"columns not found in {self.file_path}: {', '.join(missing)}")
+        return self.columns, [header.index(name) for name in self.columns]
+
+    def iter_tuples(self) -> Iterator[tuple]:
+        """
+        Yields each data row as a tuple of cell values.
+
+        The header is available in `self.header` once the first row is yielded.
+
+        Returns:
+            Iterator[tuple]: The data rows, in file order.
+        """
+        # openpyxl is only loaded when a workbook is actually read
+        from openpyxl import load_workbook
+
+        workbook = load_workbook(self.file_path, read_only=True, data_only=True)
+        try:
+            sheet = workbook[self.sheet_name] if self.sheet_name else workbook.active
+            rows = sheet.iter_rows(values_only=True)
+            first = next(rows, None)
+            if first is None:
+                return
+            header = tuple(
+                str(name) if name is not None else f"Unnamed: {index}"
+                for index, name in enumerate(first))
+            width = len(header)
+            self.header, indexes = self._projection(header)
+            converters = [CONVERTERS.get(self.dtypes.get(name), self.dtypes.get(name))
+                          for name in self.header]
+            typed = [(position, converter) for position, converter in enumerate(converters) if converter]
+            project = indexes != list(range(width))
+            for row in rows:
+                # Linhas podem vir mais curtas que o cabeçalho em modo read-only
+                if len(row) < width:
+                    row = row + (None,) * (width - len(row))
+                row = tuple(row[index] for index in indexes) if project else row[:width]
+                if all(value is None for value in row):
+                    continue
+                if typed:
+                    row = list(row)
+                    for position, converter in typed:
+                        row[position] = converter(row[position])
+                    row = tuple(row)
+                yield row
+        finally:
+            workbook.close()
+
+    def iter_dicts(self) -> Iterator[dict]:
+        """
+        Yields each data row as a dictionary keyed by the header names.
+
+        Returns:
+            Iterator[dict]: The data rows, e.g. {'valor': ..., 'sigla': ..., 'filtro': ...}.
+        """
+        for row in self.iter_tuples():
+            yield dict(zip(self.header, row))
+
+    def iter_chunks(self, chunk_size: int = 1000) -> Iterator[List[dict]]:
+        """
+        Yields the data rows in lists of at most `chunk_size` dictionaries.
+
+        Only one chunk is held in memory at a time.
+
+        Args:
+            chunk_size (int): Rows per chunk.
+
+        Returns:
+            Iterator[List[dict]]: The chunks, in file order.
+        """
+        rows = self.iter_dicts()
+        while True:
+            chunk = list(islice(rows, chunk_size))
+            if not chunk:
+                return
+            yield chunk
+
+    def __iter__(self) -> Iterator[dict]:
+        return self.iter_dicts()
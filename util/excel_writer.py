@@ -0,0 +1,243 @@
+"""
+This module provides streaming writers that export rows to an Excel workbook
+or to CSV files with constant memory, one sheet (or file) per dataset.
+"""
+
+import csv
+import os
+from typing import Iterable, List, Optional, Sequence
+
+# Rows per sheet allowed by Excel, header included
+EXCEL_MAX_ROWS = 1_048_576
+
+# Excel rejects longer sheet names
+_SHEET_NAME_LENGTH = 31
+
+
+class StreamingExcelWriter:
+    """
+    Writes rows to an .xlsx workbook as they arrive.
+
+    The workbook is opened in openpyxl's write-only mode, so each row is
+    serialized when appended and memory use does not depend on the number of
+    rows. When a sheet reaches `max_rows` rows, the next rows go to a new
+    sheet ('<name>_2', '<name>_3', ...) that repeats the header.
+    """
+
+    def __init__(self, path: str, max_rows: int = EXCEL_MAX_ROWS) -> None:
+        """
+        Initializes the writer.
+
+        Args:
+            path (str): The workbook to create.
+            max_rows (int): Rows per sheet, header included.
+        """
+        # openpyxl is only loaded when a workbook is actually written
+        from openpyxl import Workbook
+
+        if max_rows < 2:
+            raise ValueError("max_rows must leave room for the header and one row")
+        self.path = str(path)
+        self.max_rows = max_rows
+        self.sheets: List[str] = []
+        self.rows_written = 0
+        self._workbook = Workbook(write_only=True)
+        self._sheet = None
+        self._name = ""
+        self._header: Sequence = ()
+        self._part = 0
+        self._sheet_rows = 0
+
+    def start(self, name: str, header: Sequence[str]) -> None:
+        """
+        Starts the sheet of a dataset; the following rows are appended to it.
+
+        Args:
+            name (str): The dataset name, used as sheet name.
+            header (Sequence[str]): The column names.
+        """
+        self._name, self._header, self._part = name, tuple(header), 0
+        self._new_sheet()
+
+    def _new_sheet(self) -> None:
+        self._part += 1
+        suffix = f"_{self._part}" if self._part > 1 else ""
+        title = self._name[:_SHEET_NAME_LENGTH - len(suffix)] + suffix
+        self._sheet = self._workbook.create_sheet(title)
+        self._sheet.append(self._header)
+        self._sheet_rows = 1
+        self.sheets.append(title)
+
+    def append(self, row: Sequence) -> None:
+        """
+        Appends one row to the current sheet, rolling over to a new sheet when full.
+
+        Args:
+            row (Sequence): The cell values.
+        """
+        if self._sheet is None:
+            raise RuntimeError("call start() before appending rows")
+        if self._sheet_rows >= self.max_rows:
+            self._new_sheet()
+        self._sheet.append(row)
+        self._sheet_rows += 1
+        self.rows_written += 1
+
+    def write_rows(self, rows: Iterable[Sequence]) -> int:
+        """
+        Appends every row of an iterable.
+
+        Args:
+            rows (Iterable[Sequence]): The rows.
+
+        Returns:
+            int: The number of rows appended.
+        """
+        before = self.rows_written
+        for row in rows:
+            self.append(row)
+        return self.rows_written - before
+
+    def close(self) -> None:
+        """
+        Saves the workbook.
+        """
+        if self._workbook is not None:
+            if not self.sheets:
+                self._workbook.create_sheet()
+            self._workbook.save(self.path)
+            self._workbook = None
+
+    def __enter__(self) -> "StreamingExcelWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+
+def _csv_row(row: Sequence) -> Sequence:
+    if any(type(value) is float for value in row):
+        return [str(int(value)) if type(value) is float and value.is_integer() else value
+                for value in row]
+    return row
+
+
+class StreamingCsvWriter:
+    """
+    Writes rows to CSV files as they arrive: the fast path of the exports.
+
+    CSV has no sheets and no row limit, so each dataset goes to its own file,
+    '<stem>_<name>.csv' next to `path` (or `path` itself when there is a
+    single dataset and `single_file` is set). Integral floats are written as
+    integers, as Excel displays them, so a code 11.0 is read back as '11'.
+    """
+
+    def __init__(self, path: str, single_file: bool = False, delimiter: str = ",",
+                 encoding: str = "utf-8") -> None:
+        """
+        Initializes the writer.
+
+        Args:
+            path (str): The output file, e.g. 'output.csv'.
+            single_file (bool): Write the first dataset to `path` itself.
+            delimiter (str): The field separator.
+            encoding (str): The file encoding.
+        """
+        self.path = str(path)
+        self.single_file = single_file
+        self.delimiter = delimiter
+        self.encoding = encoding
+        self.files: List[str] = []
+        self.rows_written = 0
+        self._file = None
+        self._writer = None
+
+    def _path_for(self, name: str) -> str:
+        if self.single_file and not self.files:
+            return self.path
+        stem, extension = os.path.splitext(self.path)
+        return f"{stem}_{name}{extension or '.csv'}"
+
+    def start(self, name: str, header: Sequence[str]) -> None:
+        """
+        Starts the file of a dataset; the following rows are appended to it.
+
+        Args:
+            name (str): The dataset name.
+            header (Sequence[str]): The column names.
+        """
+        self._close_file()
+        path = self._path_for(name)
+        self._file = open(path, "w", newline="", encoding=self.encoding)
+        self._writer = csv.writer(self._file, delimiter=self.delimiter)
+        self._writer.writerow(header)
+        self.files.append(path)
+
+    def append(self, row: Sequence) -> None:
+        """
+        Appends one row to the current file.
+
+        Args:
+            row (Sequence): The cell values.
+        """
+        if self._writer is None:
+            raise RuntimeError("call start() before appending rows")
+        self._writer.writerow(_csv_row(row))
+        self.rows_written += 1
+
+    def write_rows(self, rows: Iterable[Sequence]) -> int:
+        """
+        Appends every row of an iterable.
+
+        Args:
+            rows (Iterable[Sequence]): The rows.
+
+        Returns:
+            int: The number of rows appended.
+        """
+        if self._writer is None:
+            raise RuntimeError("call start() before appending rows")
+        writerow, count = self._writer.writerow, 0
+        for row in rows:
+            writerow(_csv_row(row))
+            count += 1
+        self.rows_written += count
+        return count
+
+    def _close_file(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = self._writer = None
+
+    def close(self) -> None:
+        """
+        Closes the current file.
+        """
+        self._close_file()
+
+    def __enter__(self) -> "StreamingCsvWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+
+def open_writer(path: str, fmt: Optional[str] = None, max_rows: int = EXCEL_MAX_ROWS,
+                single_file: bool = False):
+    """
+    Creates the streaming writer for an output file.
+
+    Args:
+        path (str): The output file.
+        fmt (Optional[str]): 'xlsx' or 'csv'. Inferred from the extension if omitted.
+        max_rows (int): Rows per Excel sheet, header included.
+        single_file (bool): For CSV, write the first dataset to `path` itself.
+
+    Returns:
+        StreamingExcelWriter or StreamingCsvWriter: The writer.
+    """
+    if fmt is None:
+        fmt = "csv" if str(path).lower().endswith(".csv") else "xlsx"
+    if fmt == "csv":
+        return StreamingCsvWriter(path, single_file=single_file)
+    return StreamingExcelWriter(path, max_rows=max_rows)
@@ -0,0 +1,177 @@
+"""
+This module provides the FanOutUploader class, which sends one parsed input
+to several (client, environment) targets at the same time.
+"""
+
+import threading
+from typing import Callable, Dict, List, Optional, Sequence
+
+from ..config.batch_transport import FieldValue, PerValueTransport
+from .dedup_registry import DedupRegistry
+from .key_store import request_key
+from .pipeline import BoundedPipeline, PipelineStats
+
+
+class UploadTarget:
+    """
+    One destination of a fan-out upload.
+
+    Each target has its own transport (and so its own WebService, rate
+    limiter and connection pool), its own dedup registry and its own counters.
+    """
+
+    def __init__(self, name: str, transport: PerValueTransport, env_id: str, field_name: str,
+                 registry: Optional[DedupRegistry] = None) -> None:
+        """
+        Initializes the target.
+
+        Args:
+            name (str): Label used in the progress lines and the report.
+            transport (PerValueTransport): Sends the values to this target's server.
+            env_id (str): The environment ID on that server.
+            field_name (str): The field name.
+            registry (Optional[DedupRegistry]): Keys already sent to this target.
+                A new in-memory registry is used if omitted.
+        """
+        self.name = name
+        self.transport = transport
+        self.env_id = env_id
+        self.field_name = field_name
+        self.registry = registry if registry is not None else DedupRegistry(compact=True)
+        self.sent = 0
+        self.skipped = 0
+        self.failures = 0
+        self.processed = 0
+        self.elapsed = 0.0
+        self._lock = threading.Lock()
+
+    def key(self, item: FieldValue) -> bytes:
+        """
+        Get the dedup key of a value, as in list_values.
+
+        Args:
+            item (FieldValue): The value.
+
+        Returns:
+            bytes: The hashed key of its request parameters.
+        """
+        return request_key(item.to_params(self.env_id, self.field_name))
+
+    def upload(self, item: FieldValue) -> bool:
+        """
+        Sends one value unless this target already has it.
+
+        Args:
+            item (FieldValue): The value.
+
+        Returns:
+            bool: True if the value was created by this call.
+        """
+        key = self.key(item)
+        if not self.registry.claim(key):
+            with self._lock:
+                self.skipped += 1
+            return False
+        result = self.transport.send_one(self.env_id, self.field_name, item)
+        if result.ok:
+            self.registry.mark_done(key)
+        else:
+            self.registry.release(key)
+        with self._lock:
+            if result.ok:
+                self.sent += 1
+            else:
+                self.failures += 1
+        return result.ok
+
+    def summary(self) -> dict:
+        """
+        Get the counters of this target.
+
+        Returns:
+            dict: Values sent, skipped and failed, the seconds this target spent
+            sending (summed over runs) and its throughput.
+        """
+        with self._lock:
+            return {"target": self.name, "sent": self.sent, "skipped": self.skipped,
+                    "failed": self.failures, "elapsed": self.elapsed,
+                    "throughput": self.processed / self.elapsed if self.elapsed > 0 else 0.0}
+
+
+class FanOutUploader:
+    """
+    Sends the same values to every target concurrently.
+
+    Every target runs its own BoundedPipeline in its own thread, over the same
+    already parsed items, so a slow target only holds up its own workers.
+    """
+
+    def __init__(self, targets: Sequence[UploadTarget], workers: int = 10,
+                 queue_size: Optional[int] = None, report_interval: float = 0,
+                 report: Callable[[str], object] = print) -> None:
+        """
+        Initializes the uploader.
+
+        Args:
+            targets (Sequence[UploadTarget]): The destinations.
+            workers (int): Worker threads per target.
+            queue_size (Optional[int]): Maximum pending items per target.
+            report_interval (float): Seconds between progress lines, 0 disables them.
+            report (Callable): Function that receives each progress line.
+        """
+        if not targets:
+            raise ValueError("at least one target is required")
+        self.targets = list(targets)
+        self.workers = workers
+        self.queue_size = queue_size
+        self.report_interval = report_interval
+        self.report = report
+
+    def run(self, items: Sequence[FieldValue]) -> Dict[str, PipelineStats]:
+        """
+        Sends the items to every target and waits for all of them.
+
+        Args:
+            items (Sequence[FieldValue]): The values, parsed once and shared
+                by every target.
+
+        Returns:
+            Dict[str, PipelineStats]: The pipeline counters of each target.
+        """
+        return self.run_levels([items])
+
+    def run_levels(self, levels: Sequence[Sequence[FieldValue]]) -> Dict[str, PipelineStats]:
+        """
+        Sends groups of items one after the other, e.g. parents before children.
+
+        Each target moves to the next group as soon as it finished the current
+        one, without waiting for the other targets.
+
+        Args:
+            levels (Sequence[Sequence[FieldValue]]): The groups of values.
+
+        Returns:
+            Dict[str, PipelineStats]: The pipeline counters of each target's last group.
+        """
+        results: Dict[str, PipelineStats] = {}
+        threads: List[threading.Thread] = []
+        for target in self.targets:
+            thread = threading.Thread(target=self._run_target, args=(target, levels, results),
+                                      name=f"fanout-{target.name}", daemon=True)
+            thread.start()
+            threads.append(thread)
+        for thread in threads:
+            thread.join()
+        return results
+
+    def _run_target(self, target: UploadTarget, levels: Sequence[Sequence[FieldValue]],
+                    results: Dict[str, PipelineStats]) -> None:
+        pipeline = BoundedPipeline(
+            target.upload, workers=self.workers, queue_size=self.queue_size,
+            report_interval=self.report_interval,
+            report=lambda line: self.report(f"[{target.name}] {line}"))
+        for items in levels:
+            stats = results[target.name] = pipeline.run(iter(items))
+            # Measured when this target finishes, not when the slowest one does
+            target.elapsed += stats.elapsed()
+            target.processed += stats.processed
@@ -0,0 +1,266 @@
+"""
+This module provides the HierarchyIndex class, an in-memory index of the
+parent/child chain formed by the datasets under data/: equipment codes
+(equipo_conjunto.filtro) own conjuntos (equipo_conjunto.valor), and conjunto
+codes (conjunto_componente.filtro) own componentes (conjunto_componente.valor).
+"""
+
+import sys
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
+
+from .json_parts import load_dataset
+
+# Dataset chain, top level first: the filtro of each dataset is a valor of the previous one
+HIERARCHY = ("equipo_conjunto", "conjunto_componente")
+
+
+def normalize_code(value) -> Optional[str]:
+    """
+    Normalizes a code read from JSON or Excel to an interned string.
+
+    Integral floats such as 11.0 (as pandas writes numeric codes) become '11'.
+
+    Args:
+        value: The raw filtro or valor.
+
+    Returns:
+        Optional[str]: The normalized code, or None for empty values.
+    """
+    if value is None:
+        return None
+    if isinstance(value, float):
+        if value != value:
+            return None
+        if value.is_integer():
+            value = int(value)
+    code = str(value).strip()
+    return sys.intern(code) if code else None
+
+
+class HierarchyIndex:
+    """
+    Parent→children and child→parents dictionaries over interned codes.
+
+    Every lookup is a dictionary access, so checking a single code for
+    orphans is O(1). Children keep the order in which they were added.
+    """
+
+    def __init__(self) -> None:
+        """
+        Initializes an empty index.
+        """
+        self.children: Dict[str, Dict[str, None]] = {}
+        self.parents: Dict[str, Dict[str, None]] = {}
+        self.roots: Dict[str, None] = {}
+
+    def add(self, parent, child) -> None:
+        """
+        Records that `child` belongs to `parent`.
+
+        Args:
+            parent: The parent code.
+            child: The child code.
+        """
+        parent, child = normalize_code(parent), normalize_code(child)
+        if parent is None or child is None:
+            return
+        self.children.setdefault(parent, {})[child] = None
+        self.parents.setdefault(child, {})[parent] = None
+
+    @classmethod
+    def from_datasets(cls, data_dir: str = "data", chain: Sequence[str] = HIERARCHY,
+                      workers: Optional[int] = None) -> "HierarchyIndex":
+        """
+        Builds the index from the part files of a chain of datasets.
+
+        The parents of the first dataset (equipment codes) are the roots.
+
+        Args:
+            data_dir (str): The folder holding one subfolder per dataset.
+            chain (Sequence[str]): Dataset names, from the top level down.
+            workers (Optional[int]): Number of processes used to parse the part files.
+
+        Returns:
+            HierarchyIndex: The index.
+        """
+        index = cls()
+        for level, dataset in enumerate(chain):
+            records = load_dataset(dataset, data_dir, workers)
+            for filtro, valor in zip(records.filtro, records.valor):
+                index.add(filtro, valor)
+                if level == 0:
+                    index.roots[normalize_code(filtro)] = None
+        return index
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[dict]) -> "HierarchyIndex":
+        """
+        Builds the index from valor/filtro rows, as read from values.xlsx.
+
+        Rows without a filtro are top-level values, so they are the roots.
+
+        Args:
+            rows (Iterable[dict]): Rows with 'valor' and an optional 'filtro'.
+
+        Returns:
+            HierarchyIndex: The index.
+        """
+        index = cls()
+        for row in rows:
+            index.add(row.get('filtro'), row.get('valor'))
+            if normalize_code(row.get('filtro')) is None:
+                valor = normalize_code(row.get('valor'))
+                if valor is not None:
+                    index.roots[valor] = None
+        return index
+
+    def children_of(self, code) -> List[str]:
+        """
+        Get the direct children of a code.
+
+        Args:
+            code: The parent code.
+
+        Returns:
+            List[str]: The children, in insertion order.
+        """
+        return list(self.children.get(normalize_code(code), ()))
+
+    def parents_of(self, code) -> List[str]:
+        """
+        Get the direct parents of a code.
+
+        Args:
+            code: The child code.
+
+        Returns:
+            List[str]: The parents, in insertion order.
+        """
+        return list(self.parents.get(normalize_code(code), ()))
+
+    def descendants(self, code, depth: Optional[int] = None) -> List[str]:
+        """
+        Get the codes under `code`, breadth first.
+
+        For example, descendants('ABP01', depth=2) returns every componente
+        under equipment ABP01.
+
+        Args:
+            code: The code to start from.
+            depth (Optional[int]): Return only the codes exactly this many
+                levels below; None returns every level.
+
+        Returns:
+            List[str]: The descendant codes, without duplicates.
+        """
+        seen = {}
+        level = [normalize_code(code)]
+        distance = 0
+        while level and (depth is None or distance < depth):
+            distance += 1
+            following = []
+            for parent in level:
+                for child in self.children.get(parent, ()):
+                    if child not in seen:
+                        seen[child] = distance
+                        following.append(child)
+            level = following
+        return [child for child, found in seen.items() if depth is None or found == depth]
+
+    def is_orphan(self, code) -> bool:
+        """
+        Checks whether a parent code has no parent of its own and is not a root.
+
+        Args:
+            code: The code to check.
+
+        Returns:
+            bool: True if the code is referenced as a parent but never defined
+            by the level above.
+        """
+        code = normalize_code(code)
+        return code in self.children and code not in self.parents and code not in self.roots
+
+    def orphans(self) -> List[str]:
+        """
+        Get every orphan parent code.
+
+        Returns:
+            List[str]: Codes used as parents but missing from the level above.
+        """
+        return [code for code in self.children if code not in self.parents and code not in self.roots]
+
+    def depth(self, code) -> int:
+        """
+        Get how many ancestors a code has along its longest chain.
+
+        Args:
+            code: The code.
+
+        Returns:
+            int: 0 for codes without a parent.
+        """
+        return self._depths().get(normalize_code(code), 0)
+
+    def cycles(self) -> List[str]:
+        """
+        Get the codes that are their own ancestors.
+
+        The parent link that closes each cycle is ignored by depth() and
+        levels(), so these codes are still grouped, but their order among
+        themselves is arbitrary.
+
+        Returns:
+            List[str]: The codes on a parent/child cycle.
+        """
+        return list(self._walk()[1])
+
+    def _depths(self) -> Dict[str, int]:
+        return self._walk()[0]
+
+    def _walk(self):
+        depths: Dict[str, int] = {}
+        cyclic: Dict[str, None] = {}
+        for start in self.parents:
+            if start in depths:
+                continue
+            # Iterative walk up the chain; the link that closes a cycle is ignored
+            stack, on_path = [start], {start}
+            while stack:
+                code = stack[-1]
+                pending = []
+                for parent in self.parents.get(code, ()):
+                    if parent in on_path:
+                        cyclic.update(dict.fromkeys(stack[stack.index(parent):]))
+                    elif parent not in depths:
+                        pending.append(parent)
+                if pending:
+                    stack.append(pending[0])
+                    on_path.add(pending[0])
+                    continue
+                depths[code] = max((depths[parent] + 1 for parent in self.parents.get(code, ())
+                                    if parent in depths), default=0)
+                stack.pop()
+                on_path.discard(code)
+        return depths, cyclic
+
+    def levels(self, rows: Iterable[dict]) -> Iterator[List[dict]]:
+        """
+        Groups rows so that parents come before their children.
+
+        Rows are grouped by the depth of their valor; uploading one group at a
+        time, and waiting for it to finish, creates every parent before its
+        children.
+
+        Args:
+            rows (Iterable[dict]): Rows with 'valor' and an optional 'filtro'.
+
+        Returns:
+            Iterator[List[dict]]: The groups, from the top level down.
+        """
+        depths = self._depths()
+        groups: Dict[int, List[dict]] = {}
+        for row in rows:
+            groups.setdefault(depths.get(normalize_code(row.get('valor')), 0), []).append(row)
+        for depth in sorted(groups):
+            yield groups[depth]
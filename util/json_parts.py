@@ -0,0 +1,165 @@
+"""
+This module reads the JSON part files under data/ (one folder per dataset)
+into columnar records, parsing the part files in parallel.
+"""
+
+import json
+import os
+import re
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, List, Optional, Tuple
+
+DATASETS = ("conjunto_componente", "equipo_conjunto")
+
+
+class ColumnarRecords:
+    """Filtro/valor records stored as two parallel columns."""
+
+    def __init__(self) -> None:
+        """
+        Initializes empty columns.
+        """
+        self.filtro: List[str] = []
+        self.valor: List[str] = []
+
+    def extend(self, filtro: List[str], valor: List[str]) -> None:
+        """
+        Appends the columns of one part file.
+
+        Args:
+            filtro (List[str]): The parent codes.
+            valor (List[str]): The values, aligned with `filtro`.
+        """
+        self.filtro.extend(filtro)
+        self.valor.extend(valor)
+
+    def to_dict(self) -> dict:
+        """
+        Get the columns as a dictionary, e.g. for pd.DataFrame.
+
+        Returns:
+            dict: {'filtro': [...], 'valor': [...]}.
+        """
+        return {'filtro': self.filtro, 'valor': self.valor}
+
+    def iter_rows(self) -> Iterator[dict]:
+        """
+        Yields each record as a {'filtro', 'valor'} dictionary.
+
+        Returns:
+            Iterator[dict]: The records, in file order.
+        """
+        for filtro, valor in zip(self.filtro, self.valor):
+            yield {'filtro': filtro, 'valor': valor}
+
+    def __len__(self) -> int:
+        return len(self.valor)
+
+
+def _part_number(filename: str) -> int:
+    match = re.search(r"_part(\d+)\.json$", filename)
+    return int(match.group(1)) if match else 0
+
+
+def list_part_files(dataset: str, data_dir: str = "data") -> List[str]:
+    """
+    Lists the part files of a dataset in part-number order.
+
+    Args:
+        dataset (str): The dataset name, e.g. 'conjunto_componente'.
+        data_dir (str): The folder holding one subfolder per dataset.
+
+    Returns:
+        List[str]: The paths of the part files.
+    """
+    folder = os.path.join(data_dir, dataset)
+    filenames = [name for name in os.listdir(folder) if name.endswith('.json')]
+    filenames.sort(key=lambda name: (_part_number(name), name))
+    return [os.path.join(folder, name) for name in filenames]
+
+
+def parse_part_file(file_path: str, dataset: str) -> Tuple[List[str], List[str]]:
+    """
+    Parses one part file into filtro/valor columns.
+
+    Records without filtro or valor are skipped, and so is the header record
+    that some part files start with (filtro='filtro', valor='valor'), so every
+    reader of the part files sees the same records. A file that is not valid
+    JSON is reported and yields empty columns.
+
+    Args:
+        file_path (str): The part file.
+        dataset (str): The dataset name, which is also the key of each record.
+
+    Returns:
+        Tuple[List[str], List[str]]: The filtro and valor columns.
+    """
+    filtro_column, valor_column = [], []
+    try:
+        with open(file_path, 'r', encoding='utf-8') as file:
+            json_data = json.load(file)
+    except json.JSONDecodeError as e:
+        print(f"Erro ao decodificar JSON em {file_path}: {e}")
+        return filtro_column, valor_column
+
+    for item in json_data.values():
+        record = item.get(dataset, {})
+        filtro, valor = record.get('filtro'), record.get('valor')
+        if filtro and valor and not (filtro == 'filtro' and valor == 'valor'):
+            filtro_column.append(filtro)
+            valor_column.append(valor)
+    return filtro_column, valor_column
+
+
+def iter_part_columns(dataset: str, data_dir: str = "data", workers: Optional[int] = None,
+                      max_pending: Optional[int] = None) -> Iterator[Tuple[List[str], List[str]]]:
+    """
+    Yields the columns of each part file, in part order, parsing files in parallel.
+
+    Args:
+        dataset (str): The dataset name.
+        data_dir (str): The folder holding one subfolder per dataset.
+        workers (Optional[int]): Number of worker processes. Defaults to the
+            number of CPUs; 1 parses the files in the calling process.
+        max_pending (Optional[int]): Maximum number of files parsed ahead of
+            the consumer, which bounds memory when the consumer is slower than
+            the parsers. Defaults to twice the number of workers.
+
+    Returns:
+        Iterator[Tuple[List[str], List[str]]]: The filtro and valor columns of each file.
+    """
+    paths = list_part_files(dataset, data_dir)
+    workers = min(workers or os.cpu_count() or 1, len(paths) or 1)
+    if workers == 1:
+        for path in paths:
+            yield parse_part_file(path, dataset)
+        return
+
+    max_pending = max(max_pending or 2 * workers, 1)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for path in paths:
+            pending.append(executor.submit(parse_part_file, path, dataset))
+            if len(pending) >= max_pending:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def load_dataset(dataset: str, data_dir: str = "data", workers: Optional[int] = None) -> ColumnarRecords:
+    """
+    Loads every part file of a dataset into columnar records.
+
+    Args:
+        dataset (str): The dataset name.
+        data_dir (str): The folder holding one subfolder per dataset.
+        workers (Optional[int]): Number of worker processes.
+
+    Returns:
+        ColumnarRecords: The filtro/valor columns of the whole dataset.
+    """
+    records = ColumnarRecords()
+    for filtro, valor in iter_part_columns(dataset, data_dir, workers):
+        records.extend(filtro, valor)
+    return records
@@ -0,0 +1,239 @@
+"""
+This module provides fixed-width hashed dedup keys and the compact,
+array-backed table that stores them.
+"""
+
+import hashlib
+import re
+from typing import Any, Dict, Hashable, List, Mapping
+from urllib.parse import parse_qs, urlsplit
+
+from .hierarchy import normalize_code
+
+KEY_SIZE = 16
+
+# Order of the request parameters in the key
+KEY_FIELDS = ("idAmbiente", "nome", "idPai", "valor", "sigla")
+
+# Integral floats as str() wrote them into the URLs of older journals, e.g. '11.0'
+_INTEGRAL_FLOAT = re.compile(r"-?\d+\.0+")
+
+_EMPTY = 0
+_DELETED = 255
+
+
+def request_key(params: Mapping[str, Any]) -> bytes:
+    """
+    Computes the dedup key of a fieldValues request from its parameters.
+
+    The (idAmbiente, nome, idPai, valor, sigla) parts are normalized first, so
+    11.0 and '11', or a missing sigla and '', give the same key.
+
+    Args:
+        params (Mapping[str, Any]): The request parameters, e.g. FieldValue.to_params.
+
+    Returns:
+        bytes: A KEY_SIZE-byte digest.
+    """
+    parts = [normalize_code(params.get(name)) or "" for name in KEY_FIELDS]
+    return hashlib.blake2b("\x1f".join(parts).encode("utf-8"), digest_size=KEY_SIZE).digest()
+
+
+def journal_key(line: str) -> bytes:
+    """
+    Converts a key read from a progress journal back to a digest.
+
+    Journals hold hex digests; journals written before the hashed keys hold
+    full request URLs, which are parsed and hashed the same way. Their query
+    strings lost the value types, so an integral float such as '11.0' (a
+    code read as a number) is taken as the number and normalized to '11',
+    as request_key does with 11.0.
+
+    Args:
+        line (str): The journal line.
+
+    Returns:
+        bytes: The digest.
+    """
+    if len(line) == 2 * KEY_SIZE and "?" not in line:
+        try:
+            return bytes.fromhex(line)
+        except ValueError:
+            pass
+    query = parse_qs(urlsplit(line).query)
+    params = {}
+    for name, values in query.items():
+        value = values[0]
+        params[name] = str(int(float(value))) if _INTEGRAL_FLOAT.fullmatch(value) else value
+    return request_key(params)
+
+
+class CompactKeyTable:
+    """
+    Open-addressing hash table of fixed-width digests to small state values.
+
+    Keys live back to back in one bytearray and states in another (one byte
+    per slot), instead of one Python object per key, so an entry costs about
+    (key_size + 1) / load bytes. The table doubles when three quarters full.
+    """
+
+    def __init__(self, key_size: int = KEY_SIZE, capacity: int = 1024) -> None:
+        """
+        Initializes an empty table.
+
+        Args:
+            key_size (int): Length of every key, in bytes.
+            capacity (int): Initial number of slots (rounded up to a power of two).
+        """
+        self.key_size = key_size
+        self._slots = 1 << max(3, (capacity - 1).bit_length())
+        self._keys = bytearray(self._slots * key_size)
+        self._states = bytearray(self._slots)
+        self._used = 0  # live and deleted slots
+        self._len = 0
+        self._codes: Dict[Hashable, int] = {}
+        self._values: List[Hashable] = [None]
+        self._counts: List[int] = [0]
+
+    def _code(self, value: Hashable) -> int:
+        code = self._codes.get(value)
+        if code is None:
+            code = len(self._values)
+            if code >= _DELETED:
+                raise ValueError("too many distinct state values")
+            self._codes[value] = code
+            self._values.append(value)
+            self._counts.append(0)
+        return code
+
+    def _find(self, key: bytes):
+        # Returns (slot, found); when not found, slot is where the key goes
+        if len(key) != self.key_size:
+            raise ValueError(f"keys must be {self.key_size} bytes")
+        size, keys, states = self.key_size, self._keys, self._states
+        mask = self._slots - 1
+        perturb = int.from_bytes(key[:8], "little")
+        slot = perturb & mask
+        free = -1
+        while True:
+            state = states[slot]
+            if state == _EMPTY:
+                return (slot if free < 0 else free), False
+            if state == _DELETED:
+                if free < 0:
+                    free = slot
+            elif keys[slot * size:(slot + 1) * size] == key:
+                return slot, True
+            # Same probe sequence as CPython's dict, so every slot is reached
+            perturb >>= 5
+            slot = (5 * slot + 1 + perturb) & mask
+
+    def get(self, key: bytes, default: Any = None) -> Any:
+        """
+        Get the state of a key.
+
+        Args:
+            key (bytes): The digest.
+            default: Returned when the key is absent.
+
+        Returns:
+            The state, or `default`.
+        """
+        slot, found = self._find(key)
+        return self._values[self._states[slot]] if found else default
+
+    def setdefault(self, key: bytes, value: Hashable) -> Any:
+        """
+        Get the state of a key, setting it to `value` first if the key is absent.
+
+        Unlike a lookup followed by an assignment, the table is probed once.
+
+        Args:
+            key (bytes): The digest.
+            value: The state of a new key.
+
+        Returns:
+            The state of the key.
+        """
+        slot, found = self._find(key)
+        if found:
+            return self._values[self._states[slot]]
+        self._insert(slot, key, self._code(value))
+        return value
+
+    def __setitem__(self, key: bytes, value: Hashable) -> None:
+        code = self._code(value)
+        slot, found = self._find(key)
+        if found:
+            self._counts[self._states[slot]] -= 1
+            self._states[slot] = code
+            self._counts[code] += 1
+        else:
+            self._insert(slot, key, code)
+
+    def _insert(self, slot: int, key: bytes, code: int) -> None:
+        if self._states[slot] == _EMPTY:
+            self._used += 1
+        size = self.key_size
+        self._keys[slot * size:(slot + 1) * size] = key
+        self._states[slot] = code
+        self._counts[code] += 1
+        self._len += 1
+        if self._used * 4 >= self._slots * 3:
+            self._resize(self._slots * 2 if self._len * 2 >= self._slots else self._slots)
+
+    def __delitem__(self, key: bytes) -> None:
+        slot, found = self._find(key)
+        if not found:
+            raise KeyError(key)
+        self._counts[self._states[slot]] -= 1
+        self._states[slot] = _DELETED
+        self._len -= 1
+
+    def _resize(self, slots: int) -> None:
+        # Live keys are copied to fresh arrays; deleted slots are dropped.
+        # Counts do not change.
+        size, old_keys, old_states = self.key_size, self._keys, self._states
+        keys, states = bytearray(slots * size), bytearray(slots)
+        mask = slots - 1
+        for old, state in enumerate(old_states):
+            if state == _EMPTY or state == _DELETED:
+                continue
+            key = old_keys[old * size:(old + 1) * size]
+            perturb = int.from_bytes(key[:8], "little")
+            slot = perturb & mask
+            while states[slot]:
+                perturb >>= 5
+                slot = (5 * slot + 1 + perturb) & mask
+            keys[slot * size:(slot + 1) * size] = key
+            states[slot] = state
+        self._slots, self._keys, self._states = slots, keys, states
+        self._used = self._len
+
+    def count(self, value: Hashable) -> int:
+        """
+        Get the number of keys holding a state.
+
+        Args:
+            value: The state.
+
+        Returns:
+            int: The number of keys.
+        """
+        code = self._codes.get(value)
+        return self._counts[code] if code is not None else 0
+
+    def memory(self) -> int:
+        """
+        Get the bytes used by the arrays.
+
+        Returns:
+            int: The size in bytes.
+        """
+        return len(self._keys) + len(self._states)
+
+    def __contains__(self, key: bytes) -> bool:
+        return self._find(key)[1]
+
+    def __len__(self) -> int:
+        return self._len
@@ -0,0 +1,366 @@
+"""
+This module provides thread-safe counters and latency histograms for the
+upload pipeline, with JSON and Prometheus text exports.
+"""
+
+import bisect
+import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Optional
+
+
+def _default_bounds() -> List[float]:
+    # 50 µs to ~2 min, each bucket 25% wider than the previous one
+    bounds, bound = [], 0.00005
+    while bound < 120:
+        bounds.append(round(bound, 6))
+        bound *= 1.25
+    return bounds
+
+
+DEFAULT_BOUNDS = tuple(_default_bounds())
+
+
+class LatencyHistogram:
+    """
+    Fixed-bucket histogram of durations in seconds.
+
+    Memory does not grow with the number of observations; percentiles are
+    interpolated inside the bucket that holds them.
+    """
+
+    def __init__(self, bounds: Iterable[float] = DEFAULT_BOUNDS) -> None:
+        """
+        Initializes an empty histogram.
+
+        Args:
+            bounds (Iterable[float]): Upper bounds of the buckets, increasing.
+        """
+        self.bounds = list(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.maximum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float) -> None:
+        """
+        Records one duration.
+
+        Args:
+            seconds (float): The duration.
+        """
+        index = bisect.bisect_left(self.bounds, seconds)
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.total += seconds
+            if seconds > self.maximum:
+                self.maximum = seconds
+
+    def percentile(self, fraction: float) -> float:
+        """
+        Estimates a percentile.
+
+        Args:
+            fraction (float): Between 0 and 1, e.g. 0.95 for p95.
+
+        Returns:
+            float: The estimated duration, 0 if nothing was observed.
+        """
+        with self._lock:
+            if not self.count:
+                return 0.0
+            rank = fraction * self.count
+            seen = 0
+            for index, count in enumerate(self.counts):
+                if count and seen + count >= rank:
+                    lower = self.bounds[index - 1] if index else 0.0
+                    upper = self.bounds[index] if index < len(self.bounds) else self.maximum
+                    return min(lower + (upper - lower) * (rank - seen) / count, self.maximum)
+                seen += count
+            return self.maximum
+
+    def state(self) -> dict:
+        """
+        Get the raw buckets, e.g. to send them to another process.
+
+        Returns:
+            dict: {"bounds", "counts", "count", "total", "max"}.
+        """
+        with self._lock:
+            return {"bounds": list(self.bounds), "counts": list(self.counts), "count": self.count,
+                    "total": self.total, "max": self.maximum}
+
+    def merge(self, state: dict) -> None:
+        """
+        Adds the observations of another histogram with the same bounds.
+
+        Args:
+            state (dict): The other histogram's state().
+        """
+        if list(state["bounds"]) != self.bounds:
+            raise ValueError("histograms with different bounds cannot be merged")
+        with self._lock:
+            self.counts = [mine + theirs for mine, theirs in zip(self.counts, state["counts"])]
+            self.count += state["count"]
+            self.total += state["total"]
+            self.maximum = max(self.maximum, state["max"])
+
+    def summary(self) -> dict:
+        """
+        Get the count, mean, maximum and p50/p95/p99.
+
+        Returns:
+            dict: The summary, durations in seconds.
+        """
+        with self._lock:
+            count, total, maximum = self.count, self.total, self.maximum
+        return {
+            "count": count,
+            "mean": total / count if count else 0.0,
+            "max": maximum,
+            "p50": self.percentile(0.50),
+            "p95": self.percentile(0.95),
+            "p99": self.percentile(0.99),
+        }
+
+
+class Metrics:
+    """
+    Named counters and one latency histogram per pipeline phase.
+
+    Every method may be called from any thread.
+    """
+
+    def __init__(self, phases: Iterable[str] = ("read", "dedup", "http", "parse")) -> None:
+        """
+        Initializes the counters and histograms.
+
+        Args:
+            phases (Iterable[str]): Phases with a latency histogram. Other
+                phases get one on first use.
+        """
+        self.started = time.monotonic()
+        self.counters: Dict[str, int] = {}
+        self.histograms: Dict[str, LatencyHistogram] = {phase: LatencyHistogram() for phase in phases}
+        self._lock = threading.Lock()
+
+    def inc(self, name: str, amount: int = 1) -> None:
+        """
+        Adds to a counter.
+
+        Args:
+            name (str): The counter.
+            amount (int): How much to add.
+        """
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def get(self, name: str) -> int:
+        """
+        Get a counter.
+
+        Args:
+            name (str): The counter.
+
+        Returns:
+            int: Its value, 0 if never incremented.
+        """
+        with self._lock:
+            return self.counters.get(name, 0)
+
+    def histogram(self, phase: str) -> LatencyHistogram:
+        """
+        Get the histogram of a phase, creating it if needed.
+
+        Args:
+            phase (str): The phase.
+
+        Returns:
+            LatencyHistogram: Its histogram.
+        """
+        histogram = self.histograms.get(phase)
+        if histogram is None:
+            with self._lock:
+                histogram = self.histograms.setdefault(phase, LatencyHistogram())
+        return histogram
+
+    def observe(self, phase: str, seconds: float) -> None:
+        """
+        Records the duration of one step of a phase.
+
+        Args:
+            phase (str): The phase.
+            seconds (float): The duration.
+        """
+        self.histogram(phase).observe(seconds)
+
+    @contextmanager
+    def time(self, phase: str) -> Iterator[None]:
+        """
+        Times the body of a with block as one step of a phase.
+
+        Args:
+            phase (str): The phase.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(phase, time.perf_counter() - start)
+
+    def timed(self, items: Iterable, phase: str = "read") -> Iterator:
+        """
+        Yields the items of an iterable, timing how long each one took to produce.
+
+        Args:
+            items (Iterable): E.g. the row generator.
+            phase (str): The phase the time is recorded under.
+
+        Returns:
+            Iterator: The same items.
+        """
+        iterator = iter(items)
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            self.observe(phase, time.perf_counter() - start)
+            yield item
+
+    def elapsed(self) -> float:
+        """
+        Get the seconds since the metrics were created.
+
+        Returns:
+            float: Elapsed seconds.
+        """
+        return time.monotonic() - self.started
+
+    def snapshot(self) -> dict:
+        """
+        Get every counter and histogram summary.
+
+        Returns:
+            dict: {"elapsed", "counters", "latency": {phase: summary}}.
+        """
+        with self._lock:
+            counters = dict(self.counters)
+            histograms = dict(self.histograms)
+        return {
+            "elapsed": self.elapsed(),
+            "counters": counters,
+            "latency": {phase: histogram.summary() for phase, histogram in histograms.items()},
+        }
+
+    def export(self) -> dict:
+        """
+        Get the counters and the raw histograms, e.g. to send them to another process.
+
+        Returns:
+            dict: {"counters", "histograms": {phase: LatencyHistogram.state()}}.
+        """
+        with self._lock:
+            counters = dict(self.counters)
+            histograms = dict(self.histograms)
+        return {"counters": counters,
+                "histograms": {phase: histogram.state() for phase, histogram in histograms.items()}}
+
+    def merge(self, exported: dict) -> None:
+        """
+        Adds the counters and observations exported by another Metrics.
+
+        Args:
+            exported (dict): The other metrics' export().
+        """
+        for name, value in exported["counters"].items():
+            self.inc(name, value)
+        for phase, state in exported["histograms"].items():
+            self.histogram(phase).merge(state)
+
+    def progress_line(self) -> str:
+        """
+        Builds a one-line summary of the counters and the HTTP latency.
+
+        Returns:
+            str: The progress line.
+        """
+        with self._lock:
+            counters = " ".join(f"{name}={value}" for name, value in sorted(self.counters.items()))
+        http = self.histogram("http").summary()
+        return (f"{counters} | http p50={http['p50'] * 1000:.0f}ms "
+                f"p95={http['p95'] * 1000:.0f}ms p99={http['p99'] * 1000:.0f}ms")
+
+    def to_json(self) -> str:
+        """
+        Serializes the snapshot as JSON.
+
+        Returns:
+            str: The JSON document.
+        """
+        return json.dumps(self.snapshot(), indent=2, sort_keys=True)
+
+    def to_prometheus(self, prefix: str = "techservice_upload") -> str:
+        """
+        Serializes the metrics in the Prometheus text exposition format.
+
+        Counters become `<prefix>_<name>_total`; each phase histogram becomes
+        `<prefix>_latency_seconds` buckets with a phase label.
+
+        Args:
+            prefix (str): Metric name prefix.
+
+        Returns:
+            str: The exposition text.
+        """
+        with self._lock:
+            counters = dict(self.counters)
+            histograms = dict(self.histograms)
+        lines = []
+        for name, value in sorted(counters.items()):
+            metric = f"{prefix}_{name}_total"
+            lines += [f"# TYPE {metric} counter", f"{metric} {value}"]
+        metric = f"{prefix}_latency_seconds"
+        lines.append(f"# TYPE {metric} histogram")
+        for phase, histogram in sorted(histograms.items()):
+            with histogram._lock:
+                counts, count, total = list(histogram.counts), histogram.count, histogram.total
+            cumulative = 0
+            for bound, bucket in zip(histogram.bounds, counts):
+                cumulative += bucket
+                lines.append(f'{metric}_bucket{{phase="{phase}",le="{bound}"}} {cumulative}')
+            lines.append(f'{metric}_bucket{{phase="{phase}",le="+Inf"}} {count}')
+            lines.append(f'{metric}_sum{{phase="{phase}"}} {total}')
+            lines.append(f'{metric}_count{{phase="{phase}"}} {count}')
+        lines.append(f"# TYPE {prefix}_elapsed_seconds gauge")
+        lines.append(f"{prefix}_elapsed_seconds {self.elapsed()}")
+        return "\n".join(lines) + "\n"
+
+    def dump(self, path: str, fmt: Optional[str] = None) -> None:
+        """
+        Writes the metrics to a file, atomically.
+
+        Args:
+            path (str): Destination file.
+            fmt (Optional[str]): 'json' or 'prometheus'. Defaults to
+                prometheus for .prom files and JSON otherwise.
+        """
+        if fmt is None:
+            fmt = "prometheus" if path.endswith(".prom") else "json"
+        text = self.to_prometheus() if fmt == "prometheus" else self.to_json()
+        folder = os.path.dirname(os.path.abspath(path))
+        fd, tmp_path = tempfile.mkstemp(dir=folder, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as file:
+                file.write(text)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
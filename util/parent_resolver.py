@@ -0,0 +1,187 @@
+"""
+This module provides the ParentResolver class, which maps parent codes (the
+'filtro' column) to the IDs the server assigned to those values.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+
+class _Lookup:
+    """A server lookup in progress, shared by the threads that missed the same code."""
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.parent_id: Optional[str] = None
+        self.error: Optional[BaseException] = None
+
+
+class ParentResolver:
+    """
+    LRU cache with expiry of parent code → server ID.
+
+    IDs are learned from the responses of earlier creations and from a
+    prefetch of the existing values. On a miss, `fetch` is called once per
+    code: concurrent misses for the same code wait for that single lookup
+    instead of each sending its own request, and get its result (or its
+    exception) directly. Codes the server does not know are cached too, for
+    `negative_ttl` seconds, so a missing parent shared by many rows is looked
+    up once; learning its ID replaces that entry. A lookup that raises is not
+    cached.
+    """
+
+    def __init__(self, fetch: Optional[Callable[[str], Optional[str]]] = None,
+                 maxsize: int = 100_000, ttl: float = 3600.0, negative_ttl: float = 60.0,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Initializes the resolver.
+
+        Args:
+            fetch (Optional[Callable[[str], Optional[str]]]): Looks a code up on
+                the server and returns its ID, or None if it does not exist.
+                Without it, only learned IDs are resolved.
+            maxsize (int): Maximum number of cached codes.
+            ttl (float): Seconds a cached ID stays valid.
+            negative_ttl (float): Seconds a code unknown to the server stays
+                cached as unknown.
+            clock (Callable[[], float]): Time source, in seconds.
+        """
+        self.fetch = fetch
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self.fetches = 0
+        self._entries: "OrderedDict[str, Tuple[Optional[str], float]]" = OrderedDict()
+        self._pending: Dict[str, _Lookup] = {}
+        self._lock = threading.Lock()
+
+    def learn(self, code, parent_id) -> None:
+        """
+        Stores the ID of a code.
+
+        Args:
+            code: The value code, as used in the 'filtro' column.
+            parent_id: The ID the server assigned to it.
+        """
+        if code is None or parent_id is None:
+            return
+        with self._lock:
+            self._store(str(code), str(parent_id))
+
+    def learn_many(self, pairs: Iterable[Tuple[str, str]]) -> int:
+        """
+        Stores many code → ID pairs at once, e.g. from a prefetch.
+
+        Args:
+            pairs (Iterable[Tuple[str, str]]): The codes and their IDs.
+
+        Returns:
+            int: The number of pairs stored.
+        """
+        count = 0
+        with self._lock:
+            for code, parent_id in pairs:
+                if code is not None and parent_id is not None:
+                    self._store(str(code), str(parent_id))
+                    count += 1
+        return count
+
+    def get(self, code) -> Optional[str]:
+        """
+        Looks a code up in the cache only.
+
+        Args:
+            code: The parent code.
+
+        Returns:
+            Optional[str]: The cached ID, or None.
+        """
+        with self._lock:
+            return self._lookup(str(code))[1]
+
+    def resolve(self, code) -> Optional[str]:
+        """
+        Get the ID of a code, fetching it from the server on a miss.
+
+        Args:
+            code: The parent code.
+
+        Returns:
+            Optional[str]: The ID, or None if the code is unknown to the server.
+
+        Raises:
+            Exception: Whatever `fetch` raised, in the thread that ran it and
+                in every thread that waited for it.
+        """
+        code = str(code)
+        with self._lock:
+            found, parent_id = self._lookup(code)
+            if found or self.fetch is None:
+                return parent_id
+            lookup = self._pending.get(code)
+            owner = lookup is None
+            if owner:
+                # This thread does the lookup; the others wait for it
+                lookup = self._pending[code] = _Lookup()
+                self.fetches += 1
+
+        if not owner:
+            lookup.done.wait()
+            if lookup.error is not None:
+                raise lookup.error
+            return lookup.parent_id
+
+        try:
+            parent_id = self.fetch(code)
+            lookup.parent_id = None if parent_id is None else str(parent_id)
+            with self._lock:
+                self._store(code, lookup.parent_id,
+                            self.ttl if lookup.parent_id is not None else self.negative_ttl)
+            return lookup.parent_id
+        except BaseException as e:
+            lookup.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._pending[code]
+            lookup.done.set()
+
+    def stats(self) -> dict:
+        """
+        Get the cache counters.
+
+        Returns:
+            dict: Size, hits, misses and server lookups.
+        """
+        with self._lock:
+            return {"size": len(self._entries), "hits": self.hits,
+                    "misses": self.misses, "fetches": self.fetches}
+
+    def _lookup(self, code: str, count: bool = True) -> Tuple[bool, Optional[str]]:
+        entry = self._entries.get(code)
+        if entry is not None and entry[1] <= self.clock():
+            del self._entries[code]
+            entry = None
+        if count:
+            if entry is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        if entry is None:
+            return False, None
+        self._entries.move_to_end(code)
+        return True, entry[0]
+
+    def _store(self, code: str, parent_id: Optional[str], ttl: Optional[float] = None) -> None:
+        self._entries[code] = (parent_id, self.clock() + (self.ttl if ttl is None else ttl))
+        self._entries.move_to_end(code)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,164 @@
+"""
+This module provides the BoundedPipeline class, a producer/consumer pipeline
+with a bounded work queue and a fixed set of worker threads.
+"""
+
+import logging
+import queue
+import threading
+import time
+from typing import Any, Callable, Iterable, Optional
+
+_STOP = object()
+
+
+class PipelineStats:
+    """Thread-safe counters of a pipeline run."""
+
+    def __init__(self) -> None:
+        """
+        Initializes the counters and starts the clock.
+        """
+        self.submitted = 0
+        self.processed = 0
+        self.failed = 0
+        self.started = time.monotonic()
+        self._lock = threading.Lock()
+
+    def record(self, ok: bool) -> None:
+        """
+        Records one handled item.
+
+        Args:
+            ok (bool): False if the handler raised.
+        """
+        with self._lock:
+            self.processed += 1
+            if not ok:
+                self.failed += 1
+
+    def elapsed(self) -> float:
+        """
+        Get the seconds since the run started.
+
+        Returns:
+            float: Elapsed seconds.
+        """
+        return time.monotonic() - self.started
+
+    def throughput(self) -> float:
+        """
+        Get the average number of items handled per second.
+
+        Returns:
+            float: Items per second since the run started.
+        """
+        elapsed = self.elapsed()
+        return self.processed / elapsed if elapsed > 0 else 0.0
+
+
+class BoundedPipeline:
+    """
+    Feeds items to a fixed set of worker threads through a bounded queue.
+
+    The producer blocks when the queue is full, so memory use is set by the
+    queue depth and not by the size of the input. Optionally a reporter thread
+    prints the queue depth and throughput at a fixed interval.
+    """
+
+    def __init__(self, handler: Callable[[Any], Any], workers: int = 10,
+                 queue_size: Optional[int] = None, report_interval: float = 0,
+                 report: Callable[[str], Any] = print):
+        """
+        Initializes the pipeline.
+
+        Args:
+            handler (Callable): Function called with each item, in a worker thread.
+            workers (int): Number of worker threads.
+            queue_size (Optional[int]): Maximum number of pending items.
+                Defaults to four times the number of workers.
+            report_interval (float): Seconds between progress lines, 0 disables them.
+            report (Callable): Function that receives each progress line.
+        """
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+        self.handler = handler
+        self.workers = workers
+        self.queue_size = queue_size or workers * 4
+        self.report_interval = report_interval
+        self.report = report
+        self.stats = PipelineStats()
+        self._queue = queue.Queue(maxsize=self.queue_size)
+
+    def queue_depth(self) -> int:
+        """
+        Get the number of items waiting in the queue.
+
+        Returns:
+            int: The current queue depth.
+        """
+        return self._queue.qsize()
+
+    def progress_line(self) -> str:
+        """
+        Build the progress line with the live queue depth and throughput.
+
+        Returns:
+            str: The progress line.
+        """
+        stats = self.stats
+        return (f"Fila: {self.queue_depth()}/{self.queue_size} | "
+                f"Processados: {stats.processed}/{stats.submitted} | "
+                f"Falhas: {stats.failed} | {stats.throughput():.1f} itens/s")
+
+    def run(self, items: Iterable) -> PipelineStats:
+        """
+        Feeds every item to the workers and waits for all of them to finish.
+
+        Args:
+            items (Iterable): The items to process.
+
+        Returns:
+            PipelineStats: The counters of the run.
+        """
+        self.stats = PipelineStats()
+        threads = [threading.Thread(target=self._work, daemon=True)
+                   for _ in range(self.workers)]
+        for thread in threads:
+            thread.start()
+
+        done = threading.Event()
+        reporter = None
+        if self.report_interval > 0:
+            reporter = threading.Thread(target=self._report, args=(done,), daemon=True)
+            reporter.start()
+
+        try:
+            for item in items:
+                self._queue.put(item)
+                self.stats.submitted += 1
+        finally:
+            for _ in threads:
+                self._queue.put(_STOP)
+            for thread in threads:
+                thread.join()
+            done.set()
+            if reporter:
+                reporter.join()
+        return self.stats
+
+    def _work(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+            try:
+                self.handler(item)
+                self.stats.record(True)
+            except Exception as e:
+                logging.error(f"Error processing item: {item}. Error: {e}")
+                self.stats.record(False)
+
+    def _report(self, done: threading.Event) -> None:
+        while not done.wait(self.report_interval):
+            self.report(self.progress_line())
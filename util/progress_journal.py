@@ -0,0 +1,137 @@
+"""
+This module provides the ProgressJournal class, a durable append-only record
+of the keys that were already sent, so an interrupted upload can be resumed.
+"""
+
+import os
+import threading
+import time
+from typing import Iterator
+
+
+class ProgressJournal:
+    """
+    Append-only journal with one completed key per line.
+
+    Writes from several threads are serialized by an internal lock. The file is
+    flushed and fsynced in batches (every `sync_every` keys or `sync_interval`
+    seconds, whichever comes first) instead of once per key, so a crash loses
+    at most the last unsynced batch. A line torn by a crash is ignored when the
+    journal is loaded and cut off when it is reopened.
+    """
+
+    def __init__(self, path: str, sync_every: int = 256, sync_interval: float = 1.0):
+        """
+        Initializes the journal.
+
+        Args:
+            path (str): The journal file. It is created when first opened.
+            sync_every (int): Number of appended keys between fsyncs.
+            sync_interval (float): Maximum seconds between fsyncs while appending.
+        """
+        self.path = path
+        self.sync_every = sync_every
+        self.sync_interval = sync_interval
+        self._file = None
+        self._pending = 0
+        self._last_sync = time.monotonic()
+        self._lock = threading.Lock()
+
+    def load(self) -> Iterator[str]:
+        """
+        Yields every key recorded in the journal, in the order it was written.
+
+        Returns:
+            Iterator[str]: The completed keys.
+        """
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "r", encoding="utf-8", newline="\n") as file:
+            for line in file:
+                # A line without a trailing break was torn by a crash
+                if line.endswith("\n"):
+                    yield line[:-1]
+
+    def open(self) -> "ProgressJournal":
+        """
+        Opens the journal for appending, cutting off a torn last line.
+
+        Returns:
+            ProgressJournal: The journal itself.
+        """
+        with self._lock:
+            if self._file is None:
+                self._truncate_torn_line()
+                self._file = open(self.path, "a", encoding="utf-8", newline="\n")
+                self._last_sync = time.monotonic()
+        return self
+
+    def append(self, key: str) -> None:
+        """
+        Records a completed key.
+
+        Args:
+            key (str): The key. It must not contain line breaks.
+        """
+        if "\n" in key:
+            raise ValueError("journal keys must not contain line breaks")
+        with self._lock:
+            if self._file is None:
+                raise ValueError("journal is not open")
+            self._file.write(key + "\n")
+            self._pending += 1
+            if (self._pending >= self.sync_every
+                    or time.monotonic() - self._last_sync >= self.sync_interval):
+                self._sync()
+
+    def sync(self) -> None:
+        """
+        Flushes and fsyncs every appended key.
+        """
+        with self._lock:
+            if self._file is not None:
+                self._sync()
+
+    def close(self) -> None:
+        """
+        Syncs and closes the journal.
+        """
+        with self._lock:
+            if self._file is not None:
+                self._sync()
+                self._file.close()
+                self._file = None
+
+    def _sync(self) -> None:
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._pending = 0
+        self._last_sync = time.monotonic()
+
+    def _truncate_torn_line(self) -> None:
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "rb+") as file:
+            size = file.seek(0, os.SEEK_END)
+            if size == 0:
+                return
+            file.seek(size - 1)
+            if file.read(1) == b"\n":
+                return
+            # Find the last line break, reading the end of the file in blocks
+            position = size
+            while position > 0:
+                start = max(0, position - 4096)
+                file.seek(start)
+                index = file.read(position - start).rfind(b"\n")
+                if index >= 0:
+                    file.truncate(start + index + 1)
+                    return
+                position = start
+            file.truncate(0)
+
+    def __enter__(self) -> "ProgressJournal":
+        return self.open()
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -4,20 +4,33 @@ and return its content as a list of dictionaries.
 """
 
 import os
-import pandas as pd
+from typing import Iterator, List, Mapping, Optional, Sequence
+from zipfile import BadZipFile
+
+from openpyxl.utils.exceptions import InvalidFileException
+
+from .excel_stream import VALUE_DTYPES, Dtype, ExcelStreamReader
 
 
 class ExcelReader:
     """A class to read an Excel file and return its content as a list of dictionaries."""
 
-    def __init__(self, excel_file_path: str):
+    def __init__(self, excel_file_path: str, columns: Optional[Sequence[str]] = None,
+                 dtypes: Optional[Mapping[str, Dtype]] = VALUE_DTYPES):
         """
         Initializes the ExcelReader with the path to the Excel file.
 
         Args:
             excel_file_path (str): The path to the Excel file to be read.
+            columns (Optional[Sequence[str]]): Only read these columns, e.g.
+                ('valor', 'sigla', 'filtro'). Defaults to every column.
+            dtypes (Optional[Mapping[str, Dtype]]): Column types. By default
+                valor, sigla and filtro are read as strings, so a code typed as
+                11 stays '11' instead of becoming 11.0.
         """
         self.file_path = excel_file_path
+        self.columns = columns
+        self.dtypes = dtypes
 
     def file_exists(self) -> bool:
         """
@@ -28,12 +41,46 @@ class ExcelReader:
         """
         return os.path.exists(self.file_path)
 
+    def iter_dicts(self) -> Iterator[dict]:
+        """
+        Yields the rows of the Excel file one at a time, with constant memory.
+
+        Empty cells are returned as empty strings, as in read_to_dict.
+
+        Returns:
+            Iterator[dict]: One dictionary per row, keyed by the column names.
+        """
+        reader = ExcelStreamReader(self.file_path, columns=self.columns, dtypes=self.dtypes)
+        for row in reader.iter_tuples():
+            yield {key: "" if value is None else value for key, value in zip(reader.header, row)}
+
+    def iter_chunks(self, chunk_size: int = 1000) -> Iterator[List[dict]]:
+        """
+        Yields the rows of the Excel file in lists of at most `chunk_size` dictionaries.
+
+        Args:
+            chunk_size (int): Rows per chunk.
+
+        Returns:
+            Iterator[List[dict]]: The chunks, in file order.
+        """
+        chunk = []
+        for row in self.iter_dicts():
+            chunk.append(row)
+            if len(chunk) == chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
     def read_to_dict(self) -> list:
         """
         Reads the Excel file and returns the content as a list of dictionaries.
 
         Each dictionary corresponds to a row in the Excel file, where the keys
-        are the column names and the values are the cell values.
+        are the column names and the values are the cell values. Empty cells
+        are returned as empty strings. Use iter_dicts or iter_chunks to keep
+        memory bounded on large sheets.
 
         Returns:
             list: A list of dictionaries representing the data in the Excel file.
@@ -43,18 +90,10 @@ class ExcelReader:
             return []
 
         try:
-            # Read the Excel file into a DataFrame
-            df = pd.read_excel(self.file_path)
-
-            # Replace NaN values with empty strings
-            df = df.fillna("")
-
-            # Convert the DataFrame to a list of dictionaries (array of objects)
-            records = df.to_dict(orient='records')
-
-            return records
+            # Stream the sheet in a single pass, replacing empty cells with empty strings
+            return list(self.iter_dicts())
 
-        except (FileNotFoundError, pd.errors.EmptyDataError, pd.errors.ParserError) as e:
+        except (FileNotFoundError, InvalidFileException, BadZipFile) as e:
             print(f"Error reading the Excel file: {e}")
             return []
 
@@ -0,0 +1,219 @@
+"""
+This module provides the record sources read by the uploader: the JSON part
+directories, an Excel sheet or a CSV file, all yielding the same
+{'valor', 'sigla', 'filtro'} dictionaries.
+"""
+
+import csv
+import os
+import queue
+import threading
+from typing import Callable, Dict, Iterable, Iterator, Optional
+
+from .excel_stream import VALUE_DTYPES, ExcelStreamReader, to_text
+from .json_parts import DATASETS, list_part_files, parse_part_file
+
+_DONE = object()
+
+
+def prefetch(items: Iterable, depth: int = 2) -> Iterator:
+    """
+    Yields the items of an iterable produced by a background thread.
+
+    The thread stays at most `depth` items ahead of the consumer, so the next
+    item is being produced (e.g. a part file parsed) while the current one is
+    in use (e.g. its rows being sent).
+
+    Args:
+        items (Iterable): The items to produce.
+        depth (int): Maximum number of items produced ahead.
+
+    Returns:
+        Iterator: The same items, in order. An exception raised while
+        producing is raised again in the consumer.
+    """
+    ready: "queue.Queue" = queue.Queue(maxsize=max(depth, 1))
+    stop = threading.Event()
+
+    def offer(item) -> bool:
+        while not stop.is_set():
+            try:
+                ready.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        try:
+            for item in items:
+                if not offer(item):
+                    return
+            offer(_DONE)
+        except BaseException as e:
+            offer(e)
+
+    thread = threading.Thread(target=produce, name="prefetch", daemon=True)
+    thread.start()
+    try:
+        while True:
+            item = ready.get()
+            if item is _DONE:
+                return
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        # If the consumer stopped early, the producer must not block on a full queue
+        stop.set()
+
+
+class JsonPartSource:
+    """
+    Records of a dataset's JSON part files (data/<dataset>/<dataset>_partN.json).
+
+    Part files are parsed one at a time, in part order, by a background thread
+    that stays `prefetch_parts` files ahead, so parsing overlaps with sending.
+    """
+
+    def __init__(self, dataset: str, data_dir: str = "data", prefetch_parts: int = 1) -> None:
+        """
+        Initializes the source.
+
+        Args:
+            dataset (str): The dataset name, e.g. 'conjunto_componente'.
+            data_dir (str): The folder holding one subfolder per dataset.
+            prefetch_parts (int): Part files parsed ahead of the rows being
+                consumed; 0 parses each file only when it is reached.
+        """
+        self.dataset = dataset
+        self.data_dir = str(data_dir)
+        self.prefetch_parts = prefetch_parts
+
+    @classmethod
+    def from_folder(cls, folder: str, prefetch_parts: int = 1) -> "JsonPartSource":
+        """
+        Creates the source of a part directory, e.g. 'data/conjunto_componente'.
+
+        Args:
+            folder (str): The directory; its name is the dataset name.
+            prefetch_parts (int): Part files parsed ahead.
+
+        Returns:
+            JsonPartSource: The source.
+        """
+        folder = os.path.normpath(str(folder))
+        return cls(os.path.basename(folder), os.path.dirname(folder) or ".", prefetch_parts)
+
+    def _parts(self) -> Iterator[tuple]:
+        for path in list_part_files(self.dataset, self.data_dir):
+            yield parse_part_file(path, self.dataset)
+
+    def __iter__(self) -> Iterator[dict]:
+        parts = prefetch(self._parts(), self.prefetch_parts) if self.prefetch_parts else self._parts()
+        for filtro_column, valor_column in parts:
+            for filtro, valor in zip(filtro_column, valor_column):
+                # Codes may be numbers in the JSON; 11.0 is sent as '11'
+                yield {'valor': to_text(valor), 'sigla': None, 'filtro': to_text(filtro)}
+
+
+class ExcelSource:
+    """Records of an Excel sheet, with valor/sigla/filtro read as strings."""
+
+    def __init__(self, path: str, sheet_name: Optional[str] = None) -> None:
+        """
+        Initializes the source.
+
+        Args:
+            path (str): The Excel file.
+            sheet_name (Optional[str]): The sheet to read. Defaults to the active one.
+        """
+        self.path = str(path)
+        self.sheet_name = sheet_name
+
+    def __iter__(self) -> Iterator[dict]:
+        return ExcelStreamReader(self.path, self.sheet_name, dtypes=VALUE_DTYPES).iter_dicts()
+
+
+class CsvSource:
+    """
+    Records of a CSV file with a valor/sigla/filtro header.
+
+    Every value is read as text, so codes are never turned into floats; empty
+    cells are returned as None, as in ExcelSource.
+    """
+
+    def __init__(self, path: str, delimiter: Optional[str] = None, encoding: str = "utf-8-sig") -> None:
+        """
+        Initializes the source.
+
+        Args:
+            path (str): The CSV file.
+            delimiter (Optional[str]): The field separator. Detected from the
+                header line (',' or ';') if omitted.
+            encoding (str): The file encoding; the default also accepts a BOM.
+        """
+        self.path = str(path)
+        self.delimiter = delimiter
+        self.encoding = encoding
+
+    def __iter__(self) -> Iterator[dict]:
+        with open(self.path, newline="", encoding=self.encoding) as file:
+            delimiter = self.delimiter
+            if delimiter is None:
+                header = file.readline()
+                delimiter = ";" if header.count(";") > header.count(",") else ","
+                file.seek(0)
+            for row in csv.DictReader(file, delimiter=delimiter):
+                yield {key: value if value != "" else None for key, value in row.items()}
+
+
+SOURCES: Dict[str, Callable[..., Iterable[dict]]] = {
+    "json": JsonPartSource.from_folder,
+    "excel": ExcelSource,
+    "csv": CsvSource,
+}
+
+
+def register_source(kind: str, factory: Callable[..., Iterable[dict]]) -> None:
+    """
+    Adds a record source kind, usable as '<kind>:<location>' in open_source.
+
+    Args:
+        kind (str): The kind name.
+        factory (Callable[..., Iterable[dict]]): Called with the location; its
+            result is iterated for the records.
+    """
+    SOURCES[kind] = factory
+
+
+def open_source(spec: str, data_dir: str = "data") -> Iterable[dict]:
+    """
+    Opens a record source from a specification.
+
+    The specification is '<kind>:<location>' (e.g. 'csv:values.csv') or just a
+    location, whose kind is inferred: a dataset name (e.g.
+    'conjunto_componente') or a part directory is read as JSON parts, a .csv
+    file as CSV and anything else as Excel.
+
+    Args:
+        spec (str): The specification.
+        data_dir (str): The folder holding the datasets, for dataset names.
+
+    Returns:
+        Iterable[dict]: The source; each iteration reads it again.
+    """
+    kind, sep, location = spec.partition(":")
+    if not sep or kind not in SOURCES:
+        # Windows paths (C:\...) and plain locations have no known kind prefix
+        kind, location = None, spec
+    if kind in (None, "json") and location in DATASETS and not os.path.exists(location):
+        kind, location = "json", os.path.join(str(data_dir), location)
+    if kind is None:
+        if os.path.isdir(location):
+            kind = "json"
+        elif location.lower().endswith(".csv"):
+            kind = "csv"
+        else:
+            kind = "excel"
+    return SOURCES[kind](location)
@@ -0,0 +1,210 @@
+"""
+This module provides the pieces of the multi-process uploader: a stable shard
+function, a request-rate budget shared by every process, and the queue
+protocol that carries the rows of each shard to its worker process.
+"""
+
+import multiprocessing
+import queue
+import time
+import zlib
+from typing import Callable, Iterator, List, Optional, Sequence
+
+from .hierarchy import normalize_code
+
+# Queue messages of a shard, besides the lists of rows
+END_OF_LEVEL = "end_of_level"
+STOP = "stop"
+
+
+def shard_of(code, shards: int) -> int:
+    """
+    Get the shard of a parent code.
+
+    The hash is a CRC-32 of the normalized code, so it is the same in every
+    process and every run (unlike hash(), which is salted per process), and
+    11.0 and '11' land in the same shard.
+
+    Args:
+        code: The filtro (idPai) of a row; None for top-level rows.
+        shards (int): The number of shards.
+
+    Returns:
+        int: The shard, from 0 to shards - 1.
+    """
+    normalized = normalize_code(code)
+    if normalized is None:
+        return 0
+    return zlib.crc32(normalized.encode("utf-8")) % shards
+
+
+class SharedRateBudget:
+    """
+    Requests-per-second budget shared by several processes.
+
+    The time of the next free send slot lives in shared memory. acquire()
+    reserves the next slot under a process-shared lock and sleeps until it
+    outside the lock, so the total rate of every process together stays at
+    `per_second`. time.monotonic() is system-wide on Linux, so the slots of
+    different processes are comparable.
+
+    It has the interface of AdaptiveRateLimiter (acquire, record, metrics),
+    so a WebService uses it as its rate_limiter. The budget must be handed to
+    the worker processes when they are created (multiprocessing.Process args).
+    """
+
+    def __init__(self, per_second: float, context=None) -> None:
+        """
+        Initializes the budget.
+
+        Args:
+            per_second (float): Total requests per second of every process.
+            context: The multiprocessing context the workers are started
+                with. Defaults to 'spawn'.
+        """
+        if per_second <= 0:
+            raise ValueError("per_second must be positive")
+        context = context or multiprocessing.get_context("spawn")
+        self._rate = context.Value("d", float(per_second), lock=False)
+        self._next = context.Value("d", 0.0, lock=False)
+        self._granted = context.Value("q", 0, lock=False)
+        self._lock = context.Lock()
+
+    @property
+    def rate(self) -> float:
+        """
+        Get the total requests per second.
+
+        Returns:
+            float: The rate.
+        """
+        return self._rate.value
+
+    def acquire(self) -> None:
+        """
+        Blocks until this process may send one request.
+        """
+        with self._lock:
+            now = time.monotonic()
+            slot = max(self._next.value, now)
+            self._next.value = slot + 1 / self._rate.value
+            self._granted.value += 1
+        if slot > now:
+            time.sleep(slot - now)
+
+    def record(self, status_code: int, latency: float) -> None:
+        """
+        Ignores the outcome of a request; the budget is fixed.
+
+        Args:
+            status_code (int): The status code.
+            latency (float): The latency, in seconds.
+        """
+
+    def metrics(self) -> dict:
+        """
+        Get the rate and the number of slots granted by every process.
+
+        Returns:
+            dict: rate, granted, and increases/decreases (always 0), as in
+            AdaptiveRateLimiter.metrics.
+        """
+        return {"rate": self.rate, "granted": self._granted.value, "increases": 0, "decreases": 0}
+
+
+class ShardRouter:
+    """
+    Sends the rows of each shard to its worker's queue, in chunks.
+
+    Rows keep their input order within a shard. If a worker process dies,
+    the next put raises instead of blocking on its full queue.
+    """
+
+    def __init__(self, queues: Sequence, key: str = "filtro", chunk_size: int = 500,
+                 alive: Optional[Callable[[], bool]] = None) -> None:
+        """
+        Initializes the router.
+
+        Args:
+            queues (Sequence): One multiprocessing queue per shard.
+            key (str): The row field that decides the shard.
+            chunk_size (int): Rows per message.
+            alive (Optional[Callable[[], bool]]): Returns False once a worker
+                has died.
+        """
+        self.queues = list(queues)
+        self.key = key
+        self.chunk_size = chunk_size
+        self.alive = alive
+        self.routed = [0] * len(self.queues)
+
+    def _put(self, shard: int, message) -> None:
+        while True:
+            try:
+                self.queues[shard].put(message, timeout=1)
+                return
+            except queue.Full:
+                if self.alive is not None and not self.alive():
+                    raise RuntimeError("a shard worker process stopped unexpectedly")
+
+    def route(self, rows) -> None:
+        """
+        Sends every row to the queue of its shard.
+
+        Args:
+            rows: The rows (dictionaries with the `key` field).
+        """
+        shards = len(self.queues)
+        buffers: List[list] = [[] for _ in range(shards)]
+        for row in rows:
+            shard = shard_of(row.get(self.key), shards)
+            buffer = buffers[shard]
+            buffer.append(row)
+            if len(buffer) >= self.chunk_size:
+                self._put(shard, buffer)
+                self.routed[shard] += len(buffer)
+                buffers[shard] = []
+        for shard, buffer in enumerate(buffers):
+            if buffer:
+                self._put(shard, buffer)
+                self.routed[shard] += len(buffer)
+
+    def end_level(self) -> None:
+        """
+        Tells every worker that the current level is complete.
+        """
+        for shard in range(len(self.queues)):
+            self._put(shard, END_OF_LEVEL)
+
+    def stop(self) -> None:
+        """
+        Tells every worker that there are no more rows.
+        """
+        for shard in range(len(self.queues)):
+            self._put(shard, STOP)
+
+
+def _level_rows(rows_queue, first) -> Iterator[dict]:
+    message = first
+    while message != END_OF_LEVEL:
+        yield from message
+        message = rows_queue.get()
+
+
+def receive_levels(rows_queue) -> Iterator[Iterator[dict]]:
+    """
+    Yields the levels sent by a ShardRouter, each as an iterator of rows.
+
+    Each level must be consumed completely before asking for the next one.
+
+    Args:
+        rows_queue: The worker's queue.
+
+    Returns:
+        Iterator[Iterator[dict]]: The levels, until the router stops.
+    """
+    while True:
+        message = rows_queue.get()
+        if message == STOP:
+            return
+        yield _level_rows(rows_queue, message)
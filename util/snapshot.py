@@ -0,0 +1,347 @@
+"""
+This module compiles the JSON part sets under data/ into a compact binary
+snapshot and loads it back through a memory map.
+
+A snapshot holds the filtro/valor columns of one dataset as dictionary codes:
+every distinct value is stored once, and each column is an array of uint32
+codes. The file records a fingerprint of the part files it was built from, so
+it is rebuilt only when they change.
+
+Layout (native byte order, recorded in the header):
+    magic (8 bytes) | header length (uint32) | header JSON | padding to 8
+    offsets uint32[strings + 1] | types uint8[strings] | padding to 4
+    codes uint32[rows] for each column | UTF-8 blob of every distinct value
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from array import array
+from typing import Iterator, List, Optional
+
+from .json_parts import ColumnarRecords, list_part_files, load_dataset
+
+# Version 2: header records are no longer stored (see json_parts.parse_part_file);
+# version 3: booleans keep their type. Older snapshots fail the check and are rebuilt
+MAGIC = b"TSNAP\x00\x03\x00"
+COLUMNS = ("filtro", "valor")
+_TYPE_STR, _TYPE_INT, _TYPE_FLOAT, _TYPE_BOOL = 0, 1, 2, 3
+
+
+def fingerprint_parts(paths: List[str]) -> str:
+    """
+    Computes a fingerprint of part files from their names, sizes and mtimes.
+
+    Args:
+        paths (List[str]): The part files.
+
+    Returns:
+        str: A hex digest that changes whenever a part file is added, removed
+        or modified.
+    """
+    digest = hashlib.sha256()
+    for path in sorted(paths):
+        stat = os.stat(path)
+        digest.update(f"{os.path.basename(path)}\0{stat.st_size}\0{stat.st_mtime_ns}\n".encode())
+    return digest.hexdigest()
+
+
+def _pad(size: int, alignment: int) -> int:
+    return -size % alignment
+
+
+def write_snapshot(records: ColumnarRecords, path: str, dataset: str, fingerprint: str) -> str:
+    """
+    Writes columnar records as a dictionary-encoded snapshot.
+
+    The file is written next to `path` and moved into place, so readers never
+    see a partial snapshot.
+
+    Args:
+        records (ColumnarRecords): The filtro/valor columns.
+        path (str): Destination file.
+        dataset (str): The dataset name.
+        fingerprint (str): Fingerprint of the source part files.
+
+    Returns:
+        str: The path of the snapshot.
+    """
+    codes = {}
+    types = array('B')
+    offsets = array('I', [0])
+    blob = bytearray()
+    columns = {}
+    for name in COLUMNS:
+        column = array('I')
+        for value in getattr(records, name):
+            key = (type(value), value)
+            code = codes.get(key)
+            if code is None:
+                code = codes[key] = len(types)
+                if isinstance(value, bool):
+                    types.append(_TYPE_BOOL)
+                    value = repr(value)
+                elif not isinstance(value, (int, float)):
+                    types.append(_TYPE_STR)
+                    value = str(value)
+                else:
+                    types.append(_TYPE_INT if isinstance(value, int) else _TYPE_FLOAT)
+                    value = repr(value)
+                blob += value.encode('utf-8')
+                offsets.append(len(blob))
+            column.append(code)
+        columns[name] = column
+
+    header = json.dumps({
+        "dataset": dataset,
+        "fingerprint": fingerprint,
+        "byteorder": sys.byteorder,
+        "rows": len(records),
+        "strings": len(types),
+        "columns": list(COLUMNS),
+    }).encode('utf-8')
+
+    folder = os.path.dirname(os.path.abspath(path))
+    os.makedirs(folder, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=folder, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as file:
+            start = len(MAGIC) + 4 + len(header)
+            file.write(MAGIC + struct.pack("=I", len(header)) + header)
+            file.write(b"\0" * _pad(start, 8))
+            offsets.tofile(file)
+            types.tofile(file)
+            file.write(b"\0" * _pad(len(types), 4))
+            for name in COLUMNS:
+                columns[name].tofile(file)
+            file.write(blob)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return path
+
+
+class Snapshot:
+    """
+    Read-only view of a snapshot file through a memory map.
+
+    Codes and offsets are read in place; values are decoded on access and
+    cached, so each distinct value is decoded once.
+    """
+
+    def __init__(self, path: str):
+        """
+        Opens and maps the snapshot.
+
+        Args:
+            path (str): The snapshot file.
+        """
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError(f"empty snapshot: {path}")
+        if self._map[:len(MAGIC)] != MAGIC:
+            self.close()
+            raise ValueError(f"not a snapshot file: {path}")
+
+        try:
+            header_size = struct.unpack_from("=I", self._map, len(MAGIC))[0]
+            start = len(MAGIC) + 4
+            self.header = json.loads(self._map[start:start + header_size])
+            byteorder, rows, strings = (self.header["byteorder"], self.header["rows"],
+                                        self.header["strings"])
+            columns = self.header["columns"]
+        except (struct.error, ValueError, KeyError, TypeError):
+            self.close()
+            raise ValueError(f"corrupt snapshot header: {path}")
+        if byteorder != sys.byteorder:
+            self.close()
+            raise ValueError(f"snapshot written with another byte order: {path}")
+
+        # Every section must fit in the file, and the blob must end where it does
+        position = start + header_size
+        position += _pad(position, 8)
+        blob_start = (position + 4 * (strings + 1) + strings + _pad(strings, 4)
+                      + 4 * rows * len(columns))
+        if blob_start > len(self._map):
+            self.close()
+            raise ValueError(f"truncated snapshot: {path}")
+        self._view = view = memoryview(self._map)
+        self._offsets = view[position:position + 4 * (strings + 1)].cast('I')
+        position += 4 * (strings + 1)
+        self._types = view[position:position + strings]
+        position += strings + _pad(strings, 4)
+        self._codes = {}
+        for name in columns:
+            self._codes[name] = view[position:position + 4 * rows].cast('I')
+            position += 4 * rows
+        self._blob_start = position
+        self._cache = {}
+        if self._blob_start + self._offsets[strings] != len(self._map):
+            self.close()
+            raise ValueError(f"truncated snapshot: {path}")
+
+    @property
+    def dataset(self) -> str:
+        """
+        Get the dataset name.
+
+        Returns:
+            str: The dataset the snapshot was built from.
+        """
+        return self.header["dataset"]
+
+    @property
+    def fingerprint(self) -> str:
+        """
+        Get the fingerprint of the source part files.
+
+        Returns:
+            str: The fingerprint recorded at build time.
+        """
+        return self.header["fingerprint"]
+
+    def value(self, code: int):
+        """
+        Decodes one dictionary entry.
+
+        Args:
+            code (int): The dictionary code.
+
+        Returns:
+            The value, with the type it had in the JSON part file.
+        """
+        value = self._cache.get(code)
+        if value is None:
+            start = self._blob_start + self._offsets[code]
+            end = self._blob_start + self._offsets[code + 1]
+            value = self._map[start:end].decode('utf-8')
+            kind = self._types[code]
+            if kind == _TYPE_INT:
+                value = int(value)
+            elif kind == _TYPE_FLOAT:
+                value = float(value)
+            elif kind == _TYPE_BOOL:
+                value = value == "True"
+            self._cache[code] = value
+        return value
+
+    def column(self, name: str) -> list:
+        """
+        Decodes a whole column.
+
+        Args:
+            name (str): 'filtro' or 'valor'.
+
+        Returns:
+            list: The column values, in record order.
+        """
+        value = self.value
+        return [value(code) for code in self._codes[name]]
+
+    def iter_rows(self) -> Iterator[dict]:
+        """
+        Yields each record as a {'filtro', 'valor'} dictionary.
+
+        Returns:
+            Iterator[dict]: The records, in part order.
+        """
+        value = self.value
+        for filtro, valor in zip(self._codes["filtro"], self._codes["valor"]):
+            yield {'filtro': value(filtro), 'valor': value(valor)}
+
+    def read_to_dict(self) -> list:
+        """
+        Returns every record as a list of dictionaries, like ExcelReader.read_to_dict.
+
+        Returns:
+            list: The records.
+        """
+        return list(self.iter_rows())
+
+    def to_columnar(self) -> ColumnarRecords:
+        """
+        Decodes the snapshot into columnar records.
+
+        Returns:
+            ColumnarRecords: The filtro/valor columns.
+        """
+        records = ColumnarRecords()
+        records.extend(self.column("filtro"), self.column("valor"))
+        return records
+
+    def close(self) -> None:
+        """
+        Releases the memory map and the file.
+        """
+        views = [*getattr(self, "_codes", {}).values(), getattr(self, "_offsets", None),
+                 getattr(self, "_types", None), getattr(self, "_view", None)]
+        for view in views:
+            if view is not None:
+                view.release()
+        if getattr(self, "_map", None) is not None:
+            self._map.close()
+        self._file.close()
+
+    def __len__(self) -> int:
+        return self.header["rows"]
+
+    def __enter__(self) -> "Snapshot":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def snapshot_path(dataset: str, data_dir: str = "data", snapshot_dir: Optional[str] = None) -> str:
+    """
+    Get the default location of a dataset snapshot.
+
+    Args:
+        dataset (str): The dataset name.
+        data_dir (str): The folder holding one subfolder per dataset.
+        snapshot_dir (Optional[str]): Where snapshots live. Defaults to
+            <data_dir>/.snapshots.
+
+    Returns:
+        str: The snapshot path.
+    """
+    return os.path.join(snapshot_dir or os.path.join(data_dir, ".snapshots"), f"{dataset}.snap")
+
+
+def load_snapshot(dataset: str, data_dir: str = "data", snapshot_dir: Optional[str] = None,
+                  workers: Optional[int] = None) -> Snapshot:
+    """
+    Opens the snapshot of a dataset, rebuilding it if the part files changed.
+
+    Args:
+        dataset (str): The dataset name.
+        data_dir (str): The folder holding one subfolder per dataset.
+        snapshot_dir (Optional[str]): Where snapshots live.
+        workers (Optional[int]): Number of processes used if a rebuild is needed.
+
+    Returns:
+        Snapshot: The up-to-date snapshot.
+    """
+    path = snapshot_path(dataset, data_dir, snapshot_dir)
+    fingerprint = fingerprint_parts(list_part_files(dataset, data_dir))
+    if os.path.exists(path):
+        try:
+            snapshot = Snapshot(path)
+        except (ValueError, KeyError, OSError):
+            snapshot = None
+        if snapshot is not None:
+            if snapshot.fingerprint == fingerprint and snapshot.dataset == dataset:
+                return snapshot
+            snapshot.close()
+
+    write_snapshot(load_dataset(dataset, data_dir, workers), path, dataset, fingerprint)
+    return Snapshot(path)